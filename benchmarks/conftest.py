@@ -0,0 +1,74 @@
+"""
+Benchmarks of graph construction, validation and serialization on synthetic
+graphs, using `pytest-benchmark`:
+
+```
+pip install -e ".[benchmarks]"
+pytest benchmarks --benchmark-only
+pytest benchmarks --benchmark-only --edges 1000,10000,100000,1000000
+```
+
+Each benchmark runs once per graph size (`--edges`, default 1k, 10k and
+100k edges) and stores the number of edges in `extra_info`, so that time per
+edge can be compared between sizes. It should stay roughly constant; growing
+time per edge is a scaling regression. Save a baseline with
+`--benchmark-autosave` and compare against it with
+`--benchmark-compare --benchmark-compare-fail=mean:20%`.
+"""
+
+import json
+from functools import cache
+
+import pytest
+from synthetic import graph_with_edges
+
+from bw_interface_schemas import graph_to_pydantic
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--edges",
+        default="1000,10000,100000",
+        help="Comma-separated number of edges of the synthetic graphs",
+    )
+
+
+def pytest_generate_tests(metafunc):
+    if "n_edges" in metafunc.fixturenames:
+        sizes = [int(size) for size in metafunc.config.getoption("edges").split(",")]
+        metafunc.parametrize("n_edges", sizes, ids=[f"{size}" for size in sizes])
+
+
+@cache
+def _data(n_edges: int) -> dict:
+    return graph_with_edges(n_edges)
+
+
+@pytest.fixture
+def data(n_edges):
+    """Graph as dictionary; shared between benchmarks, so don't change it"""
+    return _data(n_edges)
+
+
+@pytest.fixture
+def graph(data):
+    return graph_to_pydantic(data)
+
+
+@pytest.fixture
+def json_bytes(graph):
+    return graph.model_dump_json().encode()
+
+
+@pytest.fixture
+def json_file(data, tmp_path):
+    path = tmp_path / "graph.json"
+    path.write_text(json.dumps(data))
+    return path
+
+
+@pytest.fixture
+def benchmark(benchmark, data):
+    benchmark.extra_info["edges"] = len(data["edges"])
+    benchmark.extra_info["nodes"] = len(data["nodes"])
+    return benchmark
@@ -0,0 +1,145 @@
+"""
+Synthetic graphs which scale the bicycle example in `tests/conftest.py`.
+
+Each process produces one product (functional edge), consumes
+`inputs_per_process` products made by earlier processes, and emits
+`flows_per_process` elementary flows. Every inventory node belongs to one of
+`n_product_systems` product systems, and each elementary flow has one
+characterization factor per impact category.
+"""
+
+import random
+
+from bw_interface_schemas import NodeTypes, QualitativeEdgeTypes, QuantitativeEdgeTypes
+
+
+def synthetic_graph(
+    n_processes: int,
+    inputs_per_process: int = 5,
+    flows_per_process: int = 5,
+    n_flows: int = 100,
+    n_categories: int = 10,
+    n_product_systems: int = 1,
+    seed: int = 42,
+) -> dict:
+    """Graph as dictionary, in the format expected by `graph_to_pydantic`."""
+    rng = random.Random(seed)
+    nodes, edges = {}, []
+
+    def belongs_to(source: str, target: str) -> None:
+        edges.append(
+            {
+                "edge_type": QualitativeEdgeTypes.belongs_to,
+                "source": source,
+                "target": target,
+            }
+        )
+
+    product_systems = [f"product system {i}" for i in range(n_product_systems)]
+    for name in product_systems:
+        nodes[name] = {
+            "node_type": NodeTypes.product_system,
+            "name": name,
+            "license": "CC-BY",
+        }
+
+    nodes["method"] = {
+        "node_type": NodeTypes.impact_assessment_method,
+        "name": "method",
+        "license": "CC-BY",
+    }
+    categories = [f"category {i}" for i in range(n_categories)]
+    for name in categories:
+        nodes[name] = {
+            "node_type": NodeTypes.impact_category,
+            "name": ["method", name],
+            "unit": "points",
+        }
+        belongs_to(name, "method")
+
+    flows = [f"flow {i}" for i in range(n_flows)]
+    for name in flows:
+        nodes[name] = {
+            "node_type": NodeTypes.elementary_flow,
+            "name": name,
+            "context": ["air"],
+            "unit": "kg",
+        }
+        belongs_to(name, product_systems[0])
+        for category in categories:
+            edges.append(
+                {
+                    "edge_type": QuantitativeEdgeTypes.characterization,
+                    "amount": rng.random(),
+                    "source": name,
+                    "target": category,
+                }
+            )
+
+    for i in range(n_processes):
+        process, product = f"process {i}", f"product {i}"
+        product_system = product_systems[i % n_product_systems]
+        nodes[process] = {
+            "node_type": NodeTypes.process,
+            "name": process,
+            "location": "GLO",
+        }
+        nodes[product] = {
+            "node_type": NodeTypes.product,
+            "name": product,
+            "unit": "kg",
+        }
+        belongs_to(process, product_system)
+        belongs_to(product, product_system)
+        edges.append(
+            {
+                "edge_type": QuantitativeEdgeTypes.technosphere,
+                "amount": 1.0,
+                "source": process,
+                "target": product,
+                "functional": True,
+            }
+        )
+        for j in rng.sample(range(i), min(i, inputs_per_process)):
+            edges.append(
+                {
+                    "edge_type": QuantitativeEdgeTypes.technosphere,
+                    "amount": rng.random(),
+                    "source": f"product {j}",
+                    "target": process,
+                }
+            )
+        for flow in rng.sample(flows, min(n_flows, flows_per_process)):
+            edges.append(
+                {
+                    "edge_type": QuantitativeEdgeTypes.biosphere,
+                    "amount": rng.random(),
+                    "source": process,
+                    "target": flow,
+                }
+            )
+
+    return {"nodes": nodes, "edges": edges}
+
+
+def graph_with_edges(n_edges: int, seed: int = 42) -> dict:
+    """
+    Synthetic graph with about `n_edges` edges.
+
+    The number of elementary flows grows with the graph (one per 500 edges,
+    between 10 and 1,000) and there is one product system per 1,000
+    processes, roughly the proportions of large LCA databases.
+    """
+    n_flows = min(max(n_edges // 500, 10), 1_000)
+    n_categories = 10
+    # Impact category and elementary flow edges, then 13 edges per process:
+    # two `belongs_to`, one production, five inputs and five emissions
+    fixed = n_categories + n_flows * (1 + n_categories)
+    n_processes = max((n_edges - fixed) // 13, 1)
+    return synthetic_graph(
+        n_processes,
+        n_flows=n_flows,
+        n_categories=n_categories,
+        n_product_systems=max(n_processes // 1_000, 1),
+        seed=seed,
+    )
@@ -0,0 +1,94 @@
+import pytest
+
+from bw_interface_schemas import Graph, graph_to_pydantic
+
+RULES = (
+    "edges_reference_nodes",
+    "processes_in_product_system",
+    "products_in_product_system",
+    "elementary_flows_in_product_system",
+    "process_has_at_least_one_functional_edge",
+    "edge_source_target_types",
+)
+
+
+def test_graph_to_pydantic(benchmark, data):
+    benchmark(graph_to_pydantic, data)
+    # Should stay roughly constant as the graph grows; no stats if disabled
+    if benchmark.stats:
+        benchmark.extra_info["us_per_edge"] = (
+            benchmark.stats.stats.min / len(data["edges"]) * 1e6
+        )
+
+
+def test_graph_to_pydantic_without_rules(benchmark, data):
+    benchmark(graph_to_pydantic, data, check_graph=False)
+
+
+def test_graph_to_pydantic_trusted(benchmark, data):
+    benchmark(graph_to_pydantic, data, trusted=True, check_graph=False)
+
+
+@pytest.mark.parametrize("trusted", [False, True], ids=["validated", "trusted"])
+def test_graph_to_pydantic_attributes(benchmark, data, trusted):
+    # Trusted loading doesn't copy nested lists and dictionaries
+    data = {
+        "nodes": {
+            identifier: node | {"tags": {"source": "synthetic"}}
+            for identifier, node in data["nodes"].items()
+        },
+        "edges": [
+            edge
+            | {
+                "tags": {"quality": [1, 2, 3]},
+                "properties": {"share": 0.5, "method": "measured"},
+                "comment": {"en": "synthetic"},
+            }
+            for edge in data["edges"]
+        ],
+    }
+    benchmark(graph_to_pydantic, data, trusted=trusted, check_graph=False)
+
+
+def test_build_index(benchmark, graph):
+    def build():
+        graph.reset_index()
+        graph._get_index()
+
+    benchmark(build)
+
+
+@pytest.mark.parametrize("rule", RULES)
+def test_rule(benchmark, graph, rule):
+    # Index is built by `graph_to_pydantic`, so only the rule is timed
+    check = getattr(graph, f"_check_{rule}")
+    assert not benchmark(lambda: list(check()))
+
+
+def test_validate_report(benchmark, graph):
+    def report():
+        graph.reset_index()
+        return graph.validate_report()
+
+    assert not benchmark(report)
+
+
+def test_model_dump(benchmark, graph):
+    benchmark(graph.model_dump)
+
+
+def test_model_dump_json(benchmark, graph):
+    benchmark(graph.model_dump_json)
+
+
+def test_from_json(benchmark, json_bytes):
+    benchmark(Graph.from_json, json_bytes)
+
+
+def test_json_roundtrip(benchmark, graph):
+    result = benchmark(lambda: Graph.from_json(graph.model_dump_json().encode()))
+    assert result == graph
+
+
+def test_from_json_file(benchmark, json_file):
+    benchmark(Graph.from_json, json_file)
@@ -5,8 +5,11 @@ __all__ = (
     "Collection",
     "DataSource",
     "Edge",
+    "EDGE_TYPE_RULES",
+    "EdgeTypeRule",
     "ElementaryFlow",
     "Graph",
+    "GraphPatch",
     "graph_to_pydantic",
     "ImpactAssessmentMethod",
     "ImpactCategory",
@@ -24,6 +27,7 @@ __all__ = (
     "QuantitativeEdge",
     "QuantitativeEdgeTypes",
     "TechnosphereQuantitativeEdge",
+    "Violation",
     "Weighting",
     "WeightingQuantitativeEdge",
 )
@@ -31,7 +35,13 @@ __all__ = (
 __version__ = "0.2"
 
 
-from bw_interface_schemas.graph import Graph, graph_to_pydantic
+from bw_interface_schemas.graph import (
+    EDGE_TYPE_RULES,
+    EdgeTypeRule,
+    Graph,
+    Violation,
+    graph_to_pydantic,
+)
 from bw_interface_schemas.models import (
     BiosphereQuantitativeEdge,
     CharacterizationQuantitativeEdge,
@@ -58,3 +68,4 @@ from bw_interface_schemas.models import (
     Weighting,
     WeightingQuantitativeEdge,
 )
+from bw_interface_schemas.patch import GraphPatch
@@ -0,0 +1,431 @@
+"""
+Binary columnar storage of graphs as Arrow IPC or Parquet files.
+
+Requires `pyarrow` and `numpy`; install with `pip install bw_interface_schemas[arrow]`.
+
+A graph is written to a directory with one table per node type
+(`nodes.<node_type>.<ext>`) and one per edge type (`edges.<edge_type>.<ext>`).
+Types are percent-encoded in filenames, and writing replaces any tables
+already in the directory.
+
+Node tables have an `index` column (position in `Graph.nodes`), an
+`identifier` column, and one column per attribute. Edge tables have a
+`position` column (position in `Graph.edges`), `source` and `target` node
+indices, and the numeric columns of `columnar.EdgeTable` (`amount`,
+uncertainty fields, `negative`, `functional`), which use `NaN` or `-1` instead
+of nulls so they can be read without copying, and a `fields_set` column for
+the rows where `model_fields_set` can't be inferred.
+
+Other attributes get their own `attributes.<name>` column: typed if every
+value is a string, number or boolean (e.g. `location`, `unit`), and JSON text
+otherwise (e.g. `tags`, `properties`). Nulls mean the attribute was not set.
+
+Arrow IPC files are memory-mapped when read. `read_edge_tables` gives one
+`EdgeTable` per edge type whose numeric, `source` and `target` columns are
+NumPy views of the file, without copies; `graph_to_matrices` accepts them
+directly. `read_edge_table` merges them in `Graph.edges` order, which copies
+the columns.
+"""
+
+import json
+from os import PathLike
+from pathlib import Path
+from typing import Any, Iterator
+from urllib.parse import quote
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+from pydantic_core import to_jsonable_python
+
+from bw_interface_schemas.columnar import (
+    BOOL_COLUMNS,
+    FLOAT_COLUMNS,
+    INT_COLUMNS,
+    EdgeTable,
+)
+from bw_interface_schemas.graph import (
+    EDGE_MAPPING,
+    NODE_MAPPING,
+    Graph,
+    graph_adapter,
+    paused_gc,
+)
+from bw_interface_schemas.models import Edge, Node
+
+METADATA_KEY = b"bw_interface_schemas"
+EXTENSIONS = {"arrow": "arrow", "parquet": "parquet"}
+NUMERIC_COLUMNS = list(FLOAT_COLUMNS) + list(INT_COLUMNS) + list(BOOL_COLUMNS)
+# Attribute columns are prefixed, so they can't clash with the columns above
+ATTRIBUTE_PREFIX = "attributes."
+# Marks values which were not set
+_UNSET = object()
+
+
+def _encode(values: list[Any]) -> tuple[pa.Array, bool]:
+    """
+    Arrow array for `values`, with `_UNSET` as null. Returns the array and
+    whether it is JSON encoded.
+    """
+    present = {type(value) for value in values if value is not _UNSET}
+    for kind, arrow_type in (
+        (str, pa.string()),
+        (float, pa.float64()),
+        (int, pa.int64()),
+        (bool, pa.bool_()),
+    ):
+        if present == {kind}:
+            return (
+                pa.array(
+                    [None if value is _UNSET else value for value in values],
+                    type=arrow_type,
+                ),
+                False,
+            )
+    return (
+        pa.array(
+            [
+                (
+                    None
+                    if value is _UNSET
+                    else json.dumps(to_jsonable_python(value), ensure_ascii=False)
+                )
+                for value in values
+            ],
+            type=pa.string(),
+        ),
+        True,
+    )
+
+
+def _decode(column: pa.ChunkedArray, is_json: bool) -> list[Any]:
+    """Python values of `column`, with `_UNSET` for nulls"""
+    values = column.to_pylist()
+    if is_json:
+        return [_UNSET if value is None else json.loads(value) for value in values]
+    return [_UNSET if value is None else value for value in values]
+
+
+def _attribute_columns(
+    rows: list[dict[str, Any]],
+) -> tuple[dict[str, pa.Array], list[str]]:
+    names = list(dict.fromkeys(name for row in rows for name in row))
+    columns, json_columns = {}, []
+    for name in names:
+        array, is_json = _encode([row.get(name, _UNSET) for row in rows])
+        columns[ATTRIBUTE_PREFIX + name] = array
+        if is_json:
+            json_columns.append(ATTRIBUTE_PREFIX + name)
+    return columns, json_columns
+
+
+def _read_attributes(table: pa.Table, json_columns: set[str]) -> dict[str, list[Any]]:
+    """`{attribute: values}` for the attribute columns with at least one value"""
+    return {
+        name.removeprefix(ATTRIBUTE_PREFIX): _decode(
+            table.column(name), name in json_columns
+        )
+        for name in table.column_names
+        if name.startswith(ATTRIBUTE_PREFIX)
+        and table.column(name).null_count < table.num_rows
+    }
+
+
+def _write_table(
+    columns: dict[str, pa.Array], metadata: dict, path: Path, format: str
+) -> None:
+    table = pa.table(columns).replace_schema_metadata(
+        {METADATA_KEY: json.dumps(metadata)}
+    )
+    if format == "parquet":
+        pq.write_table(table, path)
+    else:
+        with pa.OSFile(str(path), "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+
+
+def _read_table(path: Path) -> tuple[pa.Table, dict]:
+    if path.suffix == ".parquet":
+        table = pq.read_table(path, memory_map=True)
+    else:
+        table = pa.ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+    return table, json.loads(table.schema.metadata[METADATA_KEY])
+
+
+def _path(directory: Path, kind: str, type_: str, extension: str) -> Path:
+    # Percent-encoding keeps separators and dots out of the filename, and
+    # distinct types in distinct files
+    return directory / f"{kind}.{quote(type_, safe='')}.{extension}"
+
+
+def _tables(directory: Path, kind: str, format: str | None) -> list[Path]:
+    """
+    Tables of `kind` (`"nodes"` or `"edges"`) in `directory`, for `format`. If
+    `format` is `None`, it is inferred from the files present.
+    """
+    if format is None:
+        found = {
+            format
+            for format, extension in EXTENSIONS.items()
+            if any(directory.glob(f"*.*.{extension}"))
+        }
+        if len(found) > 1:
+            raise ValueError(
+                f"Found tables in several formats in {directory}; pass `format`"
+            )
+        format = found.pop() if found else "arrow"
+    elif format not in EXTENSIONS:
+        raise ValueError(f"Unknown format {format}; use one of {list(EXTENSIONS)}")
+    return sorted(directory.glob(f"{kind}.*.{EXTENSIONS[format]}"))
+
+
+def _to_numpy(column: pa.ChunkedArray) -> np.ndarray:
+    # Single chunks of primitive types without nulls are viewed, not copied
+    if column.num_chunks == 1:
+        return column.chunk(0).to_numpy(zero_copy_only=False)
+    return column.to_numpy()
+
+
+def write_graph(graph: Graph, directory: str | PathLike, format: str = "arrow") -> None:
+    """
+    Write `graph` to `directory` as Arrow IPC (`format="arrow"`) or Parquet
+    (`format="parquet"`) tables. Every edge must reference nodes in the graph.
+    """
+    if format not in EXTENSIONS:
+        raise ValueError(f"Unknown format {format}; use one of {list(EXTENSIONS)}")
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    extension = EXTENSIONS[format]
+    # Tables of types no longer in the graph would be read back otherwise
+    for old in EXTENSIONS:
+        for kind in ("nodes", "edges"):
+            for path in _tables(directory, kind, old):
+                path.unlink()
+
+    by_type: dict[str, list[tuple[int, Any, Node]]] = {}
+    for index, (identifier, node) in enumerate(graph.nodes.items()):
+        by_type.setdefault(str(node.node_type), []).append((index, identifier, node))
+    for node_type, rows in by_type.items():
+        identifiers, identifier_is_json = _encode([row[1] for row in rows])
+        columns, json_columns = _attribute_columns(
+            [row[2].model_dump(mode="json") for row in rows]
+        )
+        _write_table(
+            {
+                "index": pa.array([row[0] for row in rows], type=pa.int32()),
+                "identifier": identifiers,
+                **columns,
+            },
+            {
+                "kind": "node",
+                "type": node_type,
+                "json_columns": json_columns
+                + (["identifier"] if identifier_is_json else []),
+            },
+            _path(directory, "nodes", node_type, extension),
+            format,
+        )
+
+    positions: dict[str, list[int]] = {}
+    for position, edge in enumerate(graph.edges):
+        positions.setdefault(str(edge.edge_type), []).append(position)
+    for edge_type, rows in positions.items():
+        table = EdgeTable.from_edges(
+            (graph.edges[position] for position in rows), identifiers=graph.nodes
+        )
+        if len(table.identifiers) != len(graph.nodes):
+            raise ValueError(
+                f"Edges reference missing nodes: {table.identifiers[len(graph.nodes):]}"
+            )
+        attributes, json_columns = _attribute_columns(
+            [table.attributes.get(row, {}) for row in range(len(table))]
+        )
+        # Lists, so always JSON encoded
+        fields_set, _ = _encode(
+            [
+                sorted(table.fields_set[row]) if row in table.fields_set else _UNSET
+                for row in range(len(table))
+            ]
+        )
+        _write_table(
+            {
+                "position": pa.array(rows, type=pa.int64()),
+                "source": pa.array(table.source),
+                "target": pa.array(table.target),
+                **{name: pa.array(table.columns[name]) for name in NUMERIC_COLUMNS},
+                **attributes,
+                "fields_set": fields_set,
+            },
+            {"kind": "edge", "type": edge_type, "json_columns": json_columns},
+            _path(directory, "edges", edge_type, extension),
+            format,
+        )
+
+
+def _read_nodes(
+    directory: Path, format: str | None
+) -> tuple[list[Any], list[dict[str, Any]]]:
+    """Node identifiers and attribute dictionaries, in `Graph.nodes` order"""
+    indices, identifiers, nodes = [], [], []
+    for path in _tables(directory, "nodes", format):
+        table, metadata = _read_table(path)
+        json_columns = set(metadata["json_columns"])
+        indices.extend(table.column("index").to_pylist())
+        identifiers.extend(
+            _decode(table.column("identifier"), "identifier" in json_columns)
+        )
+        attributes = _read_attributes(table, json_columns)
+        for row in range(table.num_rows):
+            node = {
+                name: values[row]
+                for name, values in attributes.items()
+                if values[row] is not _UNSET
+            }
+            node.setdefault("node_type", metadata["type"])
+            nodes.append(node)
+    order = np.argsort(indices, kind="stable")
+    return [identifiers[i] for i in order], [nodes[i] for i in order]
+
+
+def _read_edges(
+    directory: Path,
+    edge_mapping: dict[str, type[Edge]],
+    format: str | None,
+    identifiers: list[Any],
+) -> Iterator[tuple[np.ndarray, EdgeTable]]:
+    """Positions in `Graph.edges` and `EdgeTable` of each edge table"""
+    for path in _tables(directory, "edges", format):
+        table, metadata = _read_table(path)
+        json_columns = set(metadata["json_columns"])
+        columns = {
+            name: _to_numpy(table.column(name))
+            for name in ("source", "target", *NUMERIC_COLUMNS)
+        }
+        # A single edge type and class, so all codes are zero
+        columns["edge_type"] = columns["edge_class"] = np.zeros(
+            table.num_rows, dtype=np.uint8
+        )
+        # Side tables are sparse, so only keep the rows which have values
+        attributes = {}
+        for name, values in _read_attributes(table, json_columns).items():
+            for row, value in enumerate(values):
+                if value is not _UNSET:
+                    attributes.setdefault(row, {})[name] = value
+        fields_set = {
+            row: frozenset(value)
+            for row, value in enumerate(_decode(table.column("fields_set"), True))
+            if value is not _UNSET
+        }
+        yield _to_numpy(table.column("position")), EdgeTable(
+            identifiers=identifiers,
+            edge_types=[metadata["type"]],
+            classes=[edge_mapping.get(metadata["type"], Edge)],
+            columns=columns,
+            attributes=attributes,
+            fields_set=fields_set,
+        )
+
+
+def read_edge_tables(
+    directory: str | PathLike,
+    edge_mapping: dict[str, type[Edge]] = EDGE_MAPPING,
+    format: str | None = None,
+    identifiers: list[Any] | None = None,
+) -> dict[str, EdgeTable]:
+    """
+    Read the edges written by `write_graph` as one `EdgeTable` per edge type,
+    with rows in `Graph.edges` order. `format` is inferred from the files if
+    not given. Pass the node `identifiers`, in `Graph.nodes` order, if they
+    were already read.
+
+    For Arrow IPC files, the numeric, `source` and `target` columns are views
+    of the memory-mapped file, so no per-edge Python objects or copies are
+    made.
+    """
+    directory = Path(directory)
+    if identifiers is None:
+        identifiers, _ = _read_nodes(directory, format)
+    return {
+        table.edge_types[0]: table
+        for _, table in _read_edges(directory, edge_mapping, format, identifiers)
+    }
+
+
+def read_edge_table(
+    directory: str | PathLike,
+    edge_mapping: dict[str, type[Edge]] = EDGE_MAPPING,
+    format: str | None = None,
+    identifiers: list[Any] | None = None,
+) -> EdgeTable:
+    """
+    Read the edges written by `write_graph` as a single `EdgeTable`, in
+    `Graph.edges` order. Arguments are as for `read_edge_tables`.
+
+    Numeric columns are built with vectorized NumPy operations, without
+    creating an object per edge, but merging the edge types copies them; use
+    `read_edge_tables` to keep views of the files.
+    """
+    directory = Path(directory)
+    if identifiers is None:
+        identifiers, _ = _read_nodes(directory, format)
+
+    parts = list(_read_edges(directory, edge_mapping, format, identifiers))
+    if not parts:
+        return EdgeTable.from_edges([], identifiers)
+    order = np.argsort(np.concatenate([positions for positions, _ in parts]))
+    new_row = np.empty_like(order)
+    new_row[order] = np.arange(len(order))
+
+    columns = {
+        name: np.concatenate([table.columns[name] for _, table in parts])[order]
+        for name in ("source", "target", *NUMERIC_COLUMNS)
+    }
+    columns["edge_type"] = np.concatenate(
+        [
+            np.full(len(table), code, dtype=np.uint8)
+            for code, (_, table) in enumerate(parts)
+        ]
+    )[order]
+    columns["edge_class"] = columns["edge_type"]
+    attributes, fields_set, offset = {}, {}, 0
+    for _, table in parts:
+        for row, value in table.attributes.items():
+            attributes[int(new_row[offset + row])] = value
+        for row, value in table.fields_set.items():
+            fields_set[int(new_row[offset + row])] = value
+        offset += len(table)
+    return EdgeTable(
+        identifiers=identifiers,
+        edge_types=[table.edge_types[0] for _, table in parts],
+        classes=[table.classes[0] for _, table in parts],
+        columns=columns,
+        attributes=attributes,
+        fields_set=fields_set,
+    )
+
+
+def read_graph(
+    directory: str | PathLike,
+    node_mapping: dict[str, type[Node]] = NODE_MAPPING,
+    edge_mapping: dict[str, type[Edge]] = EDGE_MAPPING,
+    check_graph: bool = True,
+    format: str | None = None,
+) -> Graph:
+    """
+    Read a graph written by `write_graph`, validating its nodes and edges.
+    `format` is inferred from the files if not given.
+    """
+    directory = Path(directory)
+    identifiers, nodes = _read_nodes(directory, format)
+    table = read_edge_table(directory, edge_mapping, format, identifiers)
+    with paused_gc():
+        data = graph_adapter(node_mapping, edge_mapping).validate_python(
+            {
+                "nodes": dict(zip(identifiers, nodes)),
+                "edges": [table.row_values(row) for row in range(len(table))],
+            }
+        )
+        return Graph.from_validated(
+            data["nodes"], data["edges"], check_graph=check_graph
+        )
@@ -0,0 +1,129 @@
+"""
+Content fingerprints for graph data, and a persistent cache of the
+fingerprints which passed validation.
+
+Loading data which was already validated, with the same library version and
+node and edge classes, can then skip validation, see
+`graph_to_pydantic(..., cache=...)` and `Graph.from_json(..., cache=...)`.
+"""
+
+from hashlib import blake2b
+from os import PathLike
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import pydantic
+from pydantic_core import to_json
+
+from bw_interface_schemas.models import Edge, Node
+
+if TYPE_CHECKING:
+    from bw_interface_schemas.graph import Graph
+
+
+def fingerprint(graph: dict[str, Any]) -> str:
+    """
+    Hash of the nodes and edges in `graph`, a dictionary in the
+    `graph_to_pydantic` input format.
+
+    Each node and edge is serialized to JSON by pydantic-core and fed to one
+    running hash, so the whole document is never held in memory. Equal data
+    gives equal fingerprints, but the order of nodes, edges and keys matters.
+    """
+    digest = blake2b(digest_size=16)
+    for identifier, node in graph["nodes"].items():
+        digest.update(to_json([identifier, node]))
+    for edge in graph["edges"]:
+        digest.update(to_json(edge))
+    return digest.hexdigest()
+
+
+def file_fingerprint(data: bytes | str | PathLike, chunk_size: int = 2**20) -> str:
+    """
+    Hash of JSON `bytes`, or of the contents of a file read in chunks of
+    `chunk_size` bytes. Unlike `fingerprint`, formatting changes the result.
+    """
+    digest = blake2b(digest_size=16)
+    if isinstance(data, (bytes, bytearray)):
+        digest.update(data)
+    else:
+        with open(data, "rb") as f:
+            while chunk := f.read(chunk_size):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _class_name(kls: type) -> str:
+    return f"{kls.__module__}.{kls.__qualname__}"
+
+
+class ValidationCache:
+    """
+    Keys of graphs which passed validation, stored in a text file with one
+    key per line.
+
+    A key combines a fingerprint with everything else validation depends on:
+    the versions of this library and of pydantic, the node and edge classes
+    used, and the `Graph` class with its `edge_type_rules`. Changing any of
+    them invalidates the cached entries.
+    """
+
+    def __init__(self, path: str | PathLike):
+        self.path = Path(path)
+        self._keys: set[str] | None = None
+
+    def key(
+        self,
+        fingerprint: str,
+        node_mapping: dict[str, type[Node]],
+        edge_mapping: dict[str, type[Edge]],
+        graph_class: "type[Graph] | None" = None,
+    ) -> str:
+        from bw_interface_schemas import __version__
+        from bw_interface_schemas.graph import Graph
+
+        graph_class = graph_class or Graph
+
+        digest = blake2b(digest_size=16)
+        for part in (
+            fingerprint,
+            __version__,
+            pydantic.VERSION,
+            *(f"{k}={_class_name(v)}" for k, v in sorted(node_mapping.items())),
+            *(f"{k}={_class_name(v)}" for k, v in sorted(edge_mapping.items())),
+            _class_name(graph_class),
+            *(
+                f"{k}={sorted(map(str, v.allowed))},{v.functional}"
+                for k, v in sorted(graph_class.edge_type_rules.items())
+            ),
+        ):
+            digest.update(part.encode())
+            digest.update(b"\n")
+        return digest.hexdigest()
+
+    @property
+    def keys(self) -> set[str]:
+        if self._keys is None:
+            try:
+                self._keys = set(self.path.read_text().split())
+            except FileNotFoundError:
+                self._keys = set()
+        return self._keys
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.keys
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def add(self, key: str) -> None:
+        if key in self.keys:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a") as f:
+            f.write(key + "\n")
+        self.keys.add(key)
+
+    def clear(self) -> None:
+        self.path.unlink(missing_ok=True)
+        self._keys = set()
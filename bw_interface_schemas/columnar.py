@@ -0,0 +1,218 @@
+"""
+Columnar, array-backed storage for `Graph` edges.
+
+Requires `numpy`; install with `pip install bw_interface_schemas[arrays]`.
+"""
+
+import math
+from typing import Any, Iterable, Iterator
+
+import numpy as np
+
+from bw_interface_schemas.graph import Graph
+from bw_interface_schemas.models import Edge, Identifier, Node
+
+# Edge attributes stored in NumPy columns, with the value marking "not set"
+FLOAT_COLUMNS = ("amount", "loc", "scale", "shape", "minimum", "maximum")
+INT_COLUMNS = {"uncertainty_type": (np.int16, -1)}
+BOOL_COLUMNS = ("negative", "functional")
+COLUMNS = frozenset(FLOAT_COLUMNS) | INT_COLUMNS.keys() | frozenset(BOOL_COLUMNS)
+
+
+class EdgeTable:
+    """
+    Edges stored as NumPy arrays, one row per edge.
+
+    Columns:
+
+    * `source`, `target`: integer indices into `identifiers`
+    * `edge_type`: integer codes into `edge_types`
+    * `edge_class`: integer codes into `classes`, the pydantic class of each edge
+    * `amount`, `loc`, `scale`, `shape`, `minimum`, `maximum`: floats, `NaN` if not set
+    * `uncertainty_type`: integer, `-1` if not set
+    * `negative`, `functional`: `1` for `True`, `0` for `False`, `-1` if not set
+
+    All other attributes, like `comment`, `tags`, `properties` and extra
+    fields, are kept in the sparse `attributes` side table, `{row: {field:
+    value}}`. Values which can't be stored in a column, like an explicit
+    `None`, also go there. `fields_set` records `model_fields_set` for the
+    rows where it can't be inferred from the columns.
+
+    Indexing and iteration build `Edge` objects on demand; these are new
+    objects each time, and changing them doesn't change the table.
+    """
+
+    def __init__(
+        self,
+        identifiers: list[Identifier],
+        edge_types: list[str],
+        classes: list[type[Edge]],
+        columns: dict[str, np.ndarray],
+        attributes: dict[int, dict[str, Any]],
+        fields_set: dict[int, frozenset[str]],
+    ):
+        self.identifiers = identifiers
+        self.edge_types = edge_types
+        self.classes = classes
+        self.columns = columns
+        self.attributes = attributes
+        self.fields_set = fields_set
+
+    def __getattr__(self, name: str) -> np.ndarray:
+        try:
+            return self.__dict__["columns"][name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __len__(self) -> int:
+        return len(self.columns["source"])
+
+    def __getitem__(self, row: int) -> Edge:
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError(row)
+        return self._edge(row)
+
+    def __iter__(self) -> Iterator[Edge]:
+        return (self._edge(row) for row in range(len(self)))
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the NumPy columns"""
+        return sum(array.nbytes for array in self.columns.values())
+
+    @classmethod
+    def from_edges(
+        cls, edges: Iterable[Edge], identifiers: Iterable[Identifier] = ()
+    ) -> "EdgeTable":
+        """
+        Build from `Edge` objects.
+
+        `identifiers` gives the node order used for the `source` and `target`
+        indices, normally `Graph.nodes`; identifiers not in `identifiers` are
+        appended in the order they are found.
+        """
+        edges = list(edges)
+        n = len(edges)
+        positions = {identifier: i for i, identifier in enumerate(identifiers)}
+        edge_types, classes = {}, {}
+        attributes, fields_set = {}, {}
+
+        # Filled as Python lists, which is much faster than setting NumPy
+        # array elements one at a time
+        data = {
+            name: [0] * n for name in ("source", "target", "edge_type", "edge_class")
+        }
+        for name in FLOAT_COLUMNS:
+            data[name] = [math.nan] * n
+        for name, (_, missing) in INT_COLUMNS.items():
+            data[name] = [missing] * n
+        for name in BOOL_COLUMNS:
+            data[name] = [-1] * n
+
+        for row, edge in enumerate(edges):
+            data["source"][row] = positions.setdefault(edge.source, len(positions))
+            data["target"][row] = positions.setdefault(edge.target, len(positions))
+            data["edge_type"][row] = edge_types.setdefault(
+                edge.edge_type, len(edge_types)
+            )
+            data["edge_class"][row] = classes.setdefault(type(edge), len(classes))
+
+            inferred = {"edge_type", "source", "target"}
+            extra = {}
+            for name in edge.model_fields_set | (edge.model_extra or {}).keys():
+                if name in inferred:
+                    continue
+                value = getattr(edge, name)
+                if name in COLUMNS and _fits_column(name, value):
+                    data[name][row] = value
+                else:
+                    extra[name] = value
+                inferred.add(name)
+            if extra:
+                attributes[row] = extra
+            if edge.model_fields_set != inferred:
+                fields_set[row] = frozenset(edge.model_fields_set)
+
+        # Fits in smaller integers for all but the largest graphs
+        index_dtype = np.int32 if len(positions) < 2**31 else np.int64
+        columns = {
+            "source": np.array(data["source"], dtype=index_dtype),
+            "target": np.array(data["target"], dtype=index_dtype),
+            "edge_type": np.array(data["edge_type"], dtype=np.uint8),
+            "edge_class": np.array(data["edge_class"], dtype=np.uint8),
+        }
+        for name in FLOAT_COLUMNS:
+            columns[name] = np.array(data[name], dtype=np.float64)
+        for name, (dtype, _) in INT_COLUMNS.items():
+            columns[name] = np.array(data[name], dtype=dtype)
+        for name in BOOL_COLUMNS:
+            columns[name] = np.array(data[name], dtype=np.int8)
+
+        return cls(
+            identifiers=list(positions),
+            edge_types=list(edge_types),
+            classes=list(classes),
+            columns=columns,
+            attributes=attributes,
+            fields_set=fields_set,
+        )
+
+    @classmethod
+    def from_graph(cls, graph: Graph) -> "EdgeTable":
+        """Build from `graph.edges`, with node indices in the order of `graph.nodes`."""
+        return cls.from_edges(graph.edges, identifiers=graph.nodes)
+
+    def to_edges(self) -> list[Edge]:
+        return list(self)
+
+    def to_graph(self, nodes: dict[Identifier, Node]) -> Graph:
+        """Build a `Graph` from `nodes` and the edges in this table."""
+        return Graph(nodes=nodes, edges=self.to_edges())
+
+    def _edge(self, row: int) -> Edge:
+        values = self.row_values(row)
+        # Rows were validated when the table was built
+        return self.classes[self.columns["edge_class"][row]].model_construct(
+            _fields_set=self.fields_set.get(row, set(values)), **values
+        )
+
+    def row_values(self, row: int) -> dict[str, Any]:
+        """The attributes of edge `row` which were set, as a dictionary"""
+        columns = self.columns
+        values = {
+            "edge_type": self.edge_types[columns["edge_type"][row]],
+            "source": self.identifiers[columns["source"][row]],
+            "target": self.identifiers[columns["target"][row]],
+        }
+        for name in FLOAT_COLUMNS:
+            if not math.isnan(value := columns[name][row]):
+                values[name] = float(value)
+        for name, (_, missing) in INT_COLUMNS.items():
+            if (value := columns[name][row]) != missing:
+                values[name] = int(value)
+        for name in BOOL_COLUMNS:
+            if (value := columns[name][row]) != -1:
+                values[name] = bool(value)
+        values.update(self.attributes.get(row, {}))
+        return values
+
+
+def _fits_column(name: str, value: Any) -> bool:
+    if name in FLOAT_COLUMNS:
+        return (
+            isinstance(value, (int, float))
+            and not isinstance(value, bool)
+            and not math.isnan(value)
+        )
+    if name in INT_COLUMNS:
+        dtype, missing = INT_COLUMNS[name]
+        info = np.iinfo(dtype)
+        return (
+            isinstance(value, int)
+            and not isinstance(value, bool)
+            and value != missing
+            and info.min <= value <= info.max
+        )
+    return isinstance(value, bool)
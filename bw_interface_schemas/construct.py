@@ -0,0 +1,207 @@
+"""
+Build nodes and edges from data which is known to be valid, without running
+the pydantic validators.
+
+`BaseModel.model_construct` is written in Python and is slower than
+validating in pydantic-core, so each class gets a builder which sets the
+instance attributes directly. Builders still convert the values which
+validation would change: integers in float fields, strings in enum fields,
+and nested models like `DataSource`, which are validated.
+
+Other values are used as given, so built objects share the lists and
+dictionaries of their input (e.g. `tags`, `properties` or `comment`), where
+validation would copy them. This is also where most of the time is saved;
+don't modify the input afterwards, or pass a copy.
+"""
+
+import math
+import random
+from copy import deepcopy
+from enum import Enum
+from functools import cache
+from types import NoneType, UnionType
+from typing import Annotated, Any, Callable, Literal, Union, get_args, get_origin
+
+from pydantic import BaseModel, TypeAdapter
+
+from bw_interface_schemas.graph import (
+    EDGE_MAPPING,
+    NODE_MAPPING,
+    Graph,
+    edge_adapter,
+    node_adapter,
+    paused_gc,
+)
+from bw_interface_schemas.models import Edge, Identifier, Node
+
+_IMMUTABLE = (NoneType, str, int, float, bool, tuple, frozenset, Enum)
+
+
+def _contains_model(annotation: Any) -> bool:
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return True
+    return any(_contains_model(arg) for arg in get_args(annotation))
+
+
+def _converter(annotation: Any) -> Callable[[Any], Any] | None:
+    """Function making a valid input value equal to the validated value, if needed"""
+    if _contains_model(annotation):
+        return TypeAdapter(annotation).validate_python
+
+    origin = get_origin(annotation)
+    if origin is Annotated:
+        return _converter(get_args(annotation)[0])
+    if origin in (Union, UnionType):
+        args = [arg for arg in get_args(annotation) if arg is not NoneType]
+        if len(args) != 1:
+            return None
+        annotation, origin = args[0], get_origin(args[0])
+
+    if annotation is float:
+        return lambda value: float(value) if type(value) is int else value
+    if isinstance(annotation, type) and issubclass(annotation, Enum):
+        return lambda value: (
+            value if isinstance(value, annotation) else annotation(value)
+        )
+    if origin is Literal:
+        members = {member: member for member in get_args(annotation)}
+        return lambda value: members.get(value, value)
+    return None
+
+
+@cache
+def builder(cls: type[BaseModel]) -> Callable[[dict[str, Any]], BaseModel]:
+    """
+    Function building an instance of `cls` from a dictionary of valid input,
+    with the same attributes and `model_fields_set` as `cls(**data)`.
+
+    Model validators are not run, and lists and dictionaries in `data` are
+    shared with the instance, not copied.
+    """
+    names = frozenset(cls.model_fields)
+    converters = {
+        name: converter
+        for name, field in cls.model_fields.items()
+        if (converter := _converter(field.annotation)) is not None
+    }
+    converted = frozenset(converters)
+    required = frozenset(
+        name for name, field in cls.model_fields.items() if field.is_required()
+    )
+    # Every field in order, so that `__dict__` has the same order as after
+    # validation; required fields are always overwritten by the input
+    template, factories = {}, {}
+    for name, field in cls.model_fields.items():
+        template[name] = None
+        if field.is_required():
+            continue
+        if field.default_factory is not None:
+            factories[name] = field.default_factory
+        elif isinstance(field.default, _IMMUTABLE):
+            template[name] = field.default
+        else:
+            factories[name] = lambda default=field.default: deepcopy(default)
+    new = cls.__new__
+    setattr_ = object.__setattr__
+
+    def build(data: dict[str, Any]) -> BaseModel:
+        if not required <= data.keys():
+            # Let pydantic raise the usual error
+            return cls.model_validate(data)
+        values = template.copy()
+        if factories:
+            for name, factory in factories.items():
+                if name not in data:
+                    values[name] = factory()
+        if data.keys() <= names:
+            values.update(data)
+            extra = {}
+        else:
+            values.update((key, data[key]) for key in data if key in names)
+            extra = {key: value for key, value in data.items() if key not in names}
+        for name in converted.intersection(data):
+            if (value := values[name]) is not None:
+                values[name] = converters[name](value)
+        # Like pydantic, extra keys are included in `model_fields_set`
+        fields_set = set(data)
+
+        obj = new(cls)
+        setattr_(obj, "__dict__", values)
+        setattr_(obj, "__pydantic_fields_set__", fields_set)
+        setattr_(obj, "__pydantic_extra__", extra)
+        setattr_(obj, "__pydantic_private__", None)
+        return obj
+
+    return build
+
+
+def construct_graph(
+    graph: dict[str, Any],
+    node_mapping: dict[str, type[Node]] = NODE_MAPPING,
+    edge_mapping: dict[str, type[Edge]] = EDGE_MAPPING,
+    check_graph: bool = False,
+    sample: float = 0.0,
+    seed: int | None = None,
+    graph_class: type[Graph] = Graph,
+) -> Graph:
+    """
+    Build a `graph_class` instance from a dictionary of nodes and edges which
+    is known to be valid, e.g. because it was validated before, without
+    validating the nodes and edges. They share the lists and dictionaries in
+    `graph`.
+
+    The structural rules are applied if `check_graph` is true. A random
+    fraction `sample` of the nodes and of the edges (at least one of each if
+    `sample` is positive) is fully validated as well; invalid records raise
+    the usual `ValidationError`, and records which validation would change
+    raise `ValueError`. `seed` makes the sample reproducible.
+    """
+    node_builders = {key: builder(kls) for key, kls in node_mapping.items()}
+    edge_builders = {key: builder(kls) for key, kls in edge_mapping.items()}
+    node_default, edge_default = builder(Node), builder(Edge)
+
+    with paused_gc():
+        nodes: dict[Identifier, Node] = {
+            identifier: node_builders.get(data.get("node_type"), node_default)(data)
+            for identifier, data in graph["nodes"].items()
+        }
+        edges = [
+            edge_builders.get(data.get("edge_type"), edge_default)(data)
+            for data in graph["edges"]
+        ]
+        if sample:
+            _validate_sample(
+                graph, nodes, edges, node_mapping, edge_mapping, sample, seed
+            )
+        return graph_class.from_validated(nodes, edges, check_graph=check_graph)
+
+
+def _validate_sample(
+    graph: dict[str, Any],
+    nodes: dict[Identifier, Node],
+    edges: list[Edge],
+    node_mapping: dict[str, type[Node]],
+    edge_mapping: dict[str, type[Edge]],
+    sample: float,
+    seed: int | None,
+) -> None:
+    rng = random.Random(seed)
+
+    def positions(n: int) -> list[int]:
+        return rng.sample(range(n), min(n, math.ceil(n * sample)))
+
+    identifiers = list(nodes)
+    adapter = node_adapter(node_mapping)
+    for position in positions(len(identifiers)):
+        identifier = identifiers[position]
+        if adapter.validate_python(graph["nodes"][identifier]) != nodes[identifier]:
+            raise ValueError(
+                f"Node {identifier!r} changes when validated; load it without "
+                "`trusted`"
+            )
+    adapter = edge_adapter(edge_mapping)
+    for position in positions(len(edges)):
+        if adapter.validate_python(graph["edges"][position]) != edges[position]:
+            raise ValueError(
+                f"Edge {position} changes when validated; load it without `trusted`"
+            )
@@ -1,8 +1,42 @@
+import gc
+import time
+from contextlib import contextmanager
 from copy import deepcopy
-from typing import Any, Self
+from functools import cache
+from os import PathLike
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Annotated,
+    Any,
+    Callable,
+    ClassVar,
+    Iterable,
+    Iterator,
+    NamedTuple,
+    Self,
+    Union,
+)
 
-from pydantic import BaseModel, model_validator
+import pydantic_core
+from pydantic import (
+    BaseModel,
+    Discriminator,
+    PrivateAttr,
+    SerializeAsAny,
+    Tag,
+    TypeAdapter,
+    ValidationError,
+    model_validator,
+)
+from typing_extensions import TypedDict
 
+from bw_interface_schemas.index import (
+    GraphIndex,
+    VersionedDict,
+    VersionedList,
+    versions,
+)
 from bw_interface_schemas.models import (
     BiosphereQuantitativeEdge,
     CharacterizationQuantitativeEdge,
@@ -26,6 +60,16 @@ from bw_interface_schemas.models import (
     Weighting,
     WeightingQuantitativeEdge,
 )
+from bw_interface_schemas.profiling import (
+    active_profile,
+    profiled_class,
+    profiled_rule,
+)
+
+if TYPE_CHECKING:
+    from bw_interface_schemas.cache import ValidationCache
+    from bw_interface_schemas.matrices import Matrices
+    from bw_interface_schemas.patch import GraphPatch
 
 NODE_MAPPING = {
     "project": Project,
@@ -48,11 +92,254 @@ EDGE_MAPPING = {
 }
 
 
+class EdgeTypeRule(NamedTuple):
+    """
+    Structural rule for one edge type.
+
+    `allowed` is the set of permitted `(source node_type, target node_type)`
+    pairs; `functional` means each edge must have a boolean `functional`
+    attribute.
+    """
+
+    allowed: frozenset[tuple[str, str]]
+    message: str
+    functional: bool = False
+
+
+EDGE_TYPE_RULES = {
+    QuantitativeEdgeTypes.technosphere: EdgeTypeRule(
+        allowed=frozenset(
+            {
+                (NodeTypes.process, NodeTypes.product),
+                (NodeTypes.product, NodeTypes.process),
+            }
+        ),
+        message="Technosphere edges must link a process and a product",
+        functional=True,
+    ),
+    QuantitativeEdgeTypes.biosphere: EdgeTypeRule(
+        allowed=frozenset({(NodeTypes.process, NodeTypes.elementary_flow)}),
+        message="Biosphere edges must link a process to an elementary flow",
+    ),
+    QuantitativeEdgeTypes.characterization: EdgeTypeRule(
+        allowed=frozenset({(NodeTypes.elementary_flow, NodeTypes.impact_category)}),
+        message="Characterization edges must link an elementary flow to an impact category",
+    ),
+    QuantitativeEdgeTypes.normalization: EdgeTypeRule(
+        allowed=frozenset({(NodeTypes.elementary_flow, NodeTypes.normalization)}),
+        message="Normalization edges must link an elementary flow to a normalization set",
+    ),
+    QuantitativeEdgeTypes.weighting: EdgeTypeRule(
+        allowed=frozenset(
+            {
+                (NodeTypes.weighting, NodeTypes.normalization),
+                (NodeTypes.weighting, NodeTypes.impact_category),
+            }
+        ),
+        message="Weighting edges must link a weighting set to an impact category or a normalization set",
+    ),
+}
+
+
+class Violation(BaseModel):
+    """
+    A single failed structural rule in a `Graph`.
+
+    `edge` is the position of the offending edge in `Graph.edges`, if the
+    rule applies to edges; `nodes` lists the node identifiers concerned.
+    """
+
+    rule: str
+    message: str
+    edge: int | None = None
+    nodes: list[Identifier] = []
+
+
 def getter(obj: Any, attr: str) -> Any:
-    """Retrieve `obj.attr` or `obj[attr]`"""
+    """Retrieve `obj.attr` or `obj[attr]`, or `None` if neither exists"""
     if hasattr(obj, attr):
         return getattr(obj, attr)
-    return obj.get(attr)
+    if isinstance(obj, dict):
+        return obj.get(attr)
+    return None
+
+
+@contextmanager
+def paused_gc() -> Iterator[None]:
+    """
+    Pause the cyclic garbage collector.
+
+    Bulk loading allocates millions of objects which are all kept, so the
+    collector's repeated full passes over them are wasted work.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+# Tag for node or edge types not in the mapping, validated with the base class
+DEFAULT_TAG = "__default__"
+
+
+def tagged_union(mapping: dict[str, type[BaseModel]], default: type, attr: str) -> Any:
+    """
+    Discriminated union of the classes in `mapping`, selected by the value of
+    `attr`. Values not in `mapping` use `default`.
+
+    Works for both dictionaries and model instances, so can be used for
+    validation and serialization.
+    """
+
+    def discriminator(obj: Any) -> str | None:
+        value = getter(obj, attr)
+        if value is None:
+            return None
+        return str(value) if value in mapping else DEFAULT_TAG
+
+    return Annotated[
+        Union[
+            tuple(Annotated[kls, Tag(str(key))] for key, kls in mapping.items())
+            + (Annotated[default, Tag(DEFAULT_TAG)],)
+        ],
+        Discriminator(discriminator),
+    ]
+
+
+def tagged_dump(obj: BaseModel, type_attr: str) -> dict[str, Any]:
+    """
+    `obj.model_dump(mode="json")`, always including `type_attr` so that the
+    data can be dispatched to the right class when read back.
+    """
+    data = obj.model_dump(mode="json")
+    data.setdefault(type_attr, str(getattr(obj, type_attr)))
+    return data
+
+
+@cache
+def _graph_adapter(
+    node_mapping: tuple[tuple[str, type[Node]], ...],
+    edge_mapping: tuple[tuple[str, type[Edge]], ...],
+    profiled: bool = False,
+) -> TypeAdapter:
+    wrap = profiled_class if profiled else lambda kls: kls
+    node_union = tagged_union(
+        {key: wrap(kls) for key, kls in node_mapping}, wrap(Node), "node_type"
+    )
+    edge_union = tagged_union(
+        {key: wrap(kls) for key, kls in edge_mapping}, wrap(Edge), "edge_type"
+    )
+
+    class GraphData(TypedDict):
+        nodes: dict[Identifier, node_union]
+        edges: list[edge_union]
+
+    return TypeAdapter(GraphData)
+
+
+def graph_adapter(
+    node_mapping: dict[str, type[Node]] = NODE_MAPPING,
+    edge_mapping: dict[str, type[Edge]] = EDGE_MAPPING,
+) -> TypeAdapter:
+    """
+    `TypeAdapter` validating a whole graph dictionary in one call, with nodes
+    and edges dispatched to their classes on `node_type` and `edge_type`.
+
+    Adapters are cached per mapping, so building the validator is only paid once.
+    Within `profiling.profile_validation`, the adapter also records the time
+    spent validating each node and edge class.
+    """
+    return _graph_adapter(
+        tuple(node_mapping.items()),
+        tuple(edge_mapping.items()),
+        active_profile() is not None,
+    )
+
+
+@cache
+def _union_adapter(
+    mapping: tuple[tuple[str, type[BaseModel]], ...], default: type, attr: str
+) -> TypeAdapter:
+    return TypeAdapter(tagged_union(dict(mapping), default, attr))
+
+
+def node_adapter(node_mapping: dict[str, type[Node]] = NODE_MAPPING) -> TypeAdapter:
+    """Cached `TypeAdapter` validating one node, dispatched on `node_type`"""
+    return _union_adapter(tuple(node_mapping.items()), Node, "node_type")
+
+
+def edge_adapter(edge_mapping: dict[str, type[Edge]] = EDGE_MAPPING) -> TypeAdapter:
+    """Cached `TypeAdapter` validating one edge, dispatched on `edge_type`"""
+    return _union_adapter(tuple(edge_mapping.items()), Edge, "edge_type")
+
+
+def class_union(classes: Iterable[type[BaseModel]], default: type) -> Any:
+    """
+    Union of `classes`, selected by the exact class of each instance.
+
+    Used for serialization: each instance is serialized with the schema of its
+    own class. Instances of other classes are serialized as `default` with
+    `SerializeAsAny`, which looks up their schema at runtime.
+    """
+    tags = {kls: f"{kls.__module__}.{kls.__qualname__}" for kls in classes}
+    return Annotated[
+        Union[
+            tuple(Annotated[kls, Tag(tag)] for kls, tag in tags.items())
+            + (Annotated[SerializeAsAny[default], Tag(DEFAULT_TAG)],)
+        ],
+        Discriminator(lambda obj: tags.get(type(obj), DEFAULT_TAG)),
+    ]
+
+
+@cache
+def _serialization_adapter(
+    node_classes: tuple[type[Node], ...], edge_classes: tuple[type[Edge], ...]
+) -> TypeAdapter:
+    class GraphData(TypedDict):
+        nodes: dict[Identifier, class_union(node_classes, Node)]
+        edges: list[class_union(edge_classes, Edge)]
+
+    return TypeAdapter(GraphData)
+
+
+def serialization_adapter() -> TypeAdapter:
+    """
+    `TypeAdapter` serializing the nodes and edges of a graph in one call, for
+    the classes in `NODE_MAPPING` and `EDGE_MAPPING`.
+    """
+    return _serialization_adapter(
+        tuple(dict.fromkeys([Node, *NODE_MAPPING.values()])),
+        tuple(dict.fromkeys([Edge, *EDGE_MAPPING.values()])),
+    )
+
+
+def violation_error(title: str, violation: Violation, input: Any) -> ValidationError:
+    """`ValidationError` for a structural rule violation, as `Graph(...)` raises"""
+    return ValidationError.from_exception_data(
+        title,
+        [
+            {
+                "type": "value_error",
+                "loc": (),
+                "input": input,
+                "ctx": {"error": ValueError(violation.message)},
+            }
+        ],
+    )
+
+
+def _scanned_edges(graph: "Graph", edges: list | None = None) -> int:
+    return len(graph.edges if edges is None else edges)
+
+
+def _scanned_nodes(node_type: NodeTypes) -> Callable[..., int]:
+    def scanned(graph: "Graph", nodes: list | None = None) -> int:
+        return len(graph._nodes_of_type(node_type, nodes))
+
+    return scanned
 
 
 class Graph(BaseModel):
@@ -66,191 +353,719 @@ class Graph(BaseModel):
     nodes: dict[Identifier, Node]
     edges: list[Edge]
 
-    def model_dump(self, *args, serialize_as_any=True, **kwargs) -> dict:
-        # Current implementation is succinct - nodes are instance of `Node`, edges of `Edge`. But
-        # this doesn't work with Pydantic, which will use the `Node` serializer instead of the
-        # specific subclass serializer. So we have to stop Pydantic from being so pedantic.
-        # See https://github.com/pydantic/pydantic/discussions/3293
-        kwargs["serialize_as_any"] = serialize_as_any
-        return super().model_dump(*args, **kwargs)
+    # Allowed source and target node types per edge type. Subclasses can
+    # extend or replace this table to support custom edge types.
+    edge_type_rules: ClassVar[dict[str, EdgeTypeRule]] = EDGE_TYPE_RULES
 
-    @model_validator(mode="after")
-    def edges_reference_nodes(self) -> Self:
-        for edge in self.edges:
-            if edge.source not in self.nodes:
-                raise ValueError(f"Can't find edge source in nodes: {edge.source}")
-            if edge.target not in self.nodes:
-                raise ValueError(f"Can't find edge target in nodes: {edge.target}")
-        return self
+    _index: GraphIndex | None = PrivateAttr(default=None)
+    _node_ids: tuple[tuple[int, ...], dict[Identifier, int]] | None = PrivateAttr(
+        default=None
+    )
 
-    def _objects_linked_to_product_system(self, label: str) -> None:
-        objects = (
-            identifier
-            for identifier, node in self.nodes.items()
-            if node.node_type == getattr(NodeTypes, label)
+    # Current implementation is succinct - nodes are instance of `Node`, edges of `Edge`. But
+    # this doesn't work with Pydantic, which will use the `Node` serializer instead of the
+    # specific subclass serializer. `serialize_as_any` fixes this, but looks up the
+    # serializer of every object at runtime, which is slow. Instead we serialize with a
+    # union over the known node and edge classes, which pydantic-core can dispatch on
+    # directly. See https://github.com/pydantic/pydantic/discussions/3293
+
+    def model_dump(self, **kwargs) -> dict:
+        if type(self).model_fields.keys() != {"nodes", "edges"}:
+            return super().model_dump(**({"serialize_as_any": True} | kwargs))
+        return serialization_adapter().dump_python(
+            {"nodes": self.nodes, "edges": self.edges}, **kwargs
         )
-        product_systems = {
-            identifier
-            for identifier, node in self.nodes.items()
-            if node.node_type == NodeTypes.product_system
-        }
 
-        for obj in objects:
-            if not any(
-                edge.source == obj
-                and edge.target in product_systems
-                and edge.edge_type == QualitativeEdgeTypes.belongs_to
-                for edge in self.edges
+    def model_dump_json(self, **kwargs) -> str:
+        if type(self).model_fields.keys() != {"nodes", "edges"}:
+            return super().model_dump_json(**({"serialize_as_any": True} | kwargs))
+        return (
+            serialization_adapter()
+            .dump_json({"nodes": self.nodes, "edges": self.edges}, **kwargs)
+            .decode("utf-8")
+        )
+
+    def __eq__(self, other: Any) -> bool:
+        # Pydantic also compares private attributes, but `_index` is only a cache
+        if not isinstance(other, Graph):
+            return NotImplemented
+        return (
+            type(self) is type(other)
+            and self.__dict__ == other.__dict__
+            and self.__pydantic_extra__ == other.__pydantic_extra__
+        )
+
+    def model_post_init(self, context: Any) -> None:
+        self._replace(nodes=self.nodes, edges=self.edges)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        # The cached indexes describe the old `nodes` and `edges`
+        if name in ("nodes", "edges"):
+            self.reset_index()
+            value = self._versioned(name, value)
+        super().__setattr__(name, value)
+
+    def _replace(self, **fields: Any) -> None:
+        # Assign `nodes` or `edges` for methods which update the index themselves
+        self.__dict__.update(
+            {name: self._versioned(name, value) for name, value in fields.items()}
+        )
+
+    @staticmethod
+    def _versioned(name: str, value: Any) -> Any:
+        # Counts the changes made in place, so that the cached indexes notice them
+        versioned = VersionedDict if name == "nodes" else VersionedList
+        return value if isinstance(value, versioned) else versioned(value)
+
+    def _versions(self) -> tuple[int, ...]:
+        return versions(self.nodes, self.edges)
+
+    @classmethod
+    def from_validated(
+        cls,
+        nodes: dict[Identifier, Node],
+        edges: list[Edge],
+        check_graph: bool = True,
+    ) -> Self:
+        """
+        Build from nodes and edges which are already validated model instances,
+        without validating them again.
+
+        If `check_graph`, the structural rules are applied, raising
+        `ValidationError` on the first violation as `Graph(...)` would.
+        """
+        graph = cls.model_construct(nodes=nodes, edges=edges)
+        graph.intern_identifiers()
+        if check_graph:
+            for violation in graph._violations():
+                raise violation_error(
+                    cls.__name__, violation, {"nodes": nodes, "edges": edges}
+                )
+        return graph
+
+    @classmethod
+    def from_json(
+        cls,
+        data: bytes | str | PathLike,
+        node_mapping: dict[str, type[Node]] = NODE_MAPPING,
+        edge_mapping: dict[str, type[Edge]] = EDGE_MAPPING,
+        check_graph: bool = True,
+        cache: "ValidationCache | None" = None,
+        force: bool = False,
+    ) -> Self:
+        """
+        Load a graph from JSON, in the same format as `graph_to_pydantic`.
+
+        `data` is either the JSON document as `bytes`, or a path to a JSON file.
+        The JSON is parsed straight into the node and edge classes by
+        pydantic-core, without building intermediate Python dictionaries.
+
+        With a `cache.ValidationCache`, documents whose bytes already passed
+        validation (including the structural rules) are built without being
+        validated again, unless `force` is true.
+        """
+        if not isinstance(data, (bytes, bytearray)):
+            data = Path(data).read_bytes()
+        key = None
+        if cache is not None:
+            from bw_interface_schemas.cache import file_fingerprint
+
+            key = cache.key(file_fingerprint(data), node_mapping, edge_mapping, cls)
+            if not force and key in cache:
+                from bw_interface_schemas.construct import construct_graph
+
+                return construct_graph(
+                    pydantic_core.from_json(data),
+                    node_mapping,
+                    edge_mapping,
+                    graph_class=cls,
+                )
+        with paused_gc():
+            validated = graph_adapter(node_mapping, edge_mapping).validate_json(data)
+            graph = cls.from_validated(
+                validated["nodes"], validated["edges"], check_graph=check_graph
+            )
+        if key is not None and check_graph:
+            cache.add(key)
+        return graph
+
+    def to_matrices(self, format: str = "csr") -> "Matrices":
+        """
+        Build the technosphere, biosphere and characterization matrices as
+        `scipy.sparse` arrays.
+
+        See `bw_interface_schemas.matrices.graph_to_matrices`. Requires `numpy`
+        and `scipy`.
+        """
+        from bw_interface_schemas.matrices import graph_to_matrices
+
+        return graph_to_matrices(self, format=format)
+
+    def intern_identifiers(self, edges: Iterable[Edge] | None = None) -> None:
+        """
+        Make the `source` and `target` of each edge (by default, every edge)
+        the same object as the matching key of `Graph.nodes`.
+
+        Loaded data usually has a separate copy of each identifier string per
+        edge. Sharing one object saves that memory, and lets dictionary lookups
+        match on identity instead of comparing strings. Called when loading.
+        """
+        if edges is None:
+            self._intern(
+                self.edges, {identifier: identifier for identifier in self.nodes}
+            )
+        else:
+            # Kept up to date by the index, instead of going through all nodes
+            self._intern(edges, self._get_index().canonical)
+
+    @staticmethod
+    def _intern(edges: Iterable[Edge], canonical: dict[Identifier, Identifier]) -> None:
+        for edge in edges:
+            # Assigned directly, as the value is unchanged and
+            # `model_fields_set` must not be
+            values = edge.__dict__
+            values["source"] = canonical.get(values["source"], values["source"])
+            values["target"] = canonical.get(values["target"], values["target"])
+
+    def node_ids(self) -> dict[Identifier, int]:
+        """
+        Dense integer ids for the nodes, `{identifier: id}`, following the
+        order of `Graph.nodes`.
+
+        These are the node indices used by `columnar.EdgeTable.from_graph`.
+        Cached until `Graph.nodes` changes.
+        """
+        key = self._versions()[:2]
+        if self._node_ids is None or self._node_ids[0] != key:
+            self._node_ids = key, {
+                identifier: position for position, identifier in enumerate(self.nodes)
+            }
+        return self._node_ids[1]
+
+    def reset_index(self) -> None:
+        """
+        Drop the cached indexes used by validation and queries.
+
+        The `Graph` methods keep them up to date, and any other change to
+        `nodes` or `edges`, assigning new ones or changing them in place, drops
+        them. Changes to the node and edge objects themselves, e.g. to
+        `edge.source`, are not noticed; call this afterwards.
+        `validate_report` always rebuilds them.
+        """
+        self._index = None
+        self._node_ids = None
+
+    def _get_index(self) -> GraphIndex:
+        # Built once and shared by all validators and queries, so that each
+        # structural rule is linear in the number of nodes or edges it concerns.
+        index = self._index
+        if index is None or index.versions != self._versions():
+            index = self._index = GraphIndex(self.nodes, self.edges)
+            index.versions = self._versions()
+        return index
+
+    def nodes_of_type(self, node_type: str) -> list[Identifier]:
+        """Identifiers of the nodes with `node_type`"""
+        return list(self._get_index().nodes_of_type(node_type))
+
+    def edges_of_type(self, edge_type: str) -> list[Edge]:
+        """Edges with `edge_type`, in the order of `Graph.edges`"""
+        return list(self._get_index().edges_of_type(edge_type))
+
+    def out_edges(self, node: Identifier, edge_type: str | None = None) -> list[Edge]:
+        """
+        Edges with `node` as source, of `edge_type` or of any type. Edges of
+        any type are grouped by type.
+        """
+        by_type = self._get_index().outgoing.get(node, {})
+        if edge_type is not None:
+            return list(by_type.get(edge_type, {}).values())
+        return [edge for edges in by_type.values() for edge in edges.values()]
+
+    def in_edges(self, node: Identifier, edge_type: str | None = None) -> list[Edge]:
+        """Edges with `node` as target; see `out_edges`."""
+        by_type = self._get_index().incoming.get(node, {})
+        if edge_type is not None:
+            return list(by_type.get(edge_type, {}).values())
+        return [edge for edges in by_type.values() for edge in edges.values()]
+
+    def successors(
+        self, node: Identifier, edge_type: str | None = None
+    ) -> list[Identifier]:
+        """
+        Targets of the edges from `node`, without duplicates. For example,
+        `graph.successors(process, "biosphere")` gives its elementary flows.
+        """
+        return list(
+            dict.fromkeys(edge.target for edge in self.out_edges(node, edge_type))
+        )
+
+    def predecessors(
+        self, node: Identifier, edge_type: str | None = None
+    ) -> list[Identifier]:
+        """
+        Sources of the edges to `node`, without duplicates. For example,
+        `graph.predecessors(process, "technosphere")` gives the products it
+        consumes.
+        """
+        return list(
+            dict.fromkeys(edge.source for edge in self.in_edges(node, edge_type))
+        )
+
+    def members_of(self, node: Identifier) -> list[Identifier]:
+        """
+        Nodes which belong to `node`, e.g. a product system or an impact
+        assessment method
+        """
+        return self.predecessors(node, QualitativeEdgeTypes.belongs_to)
+
+    def upstream_subgraph(
+        self, product_ids: Iterable[Identifier], depth: int | None = None
+    ) -> Self:
+        """
+        The part of the graph needed to model `product_ids`.
+
+        Starting from the products, follows functional technosphere edges to
+        the processes supplying them, and their other technosphere edges to
+        the products they consume, for up to `depth` levels of processes (all
+        levels if `None`). Adds the biosphere flows of the included processes,
+        the characterization edges and impact categories of those flows, and
+        the `belongs_to` edges of everything included.
+
+        Processes can also be given in `product_ids`. They are included with
+        all their technosphere edges, and `depth` counts the levels of
+        processes supplying them.
+
+        Nodes and edges are shared with this graph, not copied. If this graph
+        is valid, so is the subgraph, so it isn't validated again.
+        """
+        index = self._get_index()
+        nodes = self.nodes
+        technosphere = QuantitativeEdgeTypes.technosphere
+
+        def technosphere_edges(node: Identifier) -> Iterator[tuple[Edge, Identifier]]:
+            for edge in index.outgoing_edges(node, technosphere):
+                yield edge, edge.target
+            for edge in index.incoming_edges(node, technosphere):
+                yield edge, edge.source
+
+        seeds = list(dict.fromkeys(product_ids))
+        for identifier in seeds:
+            if identifier not in nodes:
+                raise KeyError(identifier)
+        included = set(seeds)
+        traversed = set(seeds)
+        processes = []
+        edges: dict[int, Edge] = {}
+
+        def add_process(process: Identifier, frontier: list[Identifier]) -> None:
+            included.add(process)
+            processes.append(process)
+            for link, other in technosphere_edges(process):
+                if other not in nodes:
+                    continue
+                edges[id(link)] = link
+                included.add(other)
+                # Co-products don't need their suppliers
+                if not getattr(link, "functional", False) and other not in traversed:
+                    traversed.add(other)
+                    frontier.append(other)
+
+        frontier = []
+        for identifier in seeds:
+            if nodes[identifier].node_type == NodeTypes.process:
+                add_process(identifier, frontier)
+            else:
+                frontier.append(identifier)
+        level = 0
+        while frontier and (depth is None or level < depth):
+            level += 1
+            next_frontier = []
+            for product in frontier:
+                for edge, process in technosphere_edges(product):
+                    if (
+                        getattr(edge, "functional", False)
+                        and process not in included
+                        and process in nodes
+                        and nodes[process].node_type == NodeTypes.process
+                    ):
+                        add_process(process, next_frontier)
+            frontier = next_frontier
+
+        flows = []
+        for process in processes:
+            for edge in index.outgoing_edges(process, QuantitativeEdgeTypes.biosphere):
+                if edge.target in nodes:
+                    edges[id(edge)] = edge
+                    if edge.target not in included:
+                        included.add(edge.target)
+                        flows.append(edge.target)
+        for flow in flows:
+            for edge in index.outgoing_edges(
+                flow, QuantitativeEdgeTypes.characterization
             ):
-                raise ValueError(f"{label} node not linked to a product system: {obj}")
+                if edge.target in nodes:
+                    edges[id(edge)] = edge
+                    included.add(edge.target)
 
-    @model_validator(mode="after")
-    def processes_in_product_system(self) -> Self:
-        self._objects_linked_to_product_system(label=NodeTypes.process)
-        return self
+        # Product systems, methods and any collections they belong to in turn
+        queue = list(included)
+        while queue:
+            for edge in index.outgoing_edges(
+                queue.pop(), QualitativeEdgeTypes.belongs_to
+            ):
+                if edge.target in nodes:
+                    edges[id(edge)] = edge
+                    if edge.target not in included:
+                        included.add(edge.target)
+                        queue.append(edge.target)
 
-    @model_validator(mode="after")
-    def products_in_product_system(self) -> Self:
-        self._objects_linked_to_product_system(label=NodeTypes.product)
-        return self
+        return type(self).from_validated(
+            {
+                identifier: node
+                for identifier, node in nodes.items()
+                if identifier in included
+            },
+            [edge for edge in self.edges if id(edge) in edges],
+            check_graph=False,
+        )
 
-    @model_validator(mode="after")
-    def elementary_flows_in_product_system(self) -> Self:
-        self._objects_linked_to_product_system(label=NodeTypes.elementary_flow)
+    def _raise_first(self, violations: Iterable[Violation]) -> Self:
+        for violation in violations:
+            raise ValueError(violation.message)
         return self
 
-    @model_validator(mode="after")
-    def process_has_at_least_one_functional_edge(self) -> Self:
-        processes = {
+    def validate_report(self) -> list[Violation]:
+        """
+        Check all structural rules, returning every violation found instead of
+        raising on the first one.
+
+        Use on a graph built without structural checks, e.g.
+        `graph_to_pydantic(data, check_graph=False)`. Returns an empty list if
+        the graph is valid.
+
+        The cached indexes are rebuilt first, so changes made to `nodes` or
+        `edges` in place are taken into account.
+        """
+        self.reset_index()
+        return list(self._violations())
+
+    def _violations(
+        self,
+        nodes: Iterable[Identifier] | None = None,
+        edges: Iterable[tuple[int, Edge]] | None = None,
+    ) -> Iterator[Violation]:
+        """
+        Run all structural rules. If given, node rules are only applied to the
+        identifiers in `nodes`, and edge rules to the `(position, edge)` pairs
+        in `edges`.
+        """
+        if nodes is not None:
+            nodes = list(nodes)
+        if edges is not None:
+            edges = list(edges)
+        yield from self._check_edges_reference_nodes(edges)
+        yield from self._check_processes_in_product_system(nodes)
+        yield from self._check_products_in_product_system(nodes)
+        yield from self._check_elementary_flows_in_product_system(nodes)
+        yield from self._check_process_has_at_least_one_functional_edge(nodes)
+        yield from self._check_edge_source_target_types(edges)
+
+    def _nodes_of_type(
+        self, node_type: str, nodes: Iterable[Identifier] | None
+    ) -> Iterable[Identifier]:
+        if nodes is None:
+            return self._get_index().nodes_of_type(node_type)
+        return [
             identifier
-            for identifier, node in self.nodes.items()
-            if node.node_type == NodeTypes.process
-        }
+            for identifier in nodes
+            if identifier in self.nodes
+            and self.nodes[identifier].node_type == node_type
+        ]
 
-        for process in processes:
+    @profiled_rule("edges_reference_nodes", _scanned_edges)
+    def _check_edges_reference_nodes(
+        self, edges: Iterable[tuple[int, Edge]] | None = None
+    ) -> Iterator[Violation]:
+        nodes = self.nodes
+        for position, edge in enumerate(self.edges) if edges is None else edges:
+            if edge.source not in nodes:
+                yield Violation(
+                    rule="edges_reference_nodes",
+                    message=f"Can't find edge source in nodes: {edge.source}",
+                    edge=position,
+                    nodes=[edge.source],
+                )
+            if edge.target not in nodes:
+                yield Violation(
+                    rule="edges_reference_nodes",
+                    message=f"Can't find edge target in nodes: {edge.target}",
+                    edge=position,
+                    nodes=[edge.target],
+                )
+
+    def _check_objects_linked_to_product_system(
+        self, label: str, rule: str, nodes: Iterable[Identifier] | None
+    ) -> Iterator[Violation]:
+        index = self._get_index()
+
+        for obj in self._nodes_of_type(getattr(NodeTypes, label), nodes):
             if not any(
-                (edge.source == process or edge.target == process)
-                and edge.edge_type == QuantitativeEdgeTypes.technosphere
-                and edge.functional
-                for edge in self.edges
+                edge.target in self.nodes
+                and self.nodes[edge.target].node_type == NodeTypes.product_system
+                for edge in index.outgoing_edges(obj, QualitativeEdgeTypes.belongs_to)
             ):
-                raise ValueError(
-                    f"Can't find functional edge for process node: {process}"
+                yield Violation(
+                    rule=rule,
+                    message=f"{label} node not linked to a product system: {obj}",
+                    nodes=[obj],
+                )
+
+    @profiled_rule("processes_in_product_system", _scanned_nodes(NodeTypes.process))
+    def _check_processes_in_product_system(
+        self, nodes: Iterable[Identifier] | None = None
+    ) -> Iterator[Violation]:
+        return self._check_objects_linked_to_product_system(
+            label=NodeTypes.process, rule="processes_in_product_system", nodes=nodes
+        )
+
+    @profiled_rule("products_in_product_system", _scanned_nodes(NodeTypes.product))
+    def _check_products_in_product_system(
+        self, nodes: Iterable[Identifier] | None = None
+    ) -> Iterator[Violation]:
+        return self._check_objects_linked_to_product_system(
+            label=NodeTypes.product, rule="products_in_product_system", nodes=nodes
+        )
+
+    @profiled_rule(
+        "elementary_flows_in_product_system", _scanned_nodes(NodeTypes.elementary_flow)
+    )
+    def _check_elementary_flows_in_product_system(
+        self, nodes: Iterable[Identifier] | None = None
+    ) -> Iterator[Violation]:
+        return self._check_objects_linked_to_product_system(
+            label=NodeTypes.elementary_flow,
+            rule="elementary_flows_in_product_system",
+            nodes=nodes,
+        )
+
+    @profiled_rule(
+        "process_has_at_least_one_functional_edge", _scanned_nodes(NodeTypes.process)
+    )
+    def _check_process_has_at_least_one_functional_edge(
+        self, nodes: Iterable[Identifier] | None = None
+    ) -> Iterator[Violation]:
+        index = self._get_index()
+
+        for process in self._nodes_of_type(NodeTypes.process, nodes):
+            if not any(
+                getattr(edge, "functional", False)
+                for edges in (
+                    index.outgoing_edges(process, QuantitativeEdgeTypes.technosphere),
+                    index.incoming_edges(process, QuantitativeEdgeTypes.technosphere),
+                )
+                for edge in edges
+            ):
+                yield Violation(
+                    rule="process_has_at_least_one_functional_edge",
+                    message=f"Can't find functional edge for process node: {process}",
+                    nodes=[process],
                 )
-        return self
 
     # TBD: LCIA associations
 
-    @model_validator(mode="after")
-    def biosphere_edge_source_target_types(self) -> Self:
-        for edge in filter(
-            lambda x: getter(x, "edge_type") == QuantitativeEdgeTypes.biosphere,
-            self.edges,
-        ):
-            if not (
-                getter(self.nodes[edge.source], "node_type") == NodeTypes.process
-                and getter(self.nodes[edge.target], "node_type")
-                == NodeTypes.elementary_flow
-            ) or (
-                getter(self.nodes[edge.target], "node_type") == NodeTypes.process
-                and getter(self.nodes[edge.source], "node_type")
-                == NodeTypes.elementary_flow
+    @profiled_rule("edge_source_target_types", _scanned_edges)
+    def _check_edge_source_target_types(
+        self, edges: Iterable[tuple[int, Edge]] | None = None
+    ) -> Iterator[Violation]:
+        # One pass over all edges, dispatching on `edge_type` to the rule table
+        rules = self.edge_type_rules
+        nodes = self.nodes
+        for position, edge in enumerate(self.edges) if edges is None else edges:
+            rule = rules.get(edge.edge_type)
+            if rule is None or edge.source not in nodes or edge.target not in nodes:
+                continue
+            if (
+                nodes[edge.source].node_type,
+                nodes[edge.target].node_type,
+            ) not in rule.allowed:
+                yield Violation(
+                    rule=f"{edge.edge_type}_edge_source_target_types",
+                    message=f"{rule.message} ({edge})",
+                    edge=position,
+                    nodes=[edge.source, edge.target],
+                )
+            if rule.functional and not isinstance(
+                getattr(edge, "functional", None), bool
             ):
-                raise ValueError(
-                    f"Biosphere edges must link a process to an elementary flow ({edge})"
+                yield Violation(
+                    rule=f"{edge.edge_type}_edge_must_specify_functionality",
+                    message=f"{edge.edge_type.capitalize()} edges must indicate functionality status ({edge})",
+                    edge=position,
+                    nodes=[edge.source, edge.target],
                 )
-        return self
 
-    @model_validator(mode="after")
-    def weighting_edge_source_target_types(self) -> Self:
-        for edge in filter(
-            lambda x: getter(x, "edge_type") == QuantitativeEdgeTypes.weighting,
-            self.edges,
+    def add(
+        self,
+        nodes: dict[Identifier, Node] | None = None,
+        edges: Iterable[Edge] = (),
+    ) -> None:
+        """
+        Add `nodes` and `edges` to the graph.
+
+        Only the structural rules affected by the new nodes and edges are
+        checked. If any fails, the graph is left unchanged and `ValueError` is
+        raised. Nodes and edges which must be added together, like a process
+        with its functional and `belongs_to` edges, must be added in one call.
+        """
+        nodes = dict(nodes or {})
+        edges = list(edges)
+        if duplicates := nodes.keys() & self.nodes.keys():
+            raise ValueError(f"Nodes already in graph: {sorted(map(str, duplicates))}")
+
+        index = self._get_index()
+        start = len(self.edges)
+        self.nodes.update(nodes)
+        for identifier, node in nodes.items():
+            index.add_node(identifier, node)
+        self._intern(edges, index.canonical)
+        self.edges.extend(edges)
+        index.add_edges(edges)
+        index.versions = self._versions()
+
+        # Adding edges can't break the node rules for existing nodes, and new
+        # nodes can't be referenced by existing edges.
+        for violation in self._violations(
+            nodes=nodes, edges=enumerate(edges, start=start)
         ):
-            if not getter(
-                self.nodes[edge.source], "node_type"
-            ) == NodeTypes.weighting and getter(
-                self.nodes[edge.target], "node_type"
-            ) in (NodeTypes.normalization, NodeTypes.impact_category):
-                raise ValueError(
-                    f"Weighting edges must link a weighting set to an impact category or a normalization set ({edge})"
-                )
-        return self
+            del self.edges[start:]
+            index.remove_edges(edges)
+            for identifier, node in nodes.items():
+                del self.nodes[identifier]
+                index.remove_node(identifier, node)
+            index.versions = self._versions()
+            raise ValueError(violation.message)
+
+    def add_node(
+        self, identifier: Identifier, node: Node, edges: Iterable[Edge] = ()
+    ) -> None:
+        """Add `node` and its `edges`. See `Graph.add`."""
+        self.add(nodes={identifier: node}, edges=edges)
+
+    def add_edges(self, edges: Iterable[Edge]) -> None:
+        """Add `edges` between existing nodes. See `Graph.add`."""
+        self.add(edges=edges)
+
+    def remove_edges(self, edges: Iterable[Edge]) -> None:
+        """
+        Remove `edges`, which must be objects in `Graph.edges`.
+
+        Only the node rules for the source and target nodes are checked. If
+        any fails, the graph is left unchanged and `ValueError` is raised.
+        """
+        self._remove(nodes={}, edges=list(edges))
+
+    def remove_node(self, identifier: Identifier) -> None:
+        """
+        Remove the node `identifier` and all edges to or from it.
+
+        Only the node rules for its neighbours are checked. If any fails, the
+        graph is left unchanged and `ValueError` is raised.
+        """
+        index = self._get_index()
+        edges = {
+            id(edge): edge
+            for adjacency in (index.outgoing, index.incoming)
+            for by_type in adjacency.get(identifier, {}).values()
+            for edge in by_type.values()
+        }
+        self._remove(nodes={identifier: self.nodes[identifier]}, edges=edges.values())
+
+    def _remove(self, nodes: dict[Identifier, Node], edges: Iterable[Edge]) -> None:
+        index = self._get_index()
+        try:
+            # Sorted by position, and without duplicates
+            positions = {index.position(edge): edge for edge in edges}
+        except KeyError:
+            raise ValueError("Can only remove edges which are in the graph") from None
+        positions = dict(sorted(positions.items()))
+        edges = list(positions.values())
+
+        for position in reversed(positions):
+            del self.edges[position]
+        slots = index.remove_edges(edges)
+        index.versions = self._versions()
+
+        # The rules don't look at the removed nodes, which are only deleted
+        # afterwards so that they keep their place in `Graph.nodes` on failure
+        neighbours = {edge.source for edge in edges} | {edge.target for edge in edges}
+        for violation in self._violations(nodes=neighbours - nodes.keys(), edges=[]):
+            for position, edge in positions.items():
+                self.edges.insert(position, edge)
+            index.restore_edges(edges, slots)
+            index.versions = self._versions()
+            raise ValueError(violation.message)
+
+        for identifier, node in nodes.items():
+            del self.nodes[identifier]
+            index.remove_node(identifier, node)
+        index.versions = self._versions()
+
+    def diff(self, other: "Graph") -> "GraphPatch":
+        """Patch turning this graph into `other`; see `patch.diff`."""
+        from bw_interface_schemas.patch import diff
+
+        return diff(self, other)
+
+    def apply_patch(
+        self,
+        patch: "GraphPatch",
+        node_mapping: dict[str, type[Node]] = NODE_MAPPING,
+        edge_mapping: dict[str, type[Edge]] = EDGE_MAPPING,
+    ) -> None:
+        """Apply `patch`, from `Graph.diff`, in place; see `patch.apply_patch`."""
+        from bw_interface_schemas.patch import apply_patch
+
+        apply_patch(self, patch, node_mapping, edge_mapping)
 
     @model_validator(mode="after")
-    def normalization_edge_source_target_types(self) -> Self:
-        for edge in filter(
-            lambda x: getter(x, "edge_type") == QuantitativeEdgeTypes.normalization,
-            self.edges,
-        ):
-            if not (
-                getter(self.nodes[edge.source], "node_type")
-                == NodeTypes.elementary_flow
-                and getter(self.nodes[edge.target], "node_type")
-                == NodeTypes.normalization
-            ):
-                raise ValueError(
-                    "Normalization edges must link an elementary flow to a normalization set"
-                )
-        return self
+    def edges_reference_nodes(self) -> Self:
+        return self._raise_first(self._check_edges_reference_nodes())
 
     @model_validator(mode="after")
-    def characterization_edge_source_target_types(self) -> Self:
-        for edge in filter(
-            lambda x: getter(x, "edge_type") == QuantitativeEdgeTypes.characterization,
-            self.edges,
-        ):
-            if not (
-                getter(self.nodes[edge.source], "node_type")
-                == NodeTypes.elementary_flow
-                and getter(self.nodes[edge.target], "node_type")
-                == NodeTypes.impact_category
-            ):
-                raise ValueError(
-                    "Characterization edges must link an elementary flow to an impact category"
-                )
-        return self
+    def processes_in_product_system(self) -> Self:
+        return self._raise_first(self._check_processes_in_product_system())
 
     @model_validator(mode="after")
-    def technosphere_edge_must_specify_functionality(self) -> Self:
-        for edge in filter(
-            lambda x: getter(x, "edge_type") == QuantitativeEdgeTypes.technosphere,
-            self.edges,
-        ):
-            if not isinstance(getter(edge, "functional"), bool):
-                raise ValueError(
-                    f"Technosphere edges must indicate functionality status ({edge})"
-                )
-        return self
+    def products_in_product_system(self) -> Self:
+        return self._raise_first(self._check_products_in_product_system())
 
     @model_validator(mode="after")
-    def technosphere_edge_source_target_types(self) -> Self:
-        for edge in filter(
-            lambda x: getter(x, "edge_type") == QuantitativeEdgeTypes.technosphere,
-            self.edges,
-        ):
-            if not (
-                (
-                    getter(self.nodes[edge.source], "node_type") == NodeTypes.process
-                    and getter(self.nodes[edge.target], "node_type")
-                    == NodeTypes.product
-                )
-                or (
-                    getter(self.nodes[edge.target], "node_type") == NodeTypes.process
-                    and getter(self.nodes[edge.source], "node_type")
-                    == NodeTypes.product
-                )
-            ):
-                raise ValueError(
-                    f"Technosphere edges must link a process and a product ({edge})"
-                )
-        return self
+    def elementary_flows_in_product_system(self) -> Self:
+        return self._raise_first(self._check_elementary_flows_in_product_system())
+
+    @model_validator(mode="after")
+    def process_has_at_least_one_functional_edge(self) -> Self:
+        return self._raise_first(self._check_process_has_at_least_one_functional_edge())
+
+    @model_validator(mode="after")
+    def edge_source_target_types(self) -> Self:
+        return self._raise_first(self._check_edge_source_target_types())
 
 
 def graph_to_pydantic(
     graph: dict[str, list | dict],
-    node_mapping: dict[str, Node] = NODE_MAPPING,
-    edge_mapping: dict[str, Edge] = EDGE_MAPPING,
+    node_mapping: dict[str, type[Node]] = NODE_MAPPING,
+    edge_mapping: dict[str, type[Edge]] = EDGE_MAPPING,
+    check_graph: bool = True,
+    workers: int = 1,
+    chunk_size: int = 50_000,
+    cache: "ValidationCache | None" = None,
+    force: bool = False,
+    trusted: bool = False,
+    sample: float = 0.0,
+    seed: int | None = None,
+    precheck: bool = False,
 ) -> Graph:
     """
     Load `graph` as simple Python objects into Pydantic classes.
@@ -261,17 +1076,118 @@ def graph_to_pydantic(
     ----------
     graph
         Graph as dictionary: `{"nodes": {<identifier>: <node_dict>}, "edges": [<edge_dicts>]}`.
+    node_mapping, edge_mapping
+        Classes used to validate each `node_type` and `edge_type`. Other types are
+        validated as `Node` or `Edge`.
+    check_graph
+        Apply the `Graph` structural rules. If `False`, nodes and edges are still
+        validated individually, and all structural violations can be collected
+        afterwards with `Graph.validate_report()`.
+    workers, chunk_size
+        If `workers` is more than one, nodes and edges are validated in chunks of
+        `chunk_size` in parallel; see `parallel.validate_in_chunks`. Structural
+        rules are checked afterwards on the merged graph.
+    cache, force
+        A `cache.ValidationCache`. If the `cache.fingerprint` of `graph` passed
+        validation before, with the same library versions and mappings, it is
+        built as if `trusted`, without `sample` or structural rules, unless
+        `force` is true. Graphs which pass validation with `check_graph`, or
+        trusted graphs which pass the structural rules, are added to the cache.
+    trusted, sample, seed
+        If `trusted`, the input is assumed to be valid, e.g. because it comes
+        from a database it was validated for, and nodes and edges are built
+        without validation; see `construct.construct_graph`. They share the
+        lists and dictionaries in `graph`, e.g. `tags` or `properties`,
+        instead of copies. A random fraction `sample` of them is still fully
+        validated, reproducibly with `seed`. Structural rules are applied if
+        `check_graph` is true.
+    precheck
+        With `check_graph`, apply the structural rules to the raw `node_type`,
+        `edge_type`, `source`, `target` and `functional` values before
+        validating anything (see `streaming.raw_violations`), raising on the
+        first violation, and don't apply them again afterwards. Invalid
+        graphs are rejected without building any objects. Raw values are
+        checked as given, so this can reject values validation would coerce.
 
     """
     node_mapping = node_mapping or NODE_MAPPING
     edge_mapping = edge_mapping or EDGE_MAPPING
+    profile = active_profile()
+    start = time.perf_counter()
 
-    return Graph(
-        nodes={
-            key: node_mapping.get(obj["node_type"], Node)(**obj)
-            for key, obj in graph["nodes"].items()
-        },
-        edges=[
-            edge_mapping.get(obj["edge_type"], Edge)(**obj) for obj in graph["edges"]
-        ],
-    )
+    key = None
+    if cache is not None:
+        from bw_interface_schemas.cache import fingerprint
+
+        key = cache.key(fingerprint(graph), node_mapping, edge_mapping)
+        if profile is not None:
+            profile.record("stages", "fingerprint", time.perf_counter() - start)
+        if not force and key in cache:
+            # Already validated, so nothing is checked again. Like with
+            # `trusted`, the objects share lists and dictionaries with `graph`
+            trusted, check_graph, sample = True, False, 0.0
+
+    # Whether the structural rules still need to be applied to the objects
+    check_objects = check_graph
+    if precheck and check_graph:
+        from bw_interface_schemas.streaming import raw_violations
+
+        start = time.perf_counter()
+        try:
+            for violation in raw_violations(graph, Graph.edge_type_rules, edge_mapping):
+                raise violation_error(Graph.__name__, violation, graph)
+        except TypeError:
+            # Malformed values, e.g. unhashable identifiers; validation below
+            # reports them properly
+            pass
+        else:
+            check_objects = False
+        if profile is not None:
+            profile.record("stages", "precheck", time.perf_counter() - start)
+
+    if trusted:
+        from bw_interface_schemas.construct import construct_graph
+
+        start = time.perf_counter()
+        validated = construct_graph(
+            graph, node_mapping, edge_mapping, check_objects, sample, seed
+        )
+        if profile is not None:
+            profile.record(
+                "stages",
+                "construct",
+                time.perf_counter() - start,
+                len(validated.nodes) + len(validated.edges),
+            )
+        if key is not None and check_graph:
+            cache.add(key)
+        return validated
+
+    with paused_gc():
+        start = time.perf_counter()
+        if workers > 1:
+            from bw_interface_schemas.parallel import validate_in_chunks
+
+            data = validate_in_chunks(
+                graph, node_mapping, edge_mapping, workers, chunk_size
+            )
+        else:
+            # Validates every node and edge in a single call to pydantic-core
+            data = graph_adapter(node_mapping, edge_mapping).validate_python(graph)
+        if profile is not None:
+            profile.record(
+                "stages",
+                "validation",
+                time.perf_counter() - start,
+                len(data["nodes"]) + len(data["edges"]),
+            )
+            start = time.perf_counter()
+        validated = Graph.from_validated(
+            data["nodes"], data["edges"], check_graph=check_objects
+        )
+        if profile is not None:
+            # Includes the structural rules if `check_objects`
+            profile.record("stages", "graph", time.perf_counter() - start)
+    if key is not None and check_graph:
+        cache.add(key)
+    return validated
@@ -0,0 +1,218 @@
+from bisect import bisect_left, insort
+from functools import wraps
+from typing import Callable, Iterable
+
+from bw_interface_schemas.models import Edge, Identifier, Node
+
+
+def _counted(method: Callable) -> Callable:
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        self.version += 1
+        return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+class VersionedList(list):
+    """`list` which counts the changes made to it in `version`."""
+
+    version = 0
+
+
+class VersionedDict(dict):
+    """`dict` which counts the changes made to it in `version`."""
+
+    version = 0
+
+
+for _name in (
+    "__setitem__",
+    "__delitem__",
+    "__iadd__",
+    "__imul__",
+    "append",
+    "extend",
+    "insert",
+    "pop",
+    "remove",
+    "clear",
+    "sort",
+    "reverse",
+):
+    setattr(VersionedList, _name, _counted(getattr(list, _name)))
+for _name in (
+    "__setitem__",
+    "__delitem__",
+    "__ior__",
+    "pop",
+    "popitem",
+    "clear",
+    "setdefault",
+    "update",
+):
+    setattr(VersionedDict, _name, _counted(getattr(dict, _name)))
+
+
+def versions(nodes: VersionedDict, edges: VersionedList) -> tuple[int, ...]:
+    """Identify the state of `nodes` and `edges`, to notice changes to them."""
+    return id(nodes), nodes.version, id(edges), edges.version
+
+
+class GraphIndex:
+    """
+    Adjacency indexes over the nodes and edges of a `Graph`.
+
+    Built in a single pass, so that structural rules can look up the edges
+    attached to a node instead of scanning every edge in the graph.
+
+    * `nodes_by_type`: `{node_type: {identifier: None}}`
+    * `edges_by_type`: `{edge_type: {id(edge): edge}}`
+    * `outgoing`: `{source: {edge_type: {id(edge): edge}}}`
+    * `incoming`: `{target: {edge_type: {id(edge): edge}}}`
+    * `canonical`: `{identifier: identifier}`, to intern the identifiers of
+      new edges; see `Graph.intern_identifiers`
+    * `slots`: `{id(edge): slot}`, the position of each edge in `Graph.edges`
+      when it was added. `removed` holds the sorted slots of removed edges, so
+      that `position` can subtract them.
+    * `versions`: the `versions` of `Graph.nodes` and `Graph.edges` the index
+      describes. Methods which update the index set it after their changes.
+
+    Edges are stored as the objects themselves, keyed by `id`, so that adding
+    or removing one edge only touches the dictionaries it is in. They are kept
+    in the order of `Graph.edges` as long as edges are only appended.
+    """
+
+    __slots__ = (
+        "nodes_by_type",
+        "edges_by_type",
+        "outgoing",
+        "incoming",
+        "canonical",
+        "slots",
+        "removed",
+        "versions",
+    )
+
+    def __init__(self, nodes: dict[Identifier, Node], edges: Iterable[Edge]):
+        self.nodes_by_type: dict[str, dict[Identifier, None]] = {}
+        self.edges_by_type: dict[str, dict[int, Edge]] = {}
+        self.outgoing: dict[Identifier, dict[str, dict[int, Edge]]] = {}
+        self.incoming: dict[Identifier, dict[str, dict[int, Edge]]] = {}
+        self.canonical: dict[Identifier, Identifier] = {}
+        self.slots: dict[int, int] = {}
+        self.removed: list[int] = []
+        self.versions: tuple[int, ...] = ()
+
+        for identifier, node in nodes.items():
+            self.add_node(identifier, node)
+        self.add_edges(edges)
+
+    def add_node(self, identifier: Identifier, node: Node) -> None:
+        try:
+            self.nodes_by_type[node.node_type][identifier] = None
+        except KeyError:
+            self.nodes_by_type[node.node_type] = {identifier: None}
+        self.canonical[identifier] = identifier
+
+    def remove_node(self, identifier: Identifier, node: Node) -> None:
+        """
+        Remove `identifier` from the node index. Its edges must be removed
+        separately.
+        """
+        del self.nodes_by_type[node.node_type][identifier]
+        del self.canonical[identifier]
+
+    def add_edges(self, edges: Iterable[Edge]) -> None:
+        """Add `edges`, which are appended to `Graph.edges`."""
+        # Hot loop when building the index; avoids `setdefault`, which
+        # allocates a new container on every call
+        edges_by_type, outgoing, incoming, slots = (
+            self.edges_by_type,
+            self.outgoing,
+            self.incoming,
+            self.slots,
+        )
+        slot = len(slots) + len(self.removed)
+        for edge in edges:
+            key = id(edge)
+            slots[key] = slot
+            slot += 1
+            edge_type = edge.edge_type
+            try:
+                edges_by_type[edge_type][key] = edge
+            except KeyError:
+                edges_by_type[edge_type] = {key: edge}
+            for adjacency, node in ((outgoing, edge.source), (incoming, edge.target)):
+                try:
+                    by_type = adjacency[node]
+                except KeyError:
+                    by_type = adjacency[node] = {}
+                try:
+                    by_type[edge_type][key] = edge
+                except KeyError:
+                    by_type[edge_type] = {key: edge}
+
+    def remove_edges(self, edges: Iterable[Edge]) -> list[int]:
+        """
+        Remove `edges`, matched by identity, from all indexes. Returns their
+        slots, to undo the removal with `restore_edges`.
+        """
+        removed = []
+        for edge in edges:
+            key = id(edge)
+            slot = self.slots.pop(key)
+            insort(self.removed, slot)
+            removed.append(slot)
+            del self.edges_by_type[edge.edge_type][key]
+            del self.outgoing[edge.source][edge.edge_type][key]
+            del self.incoming[edge.target][edge.edge_type][key]
+        return removed
+
+    def restore_edges(self, edges: Iterable[Edge], slots: Iterable[int]) -> None:
+        """Undo `remove_edges`, after putting `edges` back in `Graph.edges`."""
+        edges, slots = list(edges), list(slots)
+        for slot in slots:
+            del self.removed[bisect_left(self.removed, slot)]
+        self.add_edges(edges)
+        # `add_edges` appended them and gave them new slots
+        for edge, slot in zip(edges, slots):
+            self.slots[id(edge)] = slot
+        self.sort(edges)
+
+    def sort(self, edges: Iterable[Edge]) -> None:
+        """Sort the dictionaries which contain `edges` by slot."""
+        slots = self.slots
+
+        def by_slot(edges: dict[int, Edge]) -> dict[int, Edge]:
+            return dict(sorted(edges.items(), key=lambda item: slots[item[0]]))
+
+        for edge_type in {edge.edge_type for edge in edges}:
+            self.edges_by_type[edge_type] = by_slot(self.edges_by_type[edge_type])
+        for adjacency, key in ((self.outgoing, "source"), (self.incoming, "target")):
+            for node, edge_type in {
+                (getattr(edge, key), edge.edge_type) for edge in edges
+            }:
+                adjacency[node][edge_type] = by_slot(adjacency[node][edge_type])
+
+    def renumber(self, edges: Iterable[Edge]) -> None:
+        """Set the slots after `Graph.edges` was reordered, e.g. by a patch."""
+        self.slots = {id(edge): slot for slot, edge in enumerate(edges)}
+        self.removed = []
+
+    def position(self, edge: Edge) -> int:
+        """Position of `edge` in `Graph.edges`. Raises `KeyError` if not indexed."""
+        slot = self.slots[id(edge)]
+        return slot - bisect_left(self.removed, slot)
+
+    def nodes_of_type(self, node_type: str) -> Iterable[Identifier]:
+        return self.nodes_by_type.get(node_type, {}).keys()
+
+    def edges_of_type(self, edge_type: str) -> Iterable[Edge]:
+        return self.edges_by_type.get(edge_type, {}).values()
+
+    def outgoing_edges(self, node: Identifier, edge_type: str) -> Iterable[Edge]:
+        return self.outgoing.get(node, {}).get(edge_type, {}).values()
+
+    def incoming_edges(self, node: Identifier, edge_type: str) -> Iterable[Edge]:
+        return self.incoming.get(node, {}).get(edge_type, {}).values()
@@ -0,0 +1,180 @@
+"""
+Read-mostly graphs which only build pydantic objects for the nodes and edges
+actually used.
+"""
+
+from collections.abc import Mapping, Sequence
+from os import PathLike
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterator
+
+from pydantic import TypeAdapter
+from pydantic_core import from_json
+
+from bw_interface_schemas.graph import (
+    EDGE_MAPPING,
+    NODE_MAPPING,
+    Graph,
+    Violation,
+    edge_adapter,
+    node_adapter,
+)
+from bw_interface_schemas.models import Edge, Identifier, Node
+from bw_interface_schemas.streaming import raw_violations
+
+if TYPE_CHECKING:
+    from bw_interface_schemas.columnar import EdgeTable
+
+
+class LazyNodes(Mapping):
+    """
+    Read-only mapping of identifiers to nodes, validated from the raw
+    dictionaries in `raw` on first access and then cached.
+    """
+
+    def __init__(self, raw: Mapping[Identifier, Any], adapter: TypeAdapter):
+        self.raw = raw
+        self.adapter = adapter
+        self.cache: dict[Identifier, Node] = {}
+
+    def __getitem__(self, identifier: Identifier) -> Node:
+        try:
+            return self.cache[identifier]
+        except KeyError:
+            node = self.cache[identifier] = self.adapter.validate_python(
+                self.raw[identifier]
+            )
+            return node
+
+    def __iter__(self) -> Iterator[Identifier]:
+        return iter(self.raw)
+
+    def __len__(self) -> int:
+        return len(self.raw)
+
+    def __contains__(self, identifier: Any) -> bool:
+        return identifier in self.raw
+
+
+class LazyEdges(Sequence):
+    """
+    Read-only sequence of edges, validated from the raw dictionaries in `raw`
+    on first access and then cached. Items of `raw` which are already `Edge`
+    instances are returned as they are.
+    """
+
+    def __init__(self, raw: Sequence[Any], adapter: TypeAdapter):
+        self.raw = raw
+        self.adapter = adapter
+        self.cache: list[Edge | None] = [None] * len(raw)
+
+    def __getitem__(self, position: int | slice) -> Edge | list[Edge]:
+        if isinstance(position, slice):
+            return [self[i] for i in range(*position.indices(len(self)))]
+        edge = self.cache[position]
+        if edge is None:
+            raw = self.raw[position]
+            edge = self.cache[position] = (
+                raw if isinstance(raw, Edge) else self.adapter.validate_python(raw)
+            )
+        return edge
+
+    def __len__(self) -> int:
+        return len(self.raw)
+
+
+class TableRows(Sequence):
+    """
+    Read-only sequence of the `row_values` dictionaries of an `EdgeTable`,
+    built on access instead of all at once.
+    """
+
+    def __init__(self, table: "EdgeTable"):
+        self.table = table
+
+    def __getitem__(self, row: int | slice) -> dict[str, Any] | list[dict[str, Any]]:
+        if isinstance(row, slice):
+            return [self[i] for i in range(*row.indices(len(self)))]
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError(row)
+        return self.table.row_values(row)
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+
+class LazyGraph:
+    """
+    A graph whose `nodes` and `edges` keep the `Graph` interfaces (a mapping
+    and a sequence) but are only validated and built when accessed.
+
+    The structural rules are checked on the raw `node_type`, `edge_type`,
+    `source`, `target` and `functional` values, without building any
+    objects; invalid attributes are only found when the item is accessed, or
+    by `to_graph`.
+    """
+
+    def __init__(
+        self,
+        nodes: Mapping[Identifier, Any],
+        edges: Sequence[Any],
+        node_mapping: dict[str, type[Node]] = NODE_MAPPING,
+        edge_mapping: dict[str, type[Edge]] = EDGE_MAPPING,
+        check_graph: bool = True,
+        edge_type_rules: Mapping = Graph.edge_type_rules,
+    ):
+        self.nodes = LazyNodes(nodes, node_adapter(node_mapping))
+        self.edges = LazyEdges(edges, edge_adapter(edge_mapping))
+        self.edge_type_rules = edge_type_rules
+        self.edge_mapping = edge_mapping
+        if check_graph:
+            for violation in self.violations():
+                raise ValueError(violation.message)
+
+    @classmethod
+    def from_json(cls, data: bytes | str | PathLike, **kwargs: Any) -> "LazyGraph":
+        """
+        Parse JSON, in the same format as `Graph.from_json`, into raw
+        dictionaries. `data` is either the JSON document as `bytes`, or a path
+        to a JSON file. `kwargs` are passed to `LazyGraph`.
+        """
+        if not isinstance(data, (bytes, bytearray)):
+            data = Path(data).read_bytes()
+        raw = from_json(data)
+        return cls(raw["nodes"], raw["edges"], **kwargs)
+
+    @classmethod
+    def from_edge_table(
+        cls,
+        table: "EdgeTable",
+        nodes: Mapping[Identifier, Any],
+        **kwargs: Any,
+    ) -> "LazyGraph":
+        """
+        Lazy graph over the rows of a `columnar.EdgeTable`. Row dictionaries
+        are only built when an edge is accessed or checked.
+        """
+        return cls(nodes, TableRows(table), **kwargs)
+
+    def violations(self) -> Iterator[Violation]:
+        """
+        Check the structural rules on the raw data. Finds the same violations
+        as `Graph.validate_report`, but edge rules and node rules are reported
+        in a single pass over the edges, so the order can differ.
+        """
+        return raw_violations(
+            {"nodes": self.nodes.raw, "edges": self.edges.raw},
+            self.edge_type_rules,
+            self.edge_mapping,
+        )
+
+    def validate_report(self) -> list[Violation]:
+        return list(self.violations())
+
+    def to_graph(self) -> Graph:
+        """Validate everything not accessed yet, and build a `Graph`."""
+        return Graph.from_validated(
+            dict(self.nodes), list(self.edges), check_graph=False
+        )
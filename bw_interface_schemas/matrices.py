@@ -0,0 +1,199 @@
+"""
+Build technosphere, biosphere and characterization matrices from a `Graph`.
+
+Requires `numpy` and `scipy`; install with `pip install bw_interface_schemas[arrays]`.
+"""
+
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+import numpy as np
+from scipy import sparse
+
+from bw_interface_schemas.columnar import EdgeTable
+from bw_interface_schemas.graph import Graph
+from bw_interface_schemas.models import Identifier, NodeTypes, QuantitativeEdgeTypes
+
+
+@dataclass
+class Matrices:
+    """
+    Sparse matrices built from a `Graph`, with the mappings from node
+    identifiers to row and column indices.
+
+    * `technosphere`: products (rows) by processes (columns)
+    * `biosphere`: elementary flows (rows) by processes (columns)
+    * `characterization`: elementary flows (rows) by impact categories (columns)
+
+    Within each node type, indices follow the order of `Graph.nodes`.
+    """
+
+    technosphere: sparse.sparray
+    biosphere: sparse.sparray
+    characterization: sparse.sparray
+    products: dict[Identifier, int]
+    processes: dict[Identifier, int]
+    elementary_flows: dict[Identifier, int]
+    impact_categories: dict[Identifier, int]
+
+
+# Matrix name, edge type, row node type, column node type, and sign of
+# edges going from the column node to the row node. Edges in the other
+# direction get the opposite sign.
+MATRIX_EDGES = (
+    (
+        "technosphere",
+        QuantitativeEdgeTypes.technosphere,
+        NodeTypes.product,
+        NodeTypes.process,
+        1,
+    ),
+    (
+        "biosphere",
+        QuantitativeEdgeTypes.biosphere,
+        NodeTypes.elementary_flow,
+        NodeTypes.process,
+        1,
+    ),
+    (
+        "characterization",
+        QuantitativeEdgeTypes.characterization,
+        NodeTypes.elementary_flow,
+        NodeTypes.impact_category,
+        -1,
+    ),
+)
+
+
+def matrix_coordinates(
+    table: EdgeTable,
+    node_types: np.ndarray,
+    edge_type: str,
+    row_type: int,
+    col_type: int,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Find the edges in `table` which link nodes of `row_type` and `col_type`
+    with `edge_type`, in either direction.
+
+    `node_types` gives the node type code for each entry in `table.identifiers`.
+
+    Returns the row positions in `table`, the row and column node indices (into
+    `table.identifiers`), and whether each edge goes from the column node to
+    the row node (e.g. a process producing a product) instead of from the row
+    node to the column node (e.g. a product consumed by a process).
+    """
+    if edge_type not in table.edge_types:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, empty, np.empty(0, dtype=bool)
+    source_type = node_types[table.source]
+    target_type = node_types[table.target]
+    is_type = table.edge_type == table.edge_types.index(edge_type)
+
+    produced = is_type & (source_type == col_type) & (target_type == row_type)
+    consumed = is_type & (source_type == row_type) & (target_type == col_type)
+    positions = np.flatnonzero(produced | consumed)
+    forward = produced[positions]
+
+    rows = np.where(forward, table.target[positions], table.source[positions])
+    cols = np.where(forward, table.source[positions], table.target[positions])
+    return positions, rows, cols, forward
+
+
+def node_ranks(
+    graph: Graph, table: EdgeTable
+) -> tuple[np.ndarray, dict[str, int], np.ndarray, dict[str, dict[Identifier, int]]]:
+    """
+    Node type codes and matrix indices for the nodes in `table.identifiers`.
+
+    Returns the type code of each node (`-1` if it isn't in `graph`), the
+    codes of each node type, the index of each node among the nodes of its
+    type, and the `Matrices` mappings for each matrix node type. Within each
+    node type, indices follow the order of `Graph.nodes`.
+    """
+    type_codes = {}
+    node_types = np.array(
+        [
+            (
+                type_codes.setdefault(
+                    graph.nodes[identifier].node_type, len(type_codes)
+                )
+                if identifier in graph.nodes
+                else -1
+            )
+            for identifier in table.identifiers
+        ],
+        dtype=np.int32,
+    )
+    # Position of each node among the nodes of its type
+    ranks = np.zeros(len(node_types), dtype=np.int64)
+    mappings = {}
+    for node_type in (
+        NodeTypes.product,
+        NodeTypes.process,
+        NodeTypes.elementary_flow,
+        NodeTypes.impact_category,
+    ):
+        code = type_codes.setdefault(node_type, len(type_codes))
+        members = np.flatnonzero(node_types == code)
+        ranks[members] = np.arange(len(members))
+        mappings[node_type] = {
+            table.identifiers[position]: rank for rank, position in enumerate(members)
+        }
+
+    return node_types, type_codes, ranks, mappings
+
+
+def graph_to_matrices(
+    graph: Graph,
+    format: str = "csr",
+    table: EdgeTable | Iterable[EdgeTable] | None = None,
+) -> Matrices:
+    """
+    Build the technosphere, biosphere and characterization matrices of `graph`
+    as `scipy.sparse` arrays in `format` (e.g. "csr", "csc" or "coo").
+
+    The sign of each value follows the edge direction. Production edges
+    (process to product, process to elementary flow) and characterization
+    edges (elementary flow to impact category) keep their amount, and edges
+    in the opposite direction, like product to process consumption, are
+    negated. Values of duplicate edges are summed.
+
+    Pass `table` to reuse an `EdgeTable` already built from `graph`, or
+    several tables with the same `identifiers`, e.g. from
+    `arrow.read_edge_tables`.
+    """
+    if table is None:
+        tables = [EdgeTable.from_graph(graph)]
+    elif isinstance(table, EdgeTable):
+        tables = [table]
+    else:
+        tables = list(table) or [EdgeTable.from_graph(graph)]
+    node_types, type_codes, ranks, mappings = node_ranks(graph, tables[0])
+
+    matrices = {}
+    for name, edge_type, row_type, col_type, sign in MATRIX_EDGES:
+        values, rows, cols = [], [], []
+        for table in tables:
+            positions, row, col, forward = matrix_coordinates(
+                table,
+                node_types,
+                edge_type,
+                type_codes[row_type],
+                type_codes[col_type],
+            )
+            values.append(table.amount[positions] * np.where(forward, sign, -sign))
+            rows.append(ranks[row])
+            cols.append(ranks[col])
+        matrices[name] = sparse.coo_array(
+            (np.concatenate(values), (np.concatenate(rows), np.concatenate(cols))),
+            shape=(len(mappings[row_type]), len(mappings[col_type])),
+        ).asformat(format)
+
+    return Matrices(
+        products=mappings[NodeTypes.product],
+        processes=mappings[NodeTypes.process],
+        elementary_flows=mappings[NodeTypes.elementary_flow],
+        impact_categories=mappings[NodeTypes.impact_category],
+        **matrices,
+    )
@@ -20,6 +20,19 @@ class Parsimonius(BaseModel):
         # Change default value of `exclude_unset` to `True`
         return super().model_dump(*args, exclude_unset=exclude_unset, **kwargs)
 
+    @classmethod
+    def from_trusted(cls, data: dict[str, Any]) -> Self:
+        """
+        Build from a dictionary of input already known to be valid, without
+        validation or model validators. Unlike `model_construct`, values are
+        converted like validation would, e.g. nested models are built, and
+        `model_fields_set` and extra fields are the same as for `cls(**data)`.
+        Lists and dictionaries in `data` are shared, not copied.
+        """
+        from bw_interface_schemas.construct import builder
+
+        return builder(cls)(data)
+
 
 class DataSource(Parsimonius):
     """
@@ -0,0 +1,180 @@
+"""
+Validation of graph dictionaries split into several pydantic-core calls:
+in chunks across processes or threads (`validate_in_chunks`), or by node and
+edge class (`validate_by_class`).
+"""
+
+import sys
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Iterable
+
+from pydantic import BaseModel, ValidationError
+
+from bw_interface_schemas.graph import (
+    EDGE_MAPPING,
+    NODE_MAPPING,
+    getter,
+    graph_adapter,
+    paused_gc,
+)
+from bw_interface_schemas.models import Edge, Node
+from bw_interface_schemas.profiling import ValidationProfile
+
+
+def _pack(objs: Iterable[BaseModel]) -> tuple[list[type], list[tuple]]:
+    """
+    Model instances as `(class code, __dict__, fields set, extras)` rows.
+
+    Much quicker to pickle than the instances themselves, which go through
+    `BaseModel.__getstate__` one at a time.
+    """
+    classes = {}
+    rows = [
+        (
+            classes.setdefault(type(obj), len(classes)),
+            obj.__dict__,
+            obj.__pydantic_fields_set__,
+            obj.__pydantic_extra__,
+        )
+        for obj in objs
+    ]
+    return list(classes), rows
+
+
+def _unpack(packed: tuple[list[type], list[tuple]]) -> list[BaseModel]:
+    classes, rows = packed
+    setattr_ = object.__setattr__
+    objs = []
+    for code, values, fields_set, extra in rows:
+        obj = classes[code].__new__(classes[code])
+        setattr_(obj, "__dict__", values)
+        setattr_(obj, "__pydantic_fields_set__", fields_set)
+        setattr_(obj, "__pydantic_extra__", extra)
+        setattr_(obj, "__pydantic_private__", None)
+        objs.append(obj)
+    return objs
+
+
+def _validate_chunk(
+    node_mapping: dict[str, type[Node]],
+    edge_mapping: dict[str, type[Edge]],
+    nodes: dict,
+    edges: list,
+    pack: bool = False,
+) -> dict:
+    with paused_gc():
+        data = graph_adapter(node_mapping, edge_mapping).validate_python(
+            {"nodes": nodes, "edges": edges}
+        )
+    if pack:
+        return {
+            "identifiers": list(data["nodes"]),
+            "nodes": _pack(data["nodes"].values()),
+            "edges": _pack(data["edges"]),
+        }
+    return data
+
+
+def validate_in_chunks(
+    graph: dict[str, list | dict],
+    node_mapping: dict[str, type[Node]] = NODE_MAPPING,
+    edge_mapping: dict[str, type[Edge]] = EDGE_MAPPING,
+    workers: int | None = None,
+    chunk_size: int = 50_000,
+) -> dict:
+    """
+    Validate the nodes and edges of `graph` in chunks of `chunk_size` across
+    `workers` processes, or threads on free-threaded Python. Returns the same
+    `{"nodes": ..., "edges": ...}` as `graph_adapter().validate_python`.
+
+    Validated objects must be copied back from worker processes, which the
+    main process does serially; this limits the speedup to what that copy
+    saves over validating.
+
+    On invalid input, the graph is validated again in one piece, so the
+    `ValidationError` has the same locations as without workers.
+    """
+    items = list(graph["nodes"].items())
+    edges = graph["edges"]
+    jobs = [
+        (dict(items[start : start + chunk_size]), [])
+        for start in range(0, len(items), chunk_size)
+    ] + [
+        ({}, edges[start : start + chunk_size])
+        for start in range(0, len(edges), chunk_size)
+    ]
+
+    # Threads only validate in parallel when the GIL is disabled
+    threads = not getattr(sys, "_is_gil_enabled", lambda: True)()
+    executor_class = ThreadPoolExecutor if threads else ProcessPoolExecutor
+    try:
+        with executor_class(workers) as executor:
+            results = list(
+                executor.map(
+                    partial(
+                        _validate_chunk, node_mapping, edge_mapping, pack=not threads
+                    ),
+                    *zip(*jobs),
+                )
+            )
+    except ValidationError:
+        return graph_adapter(node_mapping, edge_mapping).validate_python(graph)
+
+    nodes, edges = {}, []
+    for result in results:
+        if threads:
+            nodes.update(result["nodes"])
+            edges.extend(result["edges"])
+        else:
+            nodes.update(zip(result["identifiers"], _unpack(result["nodes"])))
+            edges.extend(_unpack(result["edges"]))
+    return {"nodes": nodes, "edges": edges}
+
+
+def validate_by_class(
+    graph: dict[str, list | dict],
+    node_mapping: dict[str, type[Node]],
+    edge_mapping: dict[str, type[Edge]],
+    profile: ValidationProfile,
+) -> dict:
+    """
+    Validate like `graph_adapter().validate_python`, but with one call per
+    node and edge class, recording the time and count of each class in
+    `profile`.
+
+    On invalid input, the graph is validated again in one piece, so the
+    `ValidationError` has the usual locations.
+    """
+    adapter = graph_adapter(node_mapping, edge_mapping)
+    node_groups, edge_groups = defaultdict(list), defaultdict(list)
+    for identifier, node in graph["nodes"].items():
+        node_groups[node_mapping.get(getter(node, "node_type"), Node)].append(
+            identifier
+        )
+    for position, edge in enumerate(graph["edges"]):
+        edge_groups[edge_mapping.get(getter(edge, "edge_type"), Edge)].append(position)
+
+    nodes, edges = {}, [None] * len(graph["edges"])
+    try:
+        for kls, identifiers in node_groups.items():
+            with profile.timer("classes", kls.__name__, len(identifiers)):
+                nodes.update(
+                    adapter.validate_python(
+                        {
+                            "nodes": {i: graph["nodes"][i] for i in identifiers},
+                            "edges": [],
+                        }
+                    )["nodes"]
+                )
+        for kls, positions in edge_groups.items():
+            with profile.timer("classes", kls.__name__, len(positions)):
+                validated = adapter.validate_python(
+                    {"nodes": {}, "edges": [graph["edges"][i] for i in positions]}
+                )["edges"]
+            for position, edge in zip(positions, validated):
+                edges[position] = edge
+    except ValidationError:
+        return adapter.validate_python(graph)
+    return {"nodes": {i: nodes[i] for i in graph["nodes"]}, "edges": edges}
@@ -0,0 +1,254 @@
+"""
+Differences between graphs, as `GraphPatch` objects which can be sent as
+JSON and applied in place; see `Graph.diff` and `Graph.apply_patch`.
+"""
+
+import hashlib
+import json
+from bisect import bisect_left
+from collections import defaultdict, deque
+from itertools import chain, pairwise
+from typing import Any
+
+from pydantic import BaseModel
+
+from bw_interface_schemas.graph import (
+    EDGE_MAPPING,
+    NODE_MAPPING,
+    Graph,
+    edge_adapter,
+    node_adapter,
+    tagged_dump,
+)
+from bw_interface_schemas.models import Edge, Identifier, Node
+
+
+def edge_digest(edge: Edge) -> str:
+    """
+    Hash of the type, source, target and attributes of `edge`, for matching
+    edges between graphs. Edges which compare equal have the same digest,
+    whether or not their default values were set explicitly. Stable across
+    processes and Python versions.
+    """
+    data = json.dumps(
+        edge.model_dump(mode="json", exclude_unset=False),
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.blake2b(data.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _increasing_subsequence(values: list[int | None]) -> set[int]:
+    """Values of a longest strictly increasing subsequence, ignoring `None`"""
+    # Patience sorting: `tails[k]` is the position of the smallest last value
+    # of an increasing subsequence of length `k + 1`, and `last[k]` that value
+    tails: list[int] = []
+    last: list[int] = []
+    previous: dict[int, int | None] = {}
+    for position, value in enumerate(values):
+        if value is None:
+            continue
+        k = bisect_left(last, value)
+        previous[position] = tails[k - 1] if k else None
+        if k == len(tails):
+            tails.append(position)
+            last.append(value)
+        else:
+            tails[k], last[k] = position, value
+    result, position = set(), tails[-1] if tails else None
+    while position is not None:
+        result.add(values[position])
+        position = previous[position]
+    return result
+
+
+class GraphPatch(BaseModel):
+    """
+    Changes turning one graph into another; see `Graph.diff`.
+
+    Nodes and added edges are stored as JSON-compatible dictionaries, so a
+    patch can be sent with `model_dump_json`. Nodes are `(identifier, node)`
+    pairs rather than mappings, so integer identifiers stay integers through
+    JSON. Removed edges are only identified, by
+    `(edge_type, source, target, edge_digest(edge))`.
+    `added_positions` are the positions of the added edges in the patched
+    `Graph.edges`, in increasing order; without them, added edges are
+    appended.
+    """
+
+    added_nodes: list[tuple[Identifier, dict[str, Any]]] = []
+    changed_nodes: list[tuple[Identifier, dict[str, Any]]] = []
+    removed_nodes: list[Identifier] = []
+    added_edges: list[dict[str, Any]] = []
+    added_positions: list[int] = []
+    removed_edges: list[tuple[str, Identifier, Identifier, str]] = []
+
+
+def diff(graph: Graph, other: Graph) -> GraphPatch:
+    """
+    Patch turning `graph` into `other`.
+
+    Nodes are matched by identifier. Edges have no identifiers, so are
+    matched by `edge_digest`; a changed edge is removed and added again,
+    and so are edges which `other` has in a different order. Applying the
+    patch gives the edges of `other` in the same order.
+    """
+    patch = GraphPatch(
+        added_nodes=[
+            (identifier, tagged_dump(node, "node_type"))
+            for identifier, node in other.nodes.items()
+            if identifier not in graph.nodes
+        ],
+        changed_nodes=[
+            (identifier, tagged_dump(node, "node_type"))
+            for identifier, node in other.nodes.items()
+            if identifier in graph.nodes and graph.nodes[identifier] != node
+        ],
+        removed_nodes=[
+            identifier for identifier in graph.nodes if identifier not in other.nodes
+        ],
+    )
+
+    # Queues, as a graph can have several identical edges
+    digests = [edge_digest(edge) for edge in graph.edges]
+    positions = defaultdict(deque)
+    for position, digest in enumerate(digests):
+        positions[digest].append(position)
+    matches = [
+        positions[digest].popleft() if positions[digest] else None
+        for digest in map(edge_digest, other.edges)
+    ]
+    kept = _increasing_subsequence(matches)
+    for position, (edge, match) in enumerate(zip(other.edges, matches)):
+        if match not in kept:
+            patch.added_edges.append(tagged_dump(edge, "edge_type"))
+            patch.added_positions.append(position)
+    for position, edge in enumerate(graph.edges):
+        if position not in kept:
+            patch.removed_edges.append(
+                (str(edge.edge_type), edge.source, edge.target, digests[position])
+            )
+    return patch
+
+
+def apply_patch(
+    graph: Graph,
+    patch: GraphPatch,
+    node_mapping: dict[str, type[Node]] = NODE_MAPPING,
+    edge_mapping: dict[str, type[Edge]] = EDGE_MAPPING,
+) -> None:
+    """
+    Apply `patch`, from `diff`, to `graph` in place.
+
+    Only the nodes and edges in the patch are validated, and only the
+    structural rules they can affect are checked. If the patch doesn't
+    fit `graph` or any rule fails, `graph` is left unchanged and
+    `ValueError` is raised.
+    """
+    removed_nodes = set(patch.removed_nodes)
+    if len(removed_nodes) != len(patch.removed_nodes):
+        raise ValueError("Nodes removed more than once")
+    changed_ids = {identifier for identifier, _ in patch.changed_nodes}
+    added_ids = {identifier for identifier, _ in patch.added_nodes}
+    if len(changed_ids) != len(patch.changed_nodes) or len(added_ids) != len(
+        patch.added_nodes
+    ):
+        raise ValueError("Nodes added or changed more than once")
+    if both := removed_nodes & changed_ids:
+        raise ValueError(f"Nodes changed and removed: {sorted(map(str, both))}")
+    if patch.added_positions and (
+        len(patch.added_positions) != len(patch.added_edges)
+        or any(b <= a for a, b in pairwise(patch.added_positions))
+        or patch.added_positions[0] < 0
+        or patch.added_positions[-1]
+        >= len(graph.edges) - len(patch.removed_edges) + len(patch.added_edges)
+    ):
+        raise ValueError("Invalid positions for the added edges")
+
+    added_nodes = {
+        identifier: node_adapter(node_mapping).validate_python(data)
+        for identifier, data in patch.added_nodes
+    }
+    changed_nodes = {
+        identifier: node_adapter(node_mapping).validate_python(data)
+        for identifier, data in patch.changed_nodes
+    }
+    added_edges = [
+        edge_adapter(edge_mapping).validate_python(data) for data in patch.added_edges
+    ]
+    if duplicates := added_nodes.keys() & graph.nodes.keys():
+        raise ValueError(f"Nodes already in graph: {sorted(map(str, duplicates))}")
+    if missing := (changed_nodes.keys() | removed_nodes) - graph.nodes.keys():
+        raise ValueError(f"Nodes not in graph: {sorted(map(str, missing))}")
+
+    index = graph._get_index()
+    removed_edges = {}
+    for edge_type, source, target, digest in patch.removed_edges:
+        for edge in index.outgoing_edges(source, edge_type):
+            if (
+                id(edge) not in removed_edges
+                and edge.target == target
+                and edge_digest(edge) == digest
+            ):
+                removed_edges[id(edge)] = edge
+                break
+        else:
+            raise ValueError(
+                f"Can't find {edge_type} edge from {source} to {target} to remove"
+            )
+
+    # Edges which stay in the graph but whose nodes change or go away
+    touched = changed_nodes.keys() | removed_nodes
+    kept_edges = {
+        id(edge): edge
+        for identifier in touched
+        for adjacency in (index.outgoing, index.incoming)
+        for edges in adjacency.get(identifier, {}).values()
+        for edge in edges.values()
+        if id(edge) not in removed_edges
+    }
+    scope = touched | added_nodes.keys()
+    for edge in chain(removed_edges.values(), added_edges, kept_edges.values()):
+        scope.update((edge.source, edge.target))
+
+    previous_nodes, previous_edges = dict(graph.nodes), graph.edges
+    edges = [edge for edge in graph.edges if id(edge) not in removed_edges]
+    if patch.added_positions:
+        kept_iter, added = iter(edges), dict(zip(patch.added_positions, added_edges))
+        edges = [
+            added[position] if position in added else next(kept_iter)
+            for position in range(len(edges) + len(added_edges))
+        ]
+    else:
+        edges += added_edges
+    graph._replace(edges=edges)
+    index.remove_edges(removed_edges.values())
+    for identifier in patch.removed_nodes:
+        index.remove_node(identifier, graph.nodes.pop(identifier))
+    for identifier, node in changed_nodes.items():
+        index.remove_node(identifier, graph.nodes[identifier])
+        graph.nodes[identifier] = node
+        index.add_node(identifier, node)
+    for identifier, node in added_nodes.items():
+        graph.nodes[identifier] = node
+        index.add_node(identifier, node)
+    graph._intern(added_edges, index.canonical)
+    index.add_edges(added_edges)
+    if patch.added_positions:
+        # Added edges can be anywhere, not only at the end
+        index.renumber(graph.edges)
+        index.sort(added_edges)
+    index.versions = graph._versions()
+
+    checked = {id(edge) for edge in added_edges} | kept_edges.keys()
+    for violation in graph._violations(
+        nodes=[identifier for identifier in scope if identifier in graph.nodes],
+        edges=[
+            (position, edge)
+            for position, edge in enumerate(graph.edges)
+            if id(edge) in checked
+        ],
+    ):
+        graph.nodes, graph.edges = previous_nodes, previous_edges
+        graph.reset_index()
+        raise ValueError(violation.message)
@@ -0,0 +1,169 @@
+"""
+Opt-in timing of graph loading and validation.
+
+```python
+with profile_validation() as profile:
+    graph = graph_to_pydantic(data)
+print(profile.to_json())
+```
+
+While a profile is active, `graph.graph_adapter` returns an adapter which
+also records the time spent validating each node and edge, by class, and
+each structural rule of `Graph` records its time and the number of nodes or
+edges it scanned. Validation still happens in a single pydantic-core call.
+Outside `profile_validation` the instrumentation costs one context variable
+lookup per rule and per adapter.
+"""
+
+import json
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from functools import wraps
+from typing import Annotated, Any, Callable, Iterator
+
+from pydantic import WrapValidator
+
+
+@dataclass
+class Timing:
+    """Total wall time, number of calls and objects processed for one entry"""
+
+    calls: int = 0
+    seconds: float = 0.0
+    objects: int = 0
+
+
+@dataclass
+class ValidationProfile:
+    """
+    Timings recorded by `profile_validation`, by section:
+
+    * `stages`: steps of `graph_to_pydantic`: `validation`, `graph` (building the
+      `Graph`, including the structural rules), `fingerprint` and `construct`
+    * `classes`: validation of the nodes and edges of each class, recorded
+      once per instance
+    * `rules`: structural rules of `Graph` (`objects` is the number of nodes
+      or edges scanned)
+    """
+
+    stages: dict[str, Timing] = field(default_factory=dict)
+    classes: dict[str, Timing] = field(default_factory=dict)
+    rules: dict[str, Timing] = field(default_factory=dict)
+
+    def record(self, section: str, name: str, seconds: float, objects: int = 0) -> None:
+        timing = getattr(self, section).setdefault(name, Timing())
+        timing.calls += 1
+        timing.seconds += seconds
+        timing.objects += objects
+
+    @contextmanager
+    def timer(self, section: str, name: str, objects: int = 0) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(section, name, time.perf_counter() - start, objects)
+
+    def to_dict(self) -> dict[str, dict[str, dict[str, Any]]]:
+        return asdict(self)
+
+    def to_json(self, **kwargs: Any) -> str:
+        """`to_dict` as JSON; `kwargs` are passed to `json.dumps`"""
+        return json.dumps(self.to_dict(), **kwargs)
+
+
+_active: ContextVar[ValidationProfile | None] = ContextVar(
+    "validation_profile", default=None
+)
+
+
+def active_profile() -> ValidationProfile | None:
+    """The profile of the enclosing `profile_validation` block, if any"""
+    return _active.get()
+
+
+@contextmanager
+def profile_validation(
+    profile: ValidationProfile | None = None,
+) -> Iterator[ValidationProfile]:
+    """
+    Record validation timings into `profile` (a new `ValidationProfile` by
+    default) within the `with` block. Blocks can be nested; the inner
+    profile is used until it exits. Profiles are per thread and per task.
+    """
+    profile = ValidationProfile() if profile is None else profile
+    token = _active.set(profile)
+    try:
+        yield profile
+    finally:
+        _active.reset(token)
+
+
+def profiled_class(kls: type) -> Any:
+    """
+    `kls` annotated with a validator which records the time spent validating
+    each instance as class `kls.__name__` while a profile is active.
+    """
+    name = kls.__name__
+
+    def validate(value: Any, handler: Callable[[Any], Any]) -> Any:
+        start = time.perf_counter()
+        try:
+            return handler(value)
+        finally:
+            profile = _active.get()
+            if profile is not None:
+                profile.record("classes", name, time.perf_counter() - start, 1)
+
+    return Annotated[kls, WrapValidator(validate)]
+
+
+def profiled_rule(
+    name: str, scanned: Callable[..., int]
+) -> Callable[[Callable[..., Iterator]], Callable[..., Iterator]]:
+    """
+    Decorate a method returning an iterator of violations, recording the time
+    spent producing them as rule `name` while a profile is active.
+    `scanned(self, *args, **kwargs)` gives the number of nodes or edges the
+    call checks.
+
+    The time is recorded when the iterator is exhausted or closed, so a rule
+    stopped at its first violation only counts the time until then.
+    """
+
+    def decorator(method: Callable[..., Iterator]) -> Callable[..., Iterator]:
+        @wraps(method)
+        def wrapper(self, *args: Any, **kwargs: Any) -> Iterator:
+            profile = _active.get()
+            if profile is None:
+                return method(self, *args, **kwargs)
+            return _timed(
+                profile,
+                name,
+                method(self, *args, **kwargs),
+                scanned(self, *args, **kwargs),
+            )
+
+        return wrapper
+
+    return decorator
+
+
+def _timed(
+    profile: ValidationProfile, name: str, iterator: Iterator, objects: int
+) -> Iterator:
+    seconds = 0.0
+    try:
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                seconds += time.perf_counter() - start
+            yield item
+    finally:
+        profile.record("rules", name, seconds, objects)
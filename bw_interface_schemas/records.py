@@ -0,0 +1,94 @@
+"""
+Compact, read-only records for validated nodes and edges.
+
+Each pydantic class gets a frozen dataclass with `__slots__` and the same
+fields, plus `fields_set` (the `model_fields_set` of the original object) and
+`extra` (its extra fields, or `None`). Records don't carry a `__dict__`, and
+equal `fields_set` values are shared between records, so they use much less
+memory than the pydantic objects they are built from.
+"""
+
+import dataclasses
+from dataclasses import dataclass
+from functools import cache
+from typing import Any
+
+from pydantic import BaseModel
+
+from bw_interface_schemas.graph import Graph
+from bw_interface_schemas.models import Identifier
+
+
+@cache
+def record_class(model: type[BaseModel]) -> type:
+    """
+    Frozen, slotted dataclass with the fields of `model`, named
+    `<model name>Record`. Cached, so each model has exactly one record class.
+    """
+
+    def to_model(self) -> BaseModel:
+        """The pydantic object this record was built from"""
+        values = {name: getattr(self, name) for name in model.model_fields}
+        # Values were validated before the record was built
+        return model.model_construct(
+            _fields_set=set(self.fields_set), **values, **(self.extra or {})
+        )
+
+    record = dataclasses.make_dataclass(
+        f"{model.__name__}Record",
+        [(name, field.annotation) for name, field in model.model_fields.items()]
+        + [("fields_set", frozenset[str]), ("extra", dict[str, Any] | None)],
+        namespace={"model": model, "to_model": to_model},
+        frozen=True,
+        slots=True,
+    )
+    record.__module__ = __name__
+    return record
+
+
+def to_record(obj: BaseModel, fields_sets: dict | None = None) -> Any:
+    """
+    Record for the pydantic object `obj`.
+
+    Pass the same `fields_sets` dictionary when converting many objects, so
+    that records with the same set fields share one `frozenset`.
+    """
+    fields_set = frozenset(obj.model_fields_set)
+    if fields_sets is not None:
+        fields_set = fields_sets.setdefault(fields_set, fields_set)
+    return record_class(type(obj))(
+        **{name: getattr(obj, name) for name in type(obj).model_fields},
+        fields_set=fields_set,
+        extra=obj.model_extra or None,
+    )
+
+
+@dataclass
+class GraphRecords:
+    """Nodes and edges of a `Graph` as records; see `graph_to_records`."""
+
+    nodes: dict[Identifier, Any]
+    edges: list[Any]
+
+    def to_graph(self) -> Graph:
+        """Rebuild the pydantic `Graph`, without validating it again."""
+        return Graph.from_validated(
+            {
+                identifier: record.to_model()
+                for identifier, record in self.nodes.items()
+            },
+            [record.to_model() for record in self.edges],
+            check_graph=False,
+        )
+
+
+def graph_to_records(graph: Graph) -> GraphRecords:
+    """Convert the nodes and edges of a validated `graph` to records."""
+    fields_sets = {}
+    return GraphRecords(
+        nodes={
+            identifier: to_record(node, fields_sets)
+            for identifier, node in graph.nodes.items()
+        },
+        edges=[to_record(edge, fields_sets) for edge in graph.edges],
+    )
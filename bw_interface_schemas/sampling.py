@@ -0,0 +1,223 @@
+"""
+Vectorized Monte Carlo sampling of edge amounts from their uncertainty
+fields, aligned with the matrices built by `matrices.graph_to_matrices`.
+
+`QuantitativeEdge.uncertainty_type` uses the
+[stats_arrays](https://github.com/brightway-lca/stats_arrays) distribution
+ids, with the same meaning of `loc`, `scale`, `shape`, `minimum`, `maximum`
+and `negative`:
+
+| id | distribution | parameters |
+|----|--------------|------------|
+| 0, 1 | undefined, no uncertainty | `amount` |
+| 2 | lognormal | `loc` (mean of the underlying normal, default `log(abs(amount))`), `scale`; negated if `negative` |
+| 3 | normal | `loc` (default `amount`), `scale` |
+| 4 | uniform | `minimum`, `maximum` |
+| 5 | triangular | `minimum`, `loc` (mode, default `amount`), `maximum` |
+| 7 | discrete uniform | `minimum` (default 0), `maximum` (exclusive) |
+| 8 | Weibull | `loc` (offset, default 0), `scale`, `shape` |
+| 9 | gamma | `loc` (offset, default 0), `scale`, `shape` |
+| 10 | beta | `loc` (alpha), `shape` (beta), `minimum` (default 0), `maximum` (default 1) |
+| 12 | Student's t | `loc` (default `amount`), `scale`, `shape` (degrees of freedom) |
+
+Edges without an `uncertainty_type` keep their `amount`. Values of the
+unbounded distributions (2, 3, 8, 9 and 12) outside `minimum` and `maximum`,
+when given, are drawn again.
+
+Requires `numpy` and `scipy`; install with `pip install bw_interface_schemas[arrays]`.
+"""
+
+from dataclasses import dataclass
+from typing import Callable, Iterator
+
+import numpy as np
+from scipy import sparse
+
+from bw_interface_schemas.columnar import EdgeTable
+from bw_interface_schemas.graph import Graph
+from bw_interface_schemas.matrices import MATRIX_EDGES, matrix_coordinates, node_ranks
+
+PARAMETERS = ("amount", "loc", "scale", "shape", "minimum", "maximum", "negative")
+
+
+def _lognormal(rng, p, size):
+    loc = np.where(np.isnan(p["loc"]), np.log(np.abs(p["amount"])), p["loc"])
+    values = rng.lognormal(loc, p["scale"], size)
+    return np.where(p["negative"], -values, values)
+
+
+def _or(values: np.ndarray, default: np.ndarray | float) -> np.ndarray:
+    return np.where(np.isnan(values), default, values)
+
+
+# Draw `size` values for each distribution id, from parameter arrays which
+# broadcast to `size`
+DISTRIBUTIONS: dict[int, Callable] = {
+    2: _lognormal,
+    3: lambda rng, p, size: rng.normal(_or(p["loc"], p["amount"]), p["scale"], size),
+    4: lambda rng, p, size: rng.uniform(p["minimum"], p["maximum"], size),
+    5: lambda rng, p, size: rng.triangular(
+        p["minimum"], _or(p["loc"], p["amount"]), p["maximum"], size
+    ),
+    7: lambda rng, p, size: rng.integers(
+        _or(p["minimum"], 0), p["maximum"], size
+    ).astype(float),
+    8: lambda rng, p, size: _or(p["loc"], 0)
+    + p["scale"] * rng.weibull(p["shape"], size),
+    9: lambda rng, p, size: _or(p["loc"], 0) + rng.gamma(p["shape"], p["scale"], size),
+    10: lambda rng, p, size: _or(p["minimum"], 0)
+    + (_or(p["maximum"], 1) - _or(p["minimum"], 0))
+    * rng.beta(p["loc"], p["shape"], size),
+    12: lambda rng, p, size: _or(p["loc"], p["amount"])
+    + p["scale"] * rng.standard_t(p["shape"], size),
+}
+NO_UNCERTAINTY = (-1, 0, 1)
+BOUNDED = frozenset({2, 3, 8, 9, 12})
+
+
+def sample_edges(
+    table: EdgeTable,
+    iterations: int,
+    rng: np.random.Generator | int | None = None,
+    positions: np.ndarray | None = None,
+    max_redraws: int = 100,
+) -> np.ndarray:
+    """
+    Draw `iterations` samples of the amount of each edge in `table` (or only
+    the rows at `positions`), as an array of shape `(edges, iterations)`.
+
+    Edges are grouped by `uncertainty_type` and each group is drawn in one
+    NumPy call. `rng` is a NumPy `Generator` or a seed. Values outside the
+    bounds are drawn again up to `max_redraws` times.
+
+    Raises `ValueError` for unsupported distributions, missing parameters,
+    and values which stay out of bounds.
+    """
+    rng = np.random.default_rng(rng)
+    if positions is None:
+        positions = np.arange(len(table))
+    types = table.uncertainty_type[positions]
+    samples = np.empty((len(positions), iterations))
+
+    for code in np.unique(types).tolist():
+        group = np.flatnonzero(types == code)
+        rows = positions[group]
+        if code in NO_UNCERTAINTY:
+            samples[group] = table.amount[rows, None]
+            continue
+        if code not in DISTRIBUTIONS:
+            raise ValueError(f"Unsupported uncertainty_type {code}")
+        draw = DISTRIBUTIONS[code]
+        p = {name: getattr(table, name)[rows, None] for name in PARAMETERS}
+        # Unset `negative` follows the sign of the amount
+        p["negative"] = np.where(
+            p["negative"] == -1, p["amount"] < 0, p["negative"] == 1
+        )
+        with np.errstate(invalid="ignore"):
+            values = draw(rng, p, (len(group), iterations))
+
+        if code in BOUNDED and not (
+            np.isnan(p["minimum"]).all() and np.isnan(p["maximum"]).all()
+        ):
+            low, high = _or(p["minimum"], -np.inf), _or(p["maximum"], np.inf)
+            for _ in range(max_redraws):
+                outside = np.nonzero((values < low) | (values > high))
+                if not len(outside[0]):
+                    break
+                redraw = {name: array[outside[0], 0] for name, array in p.items()}
+                values[outside] = draw(rng, redraw, len(outside[0]))
+            else:
+                raise ValueError(
+                    f"Samples of uncertainty_type {code} still outside bounds after "
+                    f"{max_redraws} draws"
+                )
+        if np.isnan(values).any():
+            missing = rows[np.isnan(values).any(axis=1)]
+            raise ValueError(
+                f"Missing parameters for uncertainty_type {code} in edge rows "
+                f"{missing[:10].tolist()}"
+            )
+        samples[group] = values
+    return samples
+
+
+@dataclass
+class MatrixSamples:
+    """
+    Samples of the values of one matrix from `graph_to_matrices`.
+
+    `rows` and `cols` are the matrix indices (see the `Matrices` mappings) and
+    `positions` the `EdgeTable` rows of the edges with values in the matrix.
+    `values` has one row per edge and one column per iteration, with the same
+    sign as the matrix values. Duplicate edges are summed by `matrix`.
+    """
+
+    rows: np.ndarray
+    cols: np.ndarray
+    positions: np.ndarray
+    values: np.ndarray
+    shape: tuple[int, int]
+
+    def matrix(self, iteration: int, format: str = "csr") -> sparse.sparray:
+        """The matrix for one iteration, as a `scipy.sparse` array"""
+        return sparse.coo_array(
+            (self.values[:, iteration], (self.rows, self.cols)), shape=self.shape
+        ).asformat(format)
+
+
+def iter_matrix_samples(
+    graph: Graph,
+    iterations: int,
+    chunk_size: int = 100,
+    seed: np.random.Generator | int | None = None,
+    table: EdgeTable | None = None,
+) -> Iterator[dict[str, MatrixSamples]]:
+    """
+    Draw `iterations` samples of the technosphere, biosphere and
+    characterization matrix values of `graph`, yielding them `chunk_size`
+    iterations at a time so that memory use doesn't grow with `iterations`.
+
+    Each chunk maps matrix names to `MatrixSamples`, aligned with the indices
+    of `graph_to_matrices`. The same `seed` and `chunk_size` give the same
+    samples. Pass `table` to reuse an `EdgeTable` already built from `graph`.
+    """
+    if table is None:
+        table = EdgeTable.from_graph(graph)
+    rng = np.random.default_rng(seed)
+    node_types, type_codes, ranks, mappings = node_ranks(graph, table)
+
+    coordinates = {}
+    for name, edge_type, row_type, col_type, sign in MATRIX_EDGES:
+        positions, rows, cols, forward = matrix_coordinates(
+            table, node_types, edge_type, type_codes[row_type], type_codes[col_type]
+        )
+        coordinates[name] = (
+            positions,
+            ranks[rows],
+            ranks[cols],
+            np.where(forward, sign, -sign)[:, None],
+            (len(mappings[row_type]), len(mappings[col_type])),
+        )
+
+    for start in range(0, iterations, chunk_size):
+        size = min(chunk_size, iterations - start)
+        yield {
+            name: MatrixSamples(
+                rows=rows,
+                cols=cols,
+                positions=positions,
+                values=sample_edges(table, size, rng, positions) * signs,
+                shape=shape,
+            )
+            for name, (positions, rows, cols, signs, shape) in coordinates.items()
+        }
+
+
+def matrix_samples(
+    graph: Graph,
+    iterations: int,
+    seed: np.random.Generator | int | None = None,
+    table: EdgeTable | None = None,
+) -> dict[str, MatrixSamples]:
+    """All `iterations` samples at once; see `iter_matrix_samples`."""
+    return next(iter_matrix_samples(graph, iterations, max(iterations, 1), seed, table))
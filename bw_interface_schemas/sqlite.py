@@ -0,0 +1,379 @@
+"""
+Persistent graph storage in SQLite, using only the standard library.
+
+Nodes and edges are stored in two tables, with their data as JSON:
+
+* `nodes`: `identifier` (unique), `node_type`, `data`
+* `edges`: `position`, `edge_type`, `source`, `target`, `functional`, `data`
+
+Both are indexed on the columns used by the `Graph` structural rules, which
+run as SQL queries (see `SQLiteStore.violations`), so graphs larger than
+memory can be validated and queried. Nodes and edges are turned into their
+pydantic classes only when read.
+"""
+
+import json
+import sqlite3
+from itertools import islice
+from os import PathLike
+from typing import Iterable, Iterator, Mapping
+
+from bw_interface_schemas.graph import (
+    EDGE_MAPPING,
+    NODE_MAPPING,
+    Graph,
+    Violation,
+    edge_adapter,
+    node_adapter,
+    tagged_dump,
+)
+from bw_interface_schemas.models import (
+    Edge,
+    Identifier,
+    Node,
+    NodeTypes,
+    QualitativeEdgeTypes,
+    QuantitativeEdgeTypes,
+)
+from bw_interface_schemas.streaming import PRODUCT_SYSTEM_MEMBERS
+
+# Identifiers can be integers or strings; columns without a declared type
+# keep each value as given, so `1` and `"1"` stay distinct
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS nodes (
+    identifier UNIQUE NOT NULL,
+    node_type TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS nodes_node_type ON nodes (node_type);
+CREATE TABLE IF NOT EXISTS edges (
+    position INTEGER PRIMARY KEY,
+    edge_type TEXT NOT NULL,
+    source NOT NULL,
+    target NOT NULL,
+    functional INTEGER,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS edges_edge_type ON edges (edge_type);
+CREATE INDEX IF NOT EXISTS edges_source ON edges (source, edge_type);
+CREATE INDEX IF NOT EXISTS edges_target ON edges (target, edge_type);
+"""
+
+
+def _batches(iterable: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+class SQLiteStore:
+    """
+    Graph stored in a SQLite database at `path` (in memory by default).
+
+    Nodes and edges are inserted in batches of `batch_size`, each in its own
+    transaction. Edges keep their insertion order as `position`, matching
+    `Graph.edges`.
+
+    Can be used as a context manager, which closes the connection on exit.
+    """
+
+    def __init__(
+        self,
+        path: str | PathLike = ":memory:",
+        node_mapping: dict[str, type[Node]] = NODE_MAPPING,
+        edge_mapping: dict[str, type[Edge]] = EDGE_MAPPING,
+        edge_type_rules: Mapping = Graph.edge_type_rules,
+        batch_size: int = 10_000,
+    ):
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(SCHEMA)
+        self.node_adapter = node_adapter(node_mapping)
+        self.edge_adapter = edge_adapter(edge_mapping)
+        self.edge_type_rules = edge_type_rules
+        self.batch_size = batch_size
+
+        # Per connection, so stores with different rules can share a file
+        self.connection.executescript("""
+            CREATE TEMP TABLE edge_type_rules (
+                edge_type TEXT NOT NULL,
+                source_type TEXT NOT NULL,
+                target_type TEXT NOT NULL
+            );
+            CREATE INDEX temp.edge_type_rules_key
+                ON edge_type_rules (edge_type, source_type, target_type);
+            """)
+        with self.connection:
+            self.connection.executemany(
+                "INSERT INTO temp.edge_type_rules VALUES (?, ?, ?)",
+                [
+                    (str(edge_type), str(source_type), str(target_type))
+                    for edge_type, rule in edge_type_rules.items()
+                    for source_type, target_type in rule.allowed
+                ],
+            )
+
+    def __enter__(self) -> "SQLiteStore":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def add_nodes(
+        self, nodes: Mapping[Identifier, Node] | Iterable[tuple[Identifier, Node]]
+    ) -> None:
+        """Insert `nodes`. Raises `sqlite3.IntegrityError` on duplicate identifiers."""
+        if isinstance(nodes, Mapping):
+            nodes = nodes.items()
+        rows = (
+            (
+                identifier,
+                str(node.node_type),
+                json.dumps(tagged_dump(node, "node_type"), ensure_ascii=False),
+            )
+            for identifier, node in nodes
+        )
+        for batch in _batches(rows, self.batch_size):
+            with self.connection:
+                self.connection.executemany(
+                    "INSERT INTO nodes (identifier, node_type, data) VALUES (?, ?, ?)",
+                    batch,
+                )
+
+    def add_edges(self, edges: Iterable[Edge]) -> None:
+        """Append `edges` after the edges already stored."""
+        (position,) = self.connection.execute(
+            "SELECT COALESCE(MAX(position) + 1, 0) FROM edges"
+        ).fetchone()
+        rows = (
+            (
+                position,
+                str(edge.edge_type),
+                edge.source,
+                edge.target,
+                (
+                    functional
+                    if isinstance(functional := getattr(edge, "functional", None), bool)
+                    else None
+                ),
+                json.dumps(tagged_dump(edge, "edge_type"), ensure_ascii=False),
+            )
+            for position, edge in enumerate(edges, start=position)
+        )
+        for batch in _batches(rows, self.batch_size):
+            with self.connection:
+                self.connection.executemany(
+                    "INSERT INTO edges VALUES (?, ?, ?, ?, ?, ?)", batch
+                )
+
+    def add_graph(self, graph: Graph) -> None:
+        self.add_nodes(graph.nodes)
+        self.add_edges(graph.edges)
+
+    def count_nodes(self, node_type: str | None = None) -> int:
+        if node_type is None:
+            return self.connection.execute("SELECT COUNT(*) FROM nodes").fetchone()[0]
+        return self.connection.execute(
+            "SELECT COUNT(*) FROM nodes WHERE node_type = ?", (str(node_type),)
+        ).fetchone()[0]
+
+    def count_edges(self, edge_type: str | None = None) -> int:
+        if edge_type is None:
+            return self.connection.execute("SELECT COUNT(*) FROM edges").fetchone()[0]
+        return self.connection.execute(
+            "SELECT COUNT(*) FROM edges WHERE edge_type = ?", (str(edge_type),)
+        ).fetchone()[0]
+
+    def node(self, identifier: Identifier) -> Node:
+        """Load one node. Raises `KeyError` if it isn't stored."""
+        row = self.connection.execute(
+            "SELECT data FROM nodes WHERE identifier = ?", (identifier,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(identifier)
+        return self.node_adapter.validate_json(row[0])
+
+    def edge(self, position: int) -> Edge:
+        """Load the edge at `position`. Raises `IndexError` if there isn't one."""
+        row = self.connection.execute(
+            "SELECT data FROM edges WHERE position = ?", (position,)
+        ).fetchone()
+        if row is None:
+            raise IndexError(position)
+        return self.edge_adapter.validate_json(row[0])
+
+    def nodes(self, node_type: str | None = None) -> Iterator[tuple[Identifier, Node]]:
+        """`(identifier, node)` pairs in insertion order, optionally of one type"""
+        query = "SELECT identifier, data FROM nodes"
+        params = ()
+        if node_type is not None:
+            query += " WHERE node_type = ?"
+            params = (str(node_type),)
+        for identifier, data in self.connection.execute(
+            query + " ORDER BY rowid", params
+        ):
+            yield identifier, self.node_adapter.validate_json(data)
+
+    def edges(
+        self,
+        edge_type: str | None = None,
+        source: Identifier | None = None,
+        target: Identifier | None = None,
+    ) -> Iterator[Edge]:
+        """Edges in order of `position`, optionally filtered on each column"""
+        filters = {"edge_type": edge_type, "source": source, "target": target}
+        filters = {
+            column: str(value) if column == "edge_type" else value
+            for column, value in filters.items()
+            if value is not None
+        }
+        query = "SELECT data FROM edges"
+        if filters:
+            query += " WHERE " + " AND ".join(f"{column} = ?" for column in filters)
+        for (data,) in self.connection.execute(
+            query + " ORDER BY position", tuple(filters.values())
+        ):
+            yield self.edge_adapter.validate_json(data)
+
+    def violations(self) -> Iterator[Violation]:
+        """
+        Check the `Graph` structural rules with SQL queries, yielding each
+        violation in the same order and with the same messages as
+        `Graph.validate_report`.
+        """
+        execute = self.connection.execute
+
+        missing_nodes = execute("""
+            SELECT e.position, e.source, e.target,
+                NOT EXISTS (SELECT 1 FROM nodes WHERE identifier = e.source),
+                NOT EXISTS (SELECT 1 FROM nodes WHERE identifier = e.target)
+            FROM edges AS e
+            WHERE NOT EXISTS (SELECT 1 FROM nodes WHERE identifier = e.source)
+                OR NOT EXISTS (SELECT 1 FROM nodes WHERE identifier = e.target)
+            ORDER BY e.position
+            """)
+        for position, source, target, source_missing, target_missing in missing_nodes:
+            for attr, identifier, missing in (
+                ("source", source, source_missing),
+                ("target", target, target_missing),
+            ):
+                if missing:
+                    yield Violation(
+                        rule="edges_reference_nodes",
+                        message=f"Can't find edge {attr} in nodes: {identifier}",
+                        edge=position,
+                        nodes=[identifier],
+                    )
+
+        for node_type, rule in PRODUCT_SYSTEM_MEMBERS.items():
+            for (identifier,) in execute(
+                """
+                SELECT n.identifier FROM nodes AS n
+                WHERE n.node_type = ? AND NOT EXISTS (
+                    SELECT 1 FROM edges AS e
+                    JOIN nodes AS t ON t.identifier = e.target
+                    WHERE e.source = n.identifier
+                        AND e.edge_type = ?
+                        AND t.node_type = ?
+                )
+                ORDER BY n.rowid
+                """,
+                (
+                    str(node_type),
+                    str(QualitativeEdgeTypes.belongs_to),
+                    str(NodeTypes.product_system),
+                ),
+            ):
+                yield Violation(
+                    rule=rule,
+                    message=f"{node_type} node not linked to a product system: {identifier}",
+                    nodes=[identifier],
+                )
+
+        for (identifier,) in execute(
+            """
+            SELECT n.identifier FROM nodes AS n
+            WHERE n.node_type = ?
+                AND NOT EXISTS (
+                    SELECT 1 FROM edges
+                    WHERE source = n.identifier AND edge_type = ? AND functional
+                )
+                AND NOT EXISTS (
+                    SELECT 1 FROM edges
+                    WHERE target = n.identifier AND edge_type = ? AND functional
+                )
+            ORDER BY n.rowid
+            """,
+            (
+                str(NodeTypes.process),
+                str(QuantitativeEdgeTypes.technosphere),
+                str(QuantitativeEdgeTypes.technosphere),
+            ),
+        ):
+            yield Violation(
+                rule="process_has_at_least_one_functional_edge",
+                message=f"Can't find functional edge for process node: {identifier}",
+                nodes=[identifier],
+            )
+
+        functional_types = [
+            str(edge_type)
+            for edge_type, rule in self.edge_type_rules.items()
+            if rule.functional
+        ]
+        placeholders = ", ".join("?" * len(self.edge_type_rules))
+        for position, edge_type, disallowed, data in execute(
+            f"""
+            SELECT e.position, e.edge_type, NOT EXISTS (
+                SELECT 1 FROM temp.edge_type_rules AS r
+                WHERE r.edge_type = e.edge_type
+                    AND r.source_type = s.node_type
+                    AND r.target_type = t.node_type
+            ) AS disallowed, e.data
+            FROM edges AS e
+            JOIN nodes AS s ON s.identifier = e.source
+            JOIN nodes AS t ON t.identifier = e.target
+            WHERE e.edge_type IN ({placeholders})
+                AND (
+                    disallowed
+                    OR (e.edge_type IN ({", ".join("?" * len(functional_types))})
+                        AND e.functional IS NULL)
+                )
+            ORDER BY e.position
+            """,
+            [str(edge_type) for edge_type in self.edge_type_rules] + functional_types,
+        ):
+            # Only the offending edges are loaded, for the message
+            edge = self.edge_adapter.validate_json(data)
+            rule = self.edge_type_rules[edge_type]
+            if disallowed:
+                yield Violation(
+                    rule=f"{edge_type}_edge_source_target_types",
+                    message=f"{rule.message} ({edge})",
+                    edge=position,
+                    nodes=[edge.source, edge.target],
+                )
+            if rule.functional and not isinstance(
+                getattr(edge, "functional", None), bool
+            ):
+                yield Violation(
+                    rule=f"{edge_type}_edge_must_specify_functionality",
+                    message=f"{edge_type.capitalize()} edges must indicate functionality status ({edge})",
+                    edge=position,
+                    nodes=[edge.source, edge.target],
+                )
+
+    def validate(self) -> None:
+        """Raise `ValueError` on the first structural rule violation."""
+        for violation in self.violations():
+            raise ValueError(violation.message)
+
+    def to_graph(self, check_graph: bool = True) -> Graph:
+        """Load everything into a `Graph`. Structural rules are checked in SQL."""
+        if check_graph:
+            self.validate()
+        return Graph.from_validated(
+            dict(self.nodes()), list(self.edges()), check_graph=False
+        )
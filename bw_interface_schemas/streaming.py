@@ -0,0 +1,312 @@
+"""
+Streaming JSON Lines (NDJSON) format for graphs.
+
+Each line is one record. Node records come first, then edge records:
+
+```
+{"identifier": "bicycle", "node": {"node_type": "product", "name": "bicycle", ...}}
+{"edge": {"edge_type": "technosphere", "source": "bike manufacturing", ...}}
+```
+
+Records are validated one at a time, and the `Graph` structural rules are
+checked incrementally as they arrive, so memory use doesn't grow with the
+number of edges.
+"""
+
+import json
+from contextlib import contextmanager
+from functools import cache
+from os import PathLike
+from typing import IO, Annotated, Any, Iterable, Iterator, Mapping, Union
+
+from pydantic import Discriminator, Tag, TypeAdapter
+from typing_extensions import TypedDict
+
+from bw_interface_schemas.graph import (
+    EDGE_MAPPING,
+    NODE_MAPPING,
+    Graph,
+    Violation,
+    getter,
+    tagged_dump,
+    tagged_union,
+)
+from bw_interface_schemas.models import (
+    Edge,
+    Identifier,
+    Node,
+    NodeTypes,
+    QualitativeEdgeTypes,
+    QuantitativeEdgeTypes,
+)
+
+# Node types which must belong to a product system
+PRODUCT_SYSTEM_MEMBERS = {
+    NodeTypes.process: "processes_in_product_system",
+    NodeTypes.product: "products_in_product_system",
+    NodeTypes.elementary_flow: "elementary_flows_in_product_system",
+}
+
+
+class StreamValidator:
+    """
+    Incremental version of the `Graph` structural rules.
+
+    Nodes must all be added before edges. Edge rules are checked as each
+    edge is added; rules which depend on all the edges of a node (product
+    system membership, functional edges) are settled in `finish`. Only node
+    types and the set of unsettled nodes are kept in memory.
+
+    Nodes and edges can be model instances or raw dictionaries, so the rules
+    can be checked before anything is validated. A raw edge without
+    `functional` gets the default of its class in `edge_mapping`. Raw
+    dictionaries with a missing or non-string `node_type` or `edge_type`, or
+    a `source` or `target` which isn't an identifier, raise `TypeError`;
+    validation reports those properly.
+    """
+
+    def __init__(
+        self,
+        edge_type_rules: Mapping = Graph.edge_type_rules,
+        edge_mapping: dict[str, type[Edge]] = EDGE_MAPPING,
+    ):
+        self.edge_type_rules = edge_type_rules
+        self.functional_defaults = {
+            edge_type: kls.model_fields["functional"].default
+            for edge_type, kls in edge_mapping.items()
+            if "functional" in kls.model_fields
+            and not kls.model_fields["functional"].is_required()
+        }
+        self.node_types: dict[Identifier, str] = {}
+        # Dictionaries as ordered sets, so `finish` reports in node order
+        self.not_in_product_system: dict[Identifier, None] = {}
+        self.without_functional_edge: dict[Identifier, None] = {}
+        self.edges_seen = 0
+
+    def add_node(self, identifier: Identifier, node: Node | dict) -> None:
+        if self.edges_seen:
+            raise ValueError("Node records must come before edge records")
+        if identifier in self.node_types:
+            raise ValueError(f"Duplicate node identifier: {identifier}")
+        node_type = getter(node, "node_type")
+        if not isinstance(node_type, str):
+            raise TypeError(f"Node {identifier} has no valid node_type: {node_type!r}")
+        self.node_types[identifier] = node_type
+        if node_type in PRODUCT_SYSTEM_MEMBERS:
+            self.not_in_product_system[identifier] = None
+        if node_type == NodeTypes.process:
+            self.without_functional_edge[identifier] = None
+
+    def add_edge(self, edge: Edge | dict) -> Iterator[Violation]:
+        position = self.edges_seen
+        self.edges_seen += 1
+
+        edge_type = getter(edge, "edge_type")
+        source, target = getter(edge, "source"), getter(edge, "target")
+        if not isinstance(edge_type, str) or not all(
+            isinstance(identifier, (int, str)) for identifier in (source, target)
+        ):
+            raise TypeError(f"Edge {position} has no valid edge_type, source or target")
+        source_type = self.node_types.get(source)
+        target_type = self.node_types.get(target)
+        for attr, identifier, node_type in (
+            ("source", source, source_type),
+            ("target", target, target_type),
+        ):
+            if node_type is None:
+                yield Violation(
+                    rule="edges_reference_nodes",
+                    message=f"Can't find edge {attr} in nodes: {identifier}",
+                    edge=position,
+                    nodes=[identifier],
+                )
+        if source_type is None or target_type is None:
+            return
+
+        functional = getter(edge, "functional")
+        if isinstance(edge, dict) and "functional" not in edge:
+            functional = self.functional_defaults.get(edge_type)
+        rule = self.edge_type_rules.get(edge_type)
+        if rule is not None:
+            if (source_type, target_type) not in rule.allowed:
+                yield Violation(
+                    rule=f"{edge_type}_edge_source_target_types",
+                    message=f"{rule.message} ({edge})",
+                    edge=position,
+                    nodes=[source, target],
+                )
+            if rule.functional and not isinstance(functional, bool):
+                yield Violation(
+                    rule=f"{edge_type}_edge_must_specify_functionality",
+                    message=f"{edge_type.capitalize()} edges must indicate functionality status ({edge})",
+                    edge=position,
+                    nodes=[source, target],
+                )
+
+        if (
+            edge_type == QualitativeEdgeTypes.belongs_to
+            and target_type == NodeTypes.product_system
+        ):
+            self.not_in_product_system.pop(source, None)
+        if edge_type == QuantitativeEdgeTypes.technosphere and functional:
+            self.without_functional_edge.pop(source, None)
+            self.without_functional_edge.pop(target, None)
+
+    def finish(self) -> Iterator[Violation]:
+        """
+        Violations of the rules which need all edges to have been seen, by
+        rule and then in node order, like `Graph.validate_report`.
+        """
+        for label, rule in PRODUCT_SYSTEM_MEMBERS.items():
+            for identifier in self.not_in_product_system:
+                if self.node_types[identifier] == label:
+                    yield Violation(
+                        rule=rule,
+                        message=(
+                            f"{label} node not linked to a product system: {identifier}"
+                        ),
+                        nodes=[identifier],
+                    )
+        for identifier in self.without_functional_edge:
+            yield Violation(
+                rule="process_has_at_least_one_functional_edge",
+                message=f"Can't find functional edge for process node: {identifier}",
+                nodes=[identifier],
+            )
+
+
+def raw_violations(
+    graph: dict[str, Any],
+    edge_type_rules: Mapping = Graph.edge_type_rules,
+    edge_mapping: dict[str, type[Edge]] = EDGE_MAPPING,
+) -> Iterator[Violation]:
+    """
+    Check the `Graph` structural rules on a graph dictionary in the
+    `graph_to_pydantic` input format, before anything is validated.
+
+    Only `node_type`, `edge_type`, `source`, `target` and `functional` are
+    read, with hash lookups and without building any objects. Values are
+    checked as given, so e.g. `"functional": "true"`, which validation would
+    convert to `True`, is a violation. Edge rules are reported as edges are
+    scanned, so stopping at the first violation skips the rest of the scan.
+    """
+    validator = StreamValidator(edge_type_rules, edge_mapping)
+    for identifier, node in graph["nodes"].items():
+        validator.add_node(identifier, node)
+    for edge in graph["edges"]:
+        yield from validator.add_edge(edge)
+    yield from validator.finish()
+
+
+@cache
+def _record_adapter(
+    node_mapping: tuple[tuple[str, type[Node]], ...],
+    edge_mapping: tuple[tuple[str, type[Edge]], ...],
+) -> TypeAdapter:
+    node_union = tagged_union(dict(node_mapping), Node, "node_type")
+    edge_union = tagged_union(dict(edge_mapping), Edge, "edge_type")
+
+    class NodeRecord(TypedDict):
+        identifier: Identifier
+        node: node_union
+
+    class EdgeRecord(TypedDict):
+        edge: edge_union
+
+    return TypeAdapter(
+        Annotated[
+            Union[
+                Annotated[NodeRecord, Tag("node")], Annotated[EdgeRecord, Tag("edge")]
+            ],
+            Discriminator(lambda obj: "node" if "node" in obj else "edge"),
+        ]
+    )
+
+
+@contextmanager
+def _opened(file: str | PathLike | IO, mode: str) -> Iterator[IO]:
+    if hasattr(file, "read" if "r" in mode else "write"):
+        yield file
+    else:
+        with open(file, mode, **({} if "b" in mode else {"encoding": "utf-8"})) as f:
+            yield f
+
+
+def read_jsonl(
+    file: str | PathLike | IO,
+    node_mapping: dict[str, type[Node]] = NODE_MAPPING,
+    edge_mapping: dict[str, type[Edge]] = EDGE_MAPPING,
+    check_graph: bool = True,
+    edge_type_rules: Mapping = Graph.edge_type_rules,
+) -> Iterator[tuple[Identifier, Node] | Edge]:
+    """
+    Read a JSON Lines graph, yielding `(identifier, node)` tuples for node
+    records and `Edge` instances for edge records.
+
+    Each record is validated as it is read. If `check_graph`, the `Graph`
+    structural rules are applied incrementally (see `StreamValidator`), and
+    `ValueError` is raised on the first violation; rules which need every edge
+    are only settled after the last record.
+    """
+    adapter = _record_adapter(tuple(node_mapping.items()), tuple(edge_mapping.items()))
+    validator = StreamValidator(edge_type_rules, edge_mapping)
+
+    def check(violations: Iterable[Violation]) -> None:
+        for violation in violations:
+            raise ValueError(violation.message)
+
+    with _opened(file, "rb") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = adapter.validate_json(line)
+            if "node" in record:
+                if check_graph:
+                    validator.add_node(record["identifier"], record["node"])
+                yield record["identifier"], record["node"]
+            else:
+                if check_graph:
+                    check(validator.add_edge(record["edge"]))
+                yield record["edge"]
+    if check_graph:
+        check(validator.finish())
+
+
+def load_jsonl(
+    file: str | PathLike | IO,
+    node_mapping: dict[str, type[Node]] = NODE_MAPPING,
+    edge_mapping: dict[str, type[Edge]] = EDGE_MAPPING,
+    check_graph: bool = True,
+) -> Graph:
+    """Read a JSON Lines graph into a `Graph`. See `read_jsonl`."""
+    nodes, edges = {}, []
+    for record in read_jsonl(file, node_mapping, edge_mapping, check_graph):
+        if isinstance(record, Edge):
+            edges.append(record)
+        else:
+            nodes[record[0]] = record[1]
+    # Structural rules were already checked while reading
+    return Graph.from_validated(nodes, edges, check_graph=False)
+
+
+def write_jsonl(
+    file: str | PathLike | IO,
+    nodes: Mapping[Identifier, Node] | Iterable[tuple[Identifier, Node]],
+    edges: Iterable[Edge],
+) -> None:
+    """
+    Write nodes and then edges as JSON Lines, one record at a time.
+
+    `nodes` and `edges` can be generators, so data can be streamed from
+    another source; use `write_jsonl(file, graph.nodes, graph.edges)` for a
+    `Graph`.
+    """
+    if isinstance(nodes, Mapping):
+        nodes = nodes.items()
+    with _opened(file, "w") as f:
+        for identifier, node in nodes:
+            record = {"identifier": identifier, "node": tagged_dump(node, "node_type")}
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        for edge in edges:
+            record = {"edge": tagged_dump(edge, "edge_type")}
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
@@ -0,0 +1,121 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("pyarrow")
+
+import bw_interface_schemas as schema  # noqa: E402
+import bw_interface_schemas.arrow as arrow  # noqa: E402
+from bw_interface_schemas.arrow import (  # noqa: E402
+    read_edge_table,
+    read_edge_tables,
+    read_graph,
+    write_graph,
+)
+from bw_interface_schemas.matrices import graph_to_matrices  # noqa: E402
+
+
+@pytest.mark.parametrize("format", ["arrow", "parquet"])
+def test_roundtrip(bike_as_dict, bike_as_graph, tmp_path, format):
+    write_graph(bike_as_graph, tmp_path, format=format)
+    assert (tmp_path / f"edges.technosphere.{format}").exists()
+    graph = read_graph(tmp_path)
+    assert graph == bike_as_graph
+    assert list(graph.nodes) == list(bike_as_graph.nodes)
+    assert graph.model_dump(exclude_unset=True) == schema.graph_to_pydantic(
+        bike_as_dict
+    ).model_dump(exclude_unset=True)
+
+
+def test_roundtrip_attributes(bike_as_dict, tmp_path):
+    bike_as_dict["edges"][1].update(
+        {"comment": "hi", "tags": {"a": 1}, "uncertainty_type": 2, "custom": [1, 2]}
+    )
+    bike_as_dict["edges"][2]["loc"] = None
+    graph = schema.graph_to_pydantic(bike_as_dict)
+    write_graph(graph, tmp_path)
+    result = read_graph(tmp_path)
+    assert result == graph
+    assert [edge.model_fields_set for edge in result.edges] == [
+        edge.model_fields_set for edge in graph.edges
+    ]
+
+
+def test_edge_table(bike_as_graph, tmp_path):
+    write_graph(bike_as_graph, tmp_path)
+    table = read_edge_table(tmp_path)
+    assert table.identifiers == list(bike_as_graph.nodes)
+    assert list(table) == bike_as_graph.edges
+    matrices = graph_to_matrices(bike_as_graph, table=table)
+    expected = graph_to_matrices(bike_as_graph)
+    assert (matrices.technosphere != expected.technosphere).nnz == 0
+
+
+def test_edge_tables_are_file_views(bike_as_graph, tmp_path):
+    write_graph(bike_as_graph, tmp_path)
+    tables = read_edge_tables(tmp_path)
+    assert sorted(tables) == [
+        "belongs_to",
+        "biosphere",
+        "characterization",
+        "technosphere",
+    ]
+    for table in tables.values():
+        for name in ("source", "target", "amount", "uncertainty_type", "functional"):
+            assert not table.columns[name].flags.owndata
+            assert table.columns[name].base is not None
+    assert list(tables["technosphere"]) == [
+        edge for edge in bike_as_graph.edges if edge.edge_type == "technosphere"
+    ]
+    matrices = graph_to_matrices(bike_as_graph, table=tables.values())
+    expected = graph_to_matrices(bike_as_graph)
+    assert (matrices.technosphere != expected.technosphere).nnz == 0
+    assert (matrices.biosphere != expected.biosphere).nnz == 0
+
+
+def test_read_graph_reads_nodes_once(bike_as_graph, tmp_path, monkeypatch):
+    write_graph(bike_as_graph, tmp_path)
+    calls = []
+    read_nodes = arrow._read_nodes
+    monkeypatch.setattr(
+        arrow, "_read_nodes", lambda *args: calls.append(args) or read_nodes(*args)
+    )
+    assert read_graph(tmp_path) == bike_as_graph
+    assert len(calls) == 1
+
+
+def test_missing_node(bike_as_graph, tmp_path):
+    bike_as_graph.edges.append(
+        schema.QualitativeEdge(
+            edge_type="belongs_to", source="missing", target="bike_db"
+        )
+    )
+    with pytest.raises(ValueError):
+        write_graph(bike_as_graph, tmp_path)
+
+
+def test_overwrite(bike_as_graph, tmp_path):
+    write_graph(bike_as_graph, tmp_path, format="parquet")
+    smaller = bike_as_graph.model_copy(deep=True)
+    smaller.edges = [edge for edge in smaller.edges if edge.edge_type != "belongs_to"]
+    write_graph(smaller, tmp_path)
+    assert not list(tmp_path.glob("*.parquet"))
+    assert not (tmp_path / "edges.belongs_to.arrow").exists()
+    assert read_graph(tmp_path, check_graph=False).edges == smaller.edges
+
+
+def test_mixed_formats(bike_as_graph, tmp_path):
+    write_graph(bike_as_graph, tmp_path, format="parquet")
+    (tmp_path / "edges.technosphere.parquet").rename(
+        tmp_path / "edges.technosphere.arrow"
+    )
+    with pytest.raises(ValueError):
+        read_graph(tmp_path)
+    assert len(read_edge_table(tmp_path, format="parquet")) == 10
+
+
+def test_type_filenames(bike_as_dict, tmp_path):
+    bike_as_dict["nodes"]["bike_db"]["node_type"] = "../product.x"
+    graph = schema.graph_to_pydantic(bike_as_dict, check_graph=False)
+    write_graph(graph, tmp_path / "out")
+    assert (tmp_path / "out" / "nodes...%2Fproduct.x.arrow").exists()
+    assert read_graph(tmp_path / "out", check_graph=False) == graph
@@ -0,0 +1,127 @@
+import json
+from copy import deepcopy
+
+import pytest
+
+import bw_interface_schemas as schema
+from bw_interface_schemas.cache import ValidationCache, file_fingerprint, fingerprint
+from bw_interface_schemas.construct import construct_graph
+from bw_interface_schemas.graph import EDGE_MAPPING, NODE_MAPPING
+
+
+def test_fingerprint(bike_as_dict):
+    assert fingerprint(bike_as_dict) == fingerprint(deepcopy(bike_as_dict))
+    changed = deepcopy(bike_as_dict)
+    changed["edges"][3]["amount"] = 2
+    assert fingerprint(changed) != fingerprint(bike_as_dict)
+
+
+def test_file_fingerprint(bike_as_dict, tmp_path):
+    data = json.dumps(bike_as_dict).encode()
+    (tmp_path / "bike.json").write_bytes(data)
+    assert file_fingerprint(tmp_path / "bike.json", chunk_size=100) == file_fingerprint(
+        data
+    )
+
+
+def test_construct_graph(bike_as_dict, bike_as_graph):
+    data = deepcopy(bike_as_dict)
+    data["edges"][1]["references"] = [
+        {"authors": ["Ann"], "year": 2000, "title": "Bikes"}
+    ]
+    data["edges"][1]["custom"] = 1
+    expected = schema.graph_to_pydantic(deepcopy(data))
+    graph = construct_graph(json.loads(json.dumps(data)))
+    assert graph == expected
+    assert isinstance(graph.edges[1].references[0], schema.DataSource)
+    assert graph.edges[3].amount == 1.0 and type(graph.edges[3].amount) is float
+    assert [obj.model_fields_set for obj in graph.edges] == [
+        obj.model_fields_set for obj in expected.edges
+    ]
+    assert graph.model_dump_json() == expected.model_dump_json()
+
+
+def test_cache_key(tmp_path):
+    cache = ValidationCache(tmp_path / "cache")
+    key = cache.key("abc", NODE_MAPPING, EDGE_MAPPING)
+    assert key == cache.key("abc", NODE_MAPPING, EDGE_MAPPING)
+    assert key != cache.key("abd", NODE_MAPPING, EDGE_MAPPING)
+    mapping = EDGE_MAPPING | {"technosphere": schema.QuantitativeEdge}
+    assert key != cache.key("abc", NODE_MAPPING, mapping)
+
+
+def test_graph_to_pydantic_cache(bike_as_dict, tmp_path, monkeypatch):
+    cache = ValidationCache(tmp_path / "cache")
+    first = schema.graph_to_pydantic(deepcopy(bike_as_dict), cache=cache)
+    assert len(cache) == 1
+    # Reloaded from the file
+    cache = ValidationCache(tmp_path / "cache")
+    assert len(cache) == 1
+
+    def fail(*args, **kwargs):
+        raise AssertionError("checked again")
+
+    # Neither the nodes and edges nor the structural rules are validated again
+    monkeypatch.setattr(schema.graph, "graph_adapter", fail)
+    monkeypatch.setattr(schema.Graph, "_violations", fail)
+    assert schema.graph_to_pydantic(deepcopy(bike_as_dict), cache=cache) == first
+    with pytest.raises(AssertionError):
+        schema.graph_to_pydantic(deepcopy(bike_as_dict), cache=cache, force=True)
+
+
+def test_graph_to_pydantic_cache_trusted(bike_as_dict, tmp_path):
+    cache = ValidationCache(tmp_path / "cache")
+    schema.graph_to_pydantic(
+        deepcopy(bike_as_dict), cache=cache, trusted=True, check_graph=False
+    )
+    assert len(cache) == 0
+    first = schema.graph_to_pydantic(deepcopy(bike_as_dict), cache=cache, trusted=True)
+    assert len(cache) == 1
+    assert schema.graph_to_pydantic(deepcopy(bike_as_dict), cache=cache) == first
+
+
+def test_graph_to_pydantic_cache_invalid(bike_as_dict, tmp_path):
+    cache = ValidationCache(tmp_path / "cache")
+    data = deepcopy(bike_as_dict)
+    data["edges"][3]["source"] = "missing"
+    with pytest.raises(ValueError):
+        schema.graph_to_pydantic(data, cache=cache)
+    schema.graph_to_pydantic(data, check_graph=False, cache=cache)
+    assert len(cache) == 0
+
+
+def test_from_json_cache(bike_as_dict, bike_as_graph, tmp_path):
+    path = tmp_path / "bike.json"
+    path.write_text(json.dumps(bike_as_dict))
+    cache = ValidationCache(tmp_path / "cache")
+    assert schema.Graph.from_json(path, cache=cache) == bike_as_graph
+    assert len(cache) == 1
+    assert schema.Graph.from_json(path, cache=cache) == bike_as_graph
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_from_json_cache_graph_class(bike_as_dict, tmp_path):
+    class StrictGraph(schema.Graph):
+        edge_type_rules = schema.EDGE_TYPE_RULES | {
+            "belongs_to": schema.EdgeTypeRule(
+                allowed=frozenset(
+                    {(schema.NodeTypes.process, schema.NodeTypes.product_system)}
+                ),
+                message="Only processes can belong to things",
+            )
+        }
+
+    class OtherGraph(schema.Graph):
+        pass
+
+    path = tmp_path / "bike.json"
+    path.write_text(json.dumps(bike_as_dict))
+    cache = ValidationCache(tmp_path / "cache")
+    schema.Graph.from_json(path, cache=cache)
+    assert type(OtherGraph.from_json(path, cache=cache)) is OtherGraph
+    assert type(OtherGraph.from_json(path, cache=cache)) is OtherGraph
+    assert len(cache) == 2
+    # Not a hit for a class with other rules
+    with pytest.raises(ValueError, match="Only processes"):
+        StrictGraph.from_json(path, cache=cache)
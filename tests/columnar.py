@@ -0,0 +1,55 @@
+from copy import deepcopy
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import bw_interface_schemas as schema  # noqa: E402
+from bw_interface_schemas.columnar import EdgeTable  # noqa: E402
+
+
+def test_columns(bike_as_graph):
+    table = EdgeTable.from_graph(bike_as_graph)
+    assert len(table) == len(bike_as_graph.edges)
+    assert table.identifiers == list(bike_as_graph.nodes)
+    assert table.source.dtype == np.int32
+    assert table.identifiers[table.source[3]] == "bike manufacturing"
+    assert table.edge_types[table.edge_type[3]] == "technosphere"
+    assert table.amount[6] == 237
+    assert np.isnan(table.amount[0])
+    assert list(table.functional[3:8]) == [1, 1, 1, -1, -1]
+
+
+def test_row_views(bike_as_graph):
+    table = EdgeTable.from_graph(bike_as_graph)
+    edge = table[-1]
+    assert isinstance(edge, schema.QualitativeEdge)
+    assert edge.target == "bike_db"
+    assert table[3].functional is True
+    with pytest.raises(IndexError):
+        table[len(table)]
+
+
+def test_graph_roundtrip_lossless(bike_as_dict):
+    bike_as_dict["edges"][1].update(
+        {"comment": "hi", "tags": {"a": 1}, "loc": None, "custom": [1, 2]}
+    )
+    bike_as_dict["edges"][2].update(
+        {
+            "uncertainty_type": 2,
+            "loc": 3.2,
+            "scale": 0.1,
+            "negative": False,
+            "references": [{"authors": ["Me"], "year": 2024, "title": "Paper"}],
+        }
+    )
+    graph = schema.graph_to_pydantic(deepcopy(bike_as_dict))
+    table = EdgeTable.from_graph(graph)
+    assert table.to_graph(graph.nodes).model_dump(exclude_unset=True) == bike_as_dict
+    assert table.to_graph(graph.nodes).model_dump() == graph.model_dump()
+    assert table.attributes[1] == {
+        "comment": "hi",
+        "tags": {"a": 1},
+        "loc": None,
+        "custom": [1, 2],
+    }
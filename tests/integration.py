@@ -1,5 +1,9 @@
+import json
 from copy import deepcopy
 
+import pytest
+from pydantic import ValidationError
+
 import bw_interface_schemas as schema
 from bw_interface_schemas.graph import NODE_MAPPING, EDGE_MAPPING
 
@@ -23,3 +27,152 @@ def test_roundtrip(bike_as_dict):
     assert schema.graph_to_pydantic(deepcopy(bike_as_dict)).model_dump(
         exclude_unset=True
     ) == deepcopy(bike_as_dict)
+
+
+def test_construct_graph_custom_mapping(bike_as_dict):
+    class Method(schema.Collection):
+        version: int = 1
+
+    bike_as_dict["nodes"]["IPCC"]["node_type"] = "lcia_method"
+    bike_as_dict["nodes"]["IPCC"]["version"] = 3
+    bike_as_dict["nodes"]["memo"] = {"node_type": "memo", "name": "memo"}
+    mapping = NODE_MAPPING | {"lcia_method": Method}
+
+    graph = schema.graph_to_pydantic(bike_as_dict, node_mapping=mapping)
+    assert isinstance(graph.nodes["IPCC"], Method)
+    assert graph.nodes["IPCC"].version == 3
+    assert type(graph.nodes["memo"]) is schema.Node
+
+
+def test_construct_graph_invalid_edge(bike_as_dict):
+    bike_as_dict["edges"][2]["functional"] = False
+    with pytest.raises(
+        ValidationError, match="biosphere edges can never be functional"
+    ):
+        schema.graph_to_pydantic(bike_as_dict)
+
+
+def test_from_json(bike_as_dict, tmp_path):
+    data = json.dumps(bike_as_dict).encode("utf-8")
+    expected = schema.graph_to_pydantic(bike_as_dict).model_dump()
+    assert schema.Graph.from_json(data).model_dump() == expected
+
+    (tmp_path / "bike.json").write_bytes(data)
+    graph = schema.Graph.from_json(tmp_path / "bike.json")
+    assert graph.model_dump() == expected
+    assert isinstance(graph.edges[3], schema.TechnosphereQuantitativeEdge)
+
+
+def test_identifiers_are_interned(bike_as_dict):
+    graph = schema.Graph.from_json(json.dumps(bike_as_dict).encode("utf-8"))
+    keys = {id(identifier) for identifier in graph.nodes}
+    assert all(
+        id(edge.source) in keys and id(edge.target) in keys for edge in graph.edges
+    )
+    assert "source" in graph.edges[0].model_fields_set
+
+
+def test_node_ids(bike_as_graph):
+    ids = bike_as_graph.node_ids()
+    assert list(ids) == list(bike_as_graph.nodes)
+    assert list(ids.values()) == list(range(len(bike_as_graph.nodes)))
+
+
+def test_from_json_invalid(bike_as_dict):
+    del bike_as_dict["nodes"]["bike_db"]
+    with pytest.raises(ValidationError, match="Can't find edge target"):
+        schema.Graph.from_json(json.dumps(bike_as_dict).encode("utf-8"))
+
+
+def test_dump_json_roundtrip(bike_as_dict):
+    graph = schema.graph_to_pydantic(deepcopy(bike_as_dict))
+    assert json.loads(graph.model_dump_json(exclude_unset=True)) == json.loads(
+        json.dumps(bike_as_dict)
+    )
+
+
+def test_dump_unknown_subclass(bike_as_graph):
+    class Bike(schema.Product):
+        wheels: int = 2
+
+    bike_as_graph.nodes["bicycle"] = Bike(**bike_as_graph.nodes["bicycle"].model_dump())
+    assert bike_as_graph.model_dump()["nodes"]["bicycle"]["wheels"] == 2
+    assert '"wheels":2' in bike_as_graph.model_dump_json()
+
+
+def test_construct_graph_in_parallel(bike_as_dict, bike_as_graph):
+    graph = schema.graph_to_pydantic(bike_as_dict, workers=2, chunk_size=4)
+    assert graph == bike_as_graph
+    assert [edge.model_fields_set for edge in graph.edges] == [
+        edge.model_fields_set for edge in bike_as_graph.edges
+    ]
+
+
+def test_construct_graph_in_parallel_invalid(bike_as_dict):
+    bike_as_dict["edges"][6]["amount"] = "lots"
+    with pytest.raises(ValidationError) as serial:
+        schema.graph_to_pydantic(deepcopy(bike_as_dict))
+    with pytest.raises(ValidationError) as parallel:
+        schema.graph_to_pydantic(bike_as_dict, workers=2, chunk_size=4)
+    assert parallel.value.errors() == serial.value.errors()
+
+
+def test_construct_graph_trusted(bike_as_dict, bike_as_graph):
+    graph = schema.graph_to_pydantic(deepcopy(bike_as_dict), trusted=True)
+    assert graph == bike_as_graph
+    assert [edge.model_fields_set for edge in graph.edges] == [
+        edge.model_fields_set for edge in bike_as_graph.edges
+    ]
+    assert graph.model_dump() == bike_as_graph.model_dump()
+
+
+def test_construct_graph_trusted_shares_containers(bike_as_dict):
+    bike_as_dict["edges"][3]["tags"] = {"quality": [1, 2]}
+    trusted = schema.graph_to_pydantic(bike_as_dict, trusted=True)
+    assert trusted.edges[3].tags is bike_as_dict["edges"][3]["tags"]
+    validated = schema.graph_to_pydantic(bike_as_dict)
+    assert validated.edges[3].tags is not bike_as_dict["edges"][3]["tags"]
+    assert validated == trusted
+
+
+def test_construct_graph_trusted_skips_validation(bike_as_dict):
+    bike_as_dict["edges"][2]["functional"] = True
+    with pytest.raises(ValidationError):
+        schema.graph_to_pydantic(deepcopy(bike_as_dict))
+    graph = schema.graph_to_pydantic(deepcopy(bike_as_dict), trusted=True)
+    assert graph.edges[2].functional is True
+
+
+def test_construct_graph_trusted_sample(bike_as_dict):
+    bike_as_dict["edges"][6]["amount"] = "lots"
+    schema.graph_to_pydantic(deepcopy(bike_as_dict), trusted=True)
+    with pytest.raises(ValidationError):
+        schema.graph_to_pydantic(bike_as_dict, trusted=True, sample=1)
+
+    bike_as_dict["edges"][6]["amount"] = "237"
+    with pytest.raises(ValueError, match="Edge 6 changes when validated"):
+        schema.graph_to_pydantic(bike_as_dict, trusted=True, sample=1, seed=1)
+
+
+def test_construct_graph_trusted_check_graph(bike_as_dict):
+    bike_as_dict["edges"][3]["source"] = "missing"
+    with pytest.raises(ValueError):
+        schema.graph_to_pydantic(deepcopy(bike_as_dict), trusted=True)
+    schema.graph_to_pydantic(bike_as_dict, trusted=True, check_graph=False)
+
+
+def test_from_trusted():
+    data = {
+        "edge_type": "technosphere",
+        "source": "a",
+        "target": "b",
+        "amount": 2,
+        "references": [{"authors": ["Ann"], "year": 2000, "title": "Bikes"}],
+        "custom": "value",
+    }
+    edge = schema.TechnosphereQuantitativeEdge.from_trusted(data)
+    expected = schema.TechnosphereQuantitativeEdge(**data)
+    assert edge == expected
+    assert edge.model_fields_set == expected.model_fields_set
+    assert edge.model_dump() == expected.model_dump()
+    assert isinstance(edge.references[0], schema.DataSource)
@@ -0,0 +1,56 @@
+import pytest
+
+import bw_interface_schemas as schema
+from bw_interface_schemas.lazy import LazyGraph
+
+
+def test_access_builds_and_caches(bike_as_dict, bike_as_graph):
+    graph = LazyGraph(bike_as_dict["nodes"], bike_as_dict["edges"])
+    assert graph.nodes.cache == {}
+    node = graph.nodes["bike manufacturing"]
+    assert isinstance(node, schema.Process)
+    assert node is graph.nodes["bike manufacturing"]
+    assert list(graph.nodes.cache) == ["bike manufacturing"]
+    assert graph.edges[3] == bike_as_graph.edges[3]
+    assert graph.edges[3] is graph.edges[-12]
+    assert sum(edge is not None for edge in graph.edges.cache) == 1
+    assert len(graph.nodes) == 10 and len(graph.edges) == 15
+    assert "bike_db" in graph.nodes
+
+
+def test_to_graph(bike_as_dict, bike_as_graph):
+    assert LazyGraph(bike_as_dict["nodes"], bike_as_dict["edges"]).to_graph() == (
+        bike_as_graph
+    )
+
+
+def test_from_json(bike_as_graph, tmp_path):
+    (tmp_path / "bike.json").write_text(bike_as_graph.model_dump_json())
+    graph = LazyGraph.from_json(tmp_path / "bike.json")
+    assert graph.edges[0] == bike_as_graph.edges[0]
+    assert graph.to_graph() == bike_as_graph
+
+
+def test_from_edge_table(bike_as_dict, bike_as_graph):
+    pytest.importorskip("numpy")
+    from bw_interface_schemas.columnar import EdgeTable
+
+    table = EdgeTable.from_graph(bike_as_graph)
+    graph = LazyGraph.from_edge_table(table, bike_as_dict["nodes"])
+    assert graph.edges.raw[-1] == table.row_values(len(table) - 1)
+    assert graph.edges.cache == [None] * len(table)
+    assert list(graph.edges) == bike_as_graph.edges
+
+
+def test_checks_raw_data(bike_as_dict):
+    bike_as_dict["edges"][0]["source"] = "missing"
+    with pytest.raises(ValueError, match="Can't find edge source"):
+        LazyGraph(bike_as_dict["nodes"], bike_as_dict["edges"])
+    graph = LazyGraph(bike_as_dict["nodes"], bike_as_dict["edges"], check_graph=False)
+    assert {violation.rule for violation in graph.validate_report()} == {
+        violation.rule
+        for violation in schema.graph_to_pydantic(
+            bike_as_dict, check_graph=False
+        ).validate_report()
+    }
+    assert graph.nodes.cache == {}
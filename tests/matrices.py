@@ -0,0 +1,39 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("scipy")
+
+
+def test_matrix_shapes_and_mappings(bike_as_graph):
+    matrices = bike_as_graph.to_matrices()
+    assert matrices.products == {"natural gas": 0, "carbon fibre": 1, "bicycle": 2}
+    assert matrices.processes == {
+        "natural gas extraction": 0,
+        "carbon fibre production": 1,
+        "bike manufacturing": 2,
+    }
+    assert matrices.elementary_flows == {"CO2": 0}
+    assert matrices.impact_categories == {"IPCC - 100 years": 0}
+    assert matrices.technosphere.shape == (3, 3)
+    assert matrices.biosphere.shape == (1, 3)
+    assert matrices.characterization.shape == (1, 1)
+
+
+def test_technosphere_signs(bike_as_graph):
+    matrices = bike_as_graph.to_matrices()
+    assert np.allclose(
+        matrices.technosphere.toarray(),
+        [
+            [1, -237, 0],
+            [0, 1, -2.5],
+            [0, 0, 1],
+        ],
+    )
+    assert np.allclose(matrices.biosphere.toarray(), [[0, 26.6, 0]])
+    assert np.allclose(matrices.characterization.toarray(), [[1]])
+
+
+def test_matrix_format(bike_as_graph):
+    matrices = bike_as_graph.to_matrices(format="coo")
+    assert matrices.technosphere.format == "coo"
+    assert matrices.technosphere.nnz == 5
@@ -0,0 +1,153 @@
+import pytest
+
+import bw_interface_schemas as schema
+from bw_interface_schemas.index import GraphIndex
+
+
+def new_process_edges() -> list[schema.Edge]:
+    return [
+        schema.TechnosphereQuantitativeEdge(
+            amount=1, source="wheel production", target="wheel", functional=True
+        ),
+        schema.TechnosphereQuantitativeEdge(
+            amount=0.5, source="carbon fibre", target="wheel production"
+        ),
+        schema.QualitativeEdge(
+            edge_type="belongs_to", source="wheel production", target="bike_db"
+        ),
+        schema.QualitativeEdge(
+            edge_type="belongs_to", source="wheel", target="bike_db"
+        ),
+    ]
+
+
+def new_process_nodes() -> dict[str, schema.Node]:
+    return {
+        "wheel production": schema.Process(name="wheel production", location="FR"),
+        "wheel": schema.Product(name="wheel", unit="number"),
+    }
+
+
+def test_add_nodes_and_edges(bike_as_graph):
+    bike_as_graph.add(nodes=new_process_nodes(), edges=new_process_edges())
+    assert "wheel" in bike_as_graph.nodes
+    assert len(bike_as_graph.edges) == 19
+    assert bike_as_graph.validate_report() == []
+
+
+def test_add_rolls_back_on_failure(bike_as_graph):
+    before = bike_as_graph.model_dump()
+    with pytest.raises(ValueError, match="not linked to a product system"):
+        bike_as_graph.add(nodes=new_process_nodes(), edges=new_process_edges()[:3])
+    assert bike_as_graph.model_dump() == before
+
+    # Index was rolled back too
+    bike_as_graph.add(nodes=new_process_nodes(), edges=new_process_edges())
+
+
+def test_add_node_existing_identifier(bike_as_graph):
+    with pytest.raises(ValueError, match="already in graph"):
+        bike_as_graph.add_node("bicycle", schema.Product(name="bicycle", unit="kg"))
+
+
+def test_add_edges_type_rule(bike_as_graph):
+    with pytest.raises(ValueError, match="link a process and a product"):
+        bike_as_graph.add_edges(
+            [
+                schema.TechnosphereQuantitativeEdge(
+                    amount=1, source="CO2", target="bicycle"
+                )
+            ]
+        )
+
+
+def test_remove_node(bike_as_graph):
+    bike_as_graph.add(nodes=new_process_nodes(), edges=new_process_edges())
+    with pytest.raises(ValueError, match="Can't find functional edge"):
+        bike_as_graph.remove_node("wheel")
+
+    bike_as_graph.remove_node("wheel production")
+    assert "wheel production" not in bike_as_graph.nodes
+    assert all(
+        "wheel production" not in (edge.source, edge.target)
+        for edge in bike_as_graph.edges
+    )
+    assert bike_as_graph.validate_report() == []
+
+
+def test_remove_node_checks_neighbours(bike_as_graph):
+    before = bike_as_graph.model_dump()
+    with pytest.raises(ValueError, match="not linked to a product system"):
+        bike_as_graph.remove_node("bike_db")
+    assert bike_as_graph.model_dump() == before
+    assert bike_as_graph.validate_report() == []
+
+
+def test_remove_edges(bike_as_graph):
+    edge = bike_as_graph.edges[1]
+    bike_as_graph.remove_edges([edge])
+    assert edge not in bike_as_graph.edges
+
+    functional = next(
+        edge for edge in bike_as_graph.edges if getattr(edge, "functional", False)
+    )
+    with pytest.raises(ValueError, match="Can't find functional edge"):
+        bike_as_graph.remove_edges([functional])
+    assert functional in bike_as_graph.edges
+
+
+def test_mutations_keep_index(bike_as_graph):
+    index = bike_as_graph._get_index()
+    bike_as_graph.remove_edges([bike_as_graph.edges[1]])
+    functional = next(
+        edge for edge in bike_as_graph.edges if getattr(edge, "functional", False)
+    )
+    with pytest.raises(ValueError):
+        bike_as_graph.remove_edges([functional])
+    # Updated in place instead of being rebuilt
+    assert bike_as_graph._index is index
+    assert functional in bike_as_graph.out_edges(functional.source)
+
+
+def assert_index_current(graph: schema.Graph) -> None:
+    index, rebuilt = graph._index, GraphIndex(graph.nodes, graph.edges)
+    assert [index.position(edge) for edge in graph.edges] == list(
+        range(len(graph.edges))
+    )
+    assert index.canonical == rebuilt.canonical
+    for edge_type in rebuilt.edges_by_type:
+        assert list(index.edges_of_type(edge_type)) == list(
+            rebuilt.edges_of_type(edge_type)
+        )
+    for node in graph.nodes:
+        for edge_type in rebuilt.outgoing.get(node, {}):
+            assert list(index.outgoing_edges(node, edge_type)) == list(
+                rebuilt.outgoing_edges(node, edge_type)
+            )
+        for edge_type in rebuilt.incoming.get(node, {}):
+            assert list(index.incoming_edges(node, edge_type)) == list(
+                rebuilt.incoming_edges(node, edge_type)
+            )
+
+
+def test_mutations_update_index_in_place(bike_as_graph):
+    index = bike_as_graph._get_index()
+    bike_as_graph.add(nodes=new_process_nodes(), edges=new_process_edges())
+    assert_index_current(bike_as_graph)
+    bike_as_graph.remove_edges([bike_as_graph.edges[2], bike_as_graph.edges[1]])
+    assert_index_current(bike_as_graph)
+    # Failed removals put the edges back in their place
+    edges = list(bike_as_graph.edges)
+    with pytest.raises(ValueError):
+        bike_as_graph.remove_edges(bike_as_graph.edges[:6])
+    assert bike_as_graph.edges == edges
+    assert_index_current(bike_as_graph)
+    bike_as_graph.remove_node("wheel production")
+    assert_index_current(bike_as_graph)
+    assert bike_as_graph._index is index
+
+
+def test_node_ids_follow_changes(bike_as_graph):
+    assert "bike_db" in bike_as_graph.node_ids()
+    bike_as_graph.add_node("extra", schema.ProductSystem(name="extra", license="CC0"))
+    assert bike_as_graph.node_ids()["extra"] == len(bike_as_graph.nodes) - 1
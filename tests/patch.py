@@ -0,0 +1,160 @@
+from copy import deepcopy
+
+import pytest
+
+import bw_interface_schemas as schema
+from bw_interface_schemas.patch import edge_digest
+
+
+def changed_bike(bike_as_dict) -> schema.Graph:
+    bike_as_dict["nodes"]["bicycle"]["unit"] = "bike"
+    bike_as_dict["edges"][7]["amount"] = 3
+    bike_as_dict["nodes"]["steel"] = {
+        "node_type": schema.NodeTypes.product,
+        "name": "steel",
+        "unit": "kg",
+    }
+    bike_as_dict["edges"] += [
+        {
+            "edge_type": schema.QuantitativeEdgeTypes.technosphere,
+            "amount": 0.2,
+            "source": "steel",
+            "target": "bike manufacturing",
+        },
+        {
+            "edge_type": schema.QuantitativeEdgeTypes.technosphere,
+            "amount": 1,
+            "source": "bike manufacturing",
+            "target": "steel",
+            "functional": True,
+        },
+        {
+            "edge_type": schema.QualitativeEdgeTypes.belongs_to,
+            "source": "steel",
+            "target": "bike_db",
+        },
+    ]
+    return schema.graph_to_pydantic(bike_as_dict)
+
+
+def test_diff(bike_as_graph, bike_as_dict):
+    other = changed_bike(bike_as_dict)
+    patch = bike_as_graph.diff(other)
+    assert [identifier for identifier, _ in patch.added_nodes] == ["steel"]
+    assert [identifier for identifier, _ in patch.changed_nodes] == ["bicycle"]
+    assert patch.removed_nodes == []
+    assert len(patch.added_edges) == 4
+    assert patch.added_positions == [7, 15, 16, 17]
+    assert patch.removed_edges == [
+        (
+            "technosphere",
+            "carbon fibre",
+            "bike manufacturing",
+            edge_digest(bike_as_graph.edges[7]),
+        )
+    ]
+    assert bike_as_graph.diff(bike_as_graph) == schema.GraphPatch()
+
+
+def test_apply_patch(bike_as_graph, bike_as_dict):
+    other = changed_bike(bike_as_dict)
+    patch = schema.GraphPatch.model_validate_json(
+        bike_as_graph.diff(other).model_dump_json()
+    )
+    bike_as_graph.apply_patch(patch)
+    assert bike_as_graph.nodes == other.nodes
+    assert bike_as_graph.edges == other.edges
+    assert bike_as_graph == other
+    assert bike_as_graph.validate_report() == []
+    assert bike_as_graph.successors("bike manufacturing", "technosphere") == [
+        "bicycle",
+        "steel",
+    ]
+
+
+def test_apply_patch_removes_nodes(bike_as_graph, bike_as_dict):
+    other = changed_bike(bike_as_dict)
+    other.apply_patch(other.diff(bike_as_graph))
+    assert "steel" not in other.nodes
+    assert other.diff(bike_as_graph) == schema.GraphPatch()
+
+
+def test_apply_invalid_patch_rolls_back(bike_as_graph):
+    before = bike_as_graph.model_dump()
+    patch = schema.GraphPatch(removed_nodes=["bike_db"])
+    with pytest.raises(ValueError, match="Can't find edge target"):
+        bike_as_graph.apply_patch(patch)
+    assert bike_as_graph.model_dump() == before
+    assert bike_as_graph.validate_report() == []
+
+    patch = schema.GraphPatch(
+        removed_edges=[("belongs_to", "bicycle", "bike_db", "0" * 32)]
+    )
+    with pytest.raises(ValueError, match="Can't find belongs_to edge"):
+        bike_as_graph.apply_patch(patch)
+
+
+def test_apply_patch_reordered_edges(bike_as_graph, bike_as_dict):
+    bike_as_dict["edges"].reverse()
+    other = schema.graph_to_pydantic(bike_as_dict)
+    patch = bike_as_graph.diff(other)
+    assert len(patch.added_edges) == len(patch.removed_edges) == 14
+    bike_as_graph.apply_patch(patch)
+    assert bike_as_graph.edges == other.edges
+
+
+def test_apply_patch_checks_before_changes(bike_as_graph):
+    before = bike_as_graph.model_dump()
+    for patch, message in [
+        (
+            schema.GraphPatch(removed_nodes=["CO2", "CO2"]),
+            "removed more than once",
+        ),
+        (
+            schema.GraphPatch(
+                removed_nodes=["CO2"],
+                changed_nodes=[("CO2", bike_as_graph.nodes["CO2"].model_dump())],
+            ),
+            "changed and removed",
+        ),
+        (
+            schema.GraphPatch(
+                added_edges=[bike_as_graph.edges[0].model_dump()],
+                added_positions=[16],
+            ),
+            "Invalid positions",
+        ),
+    ]:
+        with pytest.raises(ValueError, match=message):
+            bike_as_graph.apply_patch(patch)
+        assert bike_as_graph.model_dump() == before
+
+
+def test_patch_json_int_identifiers(bike_as_dict):
+    ids = {
+        identifier: number for number, identifier in enumerate(bike_as_dict["nodes"])
+    }
+    bike_as_dict["nodes"] = {
+        ids[key]: node for key, node in bike_as_dict["nodes"].items()
+    }
+    for edge in bike_as_dict["edges"]:
+        edge["source"], edge["target"] = ids[edge["source"]], ids[edge["target"]]
+    graph = schema.graph_to_pydantic(deepcopy(bike_as_dict))
+
+    bike_as_dict["nodes"][ids["bicycle"]]["unit"] = "bike"
+    bike_as_dict["nodes"][999] = {"node_type": "product", "name": "steel", "unit": "kg"}
+    bike_as_dict["edges"] += [
+        {
+            "edge_type": "technosphere",
+            "amount": 1,
+            "source": ids["bike manufacturing"],
+            "target": 999,
+            "functional": True,
+        },
+        {"edge_type": "belongs_to", "source": 999, "target": ids["bike_db"]},
+    ]
+    other = schema.graph_to_pydantic(bike_as_dict)
+    patch = schema.GraphPatch.model_validate_json(graph.diff(other).model_dump_json())
+    graph.apply_patch(patch)
+    assert graph == other
+    assert 999 in graph.nodes and "999" not in graph.nodes
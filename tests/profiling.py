@@ -0,0 +1,84 @@
+import json
+from copy import deepcopy
+
+import pytest
+from pydantic import ValidationError
+
+import bw_interface_schemas as schema
+from bw_interface_schemas.profiling import (
+    ValidationProfile,
+    active_profile,
+    profile_validation,
+)
+
+RULES = {
+    "edges_reference_nodes",
+    "processes_in_product_system",
+    "products_in_product_system",
+    "elementary_flows_in_product_system",
+    "process_has_at_least_one_functional_edge",
+    "edge_source_target_types",
+}
+
+
+def test_profile_graph_to_pydantic(bike_as_dict, bike_as_graph):
+    with profile_validation() as profile:
+        graph = schema.graph_to_pydantic(bike_as_dict)
+    assert active_profile() is None
+    assert graph == bike_as_graph
+    assert [edge.model_fields_set for edge in graph.edges] == [
+        edge.model_fields_set for edge in bike_as_graph.edges
+    ]
+
+    assert profile.stages["validation"].objects == 25
+    assert set(profile.stages) == {"validation", "graph"}
+    assert profile.classes["TechnosphereQuantitativeEdge"].objects == 5
+    assert profile.classes["Process"].objects == 3
+    assert sum(timing.objects for timing in profile.classes.values()) == 25
+    assert set(profile.rules) == RULES
+    assert profile.rules["edge_source_target_types"].objects == 15
+    assert profile.rules["processes_in_product_system"].objects == 3
+    assert all(timing.calls == 1 for timing in profile.rules.values())
+
+
+def test_profile_from_json(bike_as_graph):
+    # Same adapter as `graph_to_pydantic`, so JSON loading is profiled too
+    with profile_validation() as profile:
+        graph = schema.Graph.from_json(bike_as_graph.model_dump_json().encode())
+    assert graph == bike_as_graph
+    assert profile.classes["Process"].objects == 3
+    assert sum(timing.objects for timing in profile.classes.values()) == 25
+
+
+def test_profile_model_validators(bike_as_graph):
+    with profile_validation() as profile:
+        schema.Graph(nodes=bike_as_graph.nodes, edges=bike_as_graph.edges)
+    assert set(profile.rules) == RULES
+    assert not profile.stages
+
+
+def test_profile_export(bike_as_dict):
+    with profile_validation() as profile:
+        schema.graph_to_pydantic(bike_as_dict)
+    data = json.loads(profile.to_json())
+    assert data == profile.to_dict()
+    assert set(data["stages"]["validation"]) == {"calls", "seconds", "objects"}
+
+
+def test_profile_invalid_graph(bike_as_dict):
+    bike_as_dict["edges"][6]["amount"] = "lots"
+    with pytest.raises(ValidationError) as profiled:
+        with profile_validation():
+            schema.graph_to_pydantic(deepcopy(bike_as_dict))
+    with pytest.raises(ValidationError) as plain:
+        schema.graph_to_pydantic(bike_as_dict)
+    assert profiled.value.errors() == plain.value.errors()
+
+
+def test_profile_accumulates(bike_as_dict):
+    profile = ValidationProfile()
+    for _ in range(2):
+        with profile_validation(profile):
+            schema.graph_to_pydantic(deepcopy(bike_as_dict))
+    assert profile.stages["validation"].calls == 2
+    assert profile.rules["edges_reference_nodes"].objects == 30
@@ -0,0 +1,135 @@
+import bw_interface_schemas as schema
+
+
+def test_neighbours(bike_as_graph):
+    assert bike_as_graph.predecessors("bike manufacturing", "technosphere") == [
+        "carbon fibre"
+    ]
+    assert bike_as_graph.successors("bike manufacturing", "technosphere") == ["bicycle"]
+    assert bike_as_graph.successors("carbon fibre production") == [
+        "CO2",
+        "carbon fibre",
+        "bike_db",
+    ]
+    assert bike_as_graph.predecessors("missing") == []
+
+
+def test_edges(bike_as_graph):
+    assert bike_as_graph.edges_of_type("biosphere") == [bike_as_graph.edges[2]]
+    assert bike_as_graph.in_edges("IPCC - 100 years", "characterization") == [
+        bike_as_graph.edges[1]
+    ]
+    assert len(bike_as_graph.out_edges("carbon fibre production")) == 3
+    assert bike_as_graph.nodes_of_type("process") == [
+        "natural gas extraction",
+        "carbon fibre production",
+        "bike manufacturing",
+    ]
+
+
+def test_members_of(bike_as_graph):
+    assert bike_as_graph.members_of("IPCC") == ["IPCC - 100 years"]
+    assert len(bike_as_graph.members_of("bike_db")) == 7
+
+
+def test_index_follows_changes(bike_as_graph):
+    bike_as_graph.add_node(
+        "other",
+        schema.ElementaryFlow(name="other", unit="kg", context=["air"]),
+        edges=[
+            schema.QualitativeEdge(
+                edge_type="belongs_to", source="other", target="bike_db"
+            )
+        ],
+    )
+    assert "other" in bike_as_graph.members_of("bike_db")
+
+    # Direct changes are noticed
+    bike_as_graph.edges.pop()
+    assert "other" not in bike_as_graph.members_of("bike_db")
+
+    # Assigning new lists drops the index, even with the same length
+    bike_as_graph.edges = bike_as_graph.edges[1:] + [
+        schema.QualitativeEdge(edge_type="belongs_to", source="other", target="IPCC")
+    ]
+    assert bike_as_graph.members_of("IPCC") == ["other"]
+
+    assert bike_as_graph.members_of("IPCC") == ["other"]
+
+
+def test_queries_after_replacement_in_place(bike_as_graph):
+    # Same number of nodes and edges as before
+    assert "CO2" not in bike_as_graph.members_of("IPCC")
+    position = bike_as_graph.edges.index(
+        bike_as_graph.out_edges("CO2", "belongs_to")[0]
+    )
+    bike_as_graph.edges[position] = schema.QualitativeEdge(
+        edge_type="belongs_to", source="CO2", target="IPCC"
+    )
+    assert "CO2" in bike_as_graph.members_of("IPCC")
+
+    bike_as_graph.nodes["CO2"] = schema.Product(name="CO2", unit="kg")
+    assert "CO2" in bike_as_graph.nodes_of_type("product")
+    assert "CO2" not in bike_as_graph.nodes_of_type("elementary_flow")
+    assert bike_as_graph.node_ids()["CO2"] == list(bike_as_graph.nodes).index("CO2")
+
+
+def test_validate_report_after_direct_changes(bike_as_graph):
+    assert bike_as_graph.members_of("bike_db")
+    # Same number of edges, so the cached index can't tell
+    position = next(
+        position
+        for position, edge in enumerate(bike_as_graph.edges)
+        if edge.edge_type == "belongs_to"
+        and edge.source == "CO2"
+        and edge.target == "bike_db"
+    )
+    bike_as_graph.edges.pop(position)
+    bike_as_graph.edges.append(
+        schema.QualitativeEdge(edge_type="belongs_to", source="CO2", target="IPCC")
+    )
+    rules = [violation.rule for violation in bike_as_graph.validate_report()]
+    assert "elementary_flows_in_product_system" in rules
+
+
+def test_upstream_subgraph(bike_as_graph):
+    subgraph = bike_as_graph.upstream_subgraph(["carbon fibre"])
+    assert set(subgraph.nodes) == {
+        "carbon fibre",
+        "carbon fibre production",
+        "natural gas",
+        "natural gas extraction",
+        "CO2",
+        "IPCC - 100 years",
+        "IPCC",
+        "bike_db",
+    }
+    assert len(subgraph.edges) == 11
+    assert subgraph.validate_report() == []
+    assert subgraph.edges == [
+        edge for edge in bike_as_graph.edges if edge in subgraph.edges
+    ]
+
+
+def test_upstream_subgraph_depth(bike_as_graph):
+    subgraph = bike_as_graph.upstream_subgraph(["bicycle"], depth=1)
+    assert subgraph.nodes_of_type("process") == ["bike manufacturing"]
+    assert "carbon fibre" in subgraph.nodes
+    assert subgraph.validate_report() == []
+    assert bike_as_graph.upstream_subgraph(["bicycle"]).nodes.keys() == (
+        bike_as_graph.nodes.keys()
+    )
+
+
+def test_upstream_subgraph_process(bike_as_graph):
+    subgraph = bike_as_graph.upstream_subgraph(["bike manufacturing"], depth=0)
+    assert set(subgraph.nodes) == {
+        "bike manufacturing",
+        "bicycle",
+        "carbon fibre",
+        "bike_db",
+    }
+    assert subgraph.validate_report() == []
+    assert bike_as_graph.upstream_subgraph(["bike manufacturing"]).nodes.keys() == (
+        bike_as_graph.nodes.keys()
+    )
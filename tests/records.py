@@ -0,0 +1,43 @@
+import dataclasses
+
+import pytest
+
+import bw_interface_schemas as schema
+from bw_interface_schemas.records import graph_to_records, record_class, to_record
+
+
+def test_record_fields(bike_as_graph):
+    records = graph_to_records(bike_as_graph)
+    edge = records.edges[3]
+    assert type(edge) is record_class(schema.TechnosphereQuantitativeEdge)
+    assert type(edge).__name__ == "TechnosphereQuantitativeEdgeRecord"
+    assert edge.functional is True
+    assert edge.source == bike_as_graph.edges[3].source
+    assert not hasattr(edge, "__dict__")
+    assert isinstance(records.nodes["bike manufacturing"], record_class(schema.Process))
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        edge.amount = 2
+
+
+def test_fields_sets_are_shared(bike_as_graph):
+    records = graph_to_records(bike_as_graph)
+    belongs_to = [edge for edge in records.edges if edge.edge_type == "belongs_to"]
+    assert belongs_to[0].fields_set is belongs_to[1].fields_set
+
+
+def test_roundtrip(bike_as_graph):
+    graph = graph_to_records(bike_as_graph).to_graph()
+    assert graph == bike_as_graph
+    assert [edge.model_fields_set for edge in graph.edges] == [
+        edge.model_fields_set for edge in bike_as_graph.edges
+    ]
+
+
+def test_extra_fields():
+    edge = schema.QualitativeEdge(
+        edge_type="belongs_to", source="a", target="b", custom=[1, 2]
+    )
+    record = to_record(edge)
+    assert record.extra == {"custom": [1, 2]}
+    assert record.to_model() == edge
+    assert record.to_model().custom == [1, 2]
@@ -0,0 +1,89 @@
+from copy import deepcopy
+
+import pytest
+
+import bw_interface_schemas as schema
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("scipy")
+
+from bw_interface_schemas.columnar import EdgeTable  # noqa: E402
+from bw_interface_schemas.sampling import (  # noqa: E402
+    iter_matrix_samples,
+    matrix_samples,
+    sample_edges,
+)
+
+
+@pytest.fixture
+def uncertain_graph(bike_as_dict):
+    data = deepcopy(bike_as_dict)
+    # natural gas extraction -> natural gas
+    data["edges"][4].update(uncertainty_type=2, scale=0.1)
+    # natural gas -> carbon fibre production
+    data["edges"][6].update(uncertainty_type=3, scale=10, minimum=230, maximum=240)
+    # carbon fibre production -> CO2
+    data["edges"][2].update(uncertainty_type=7, minimum=1, maximum=4)
+    # carbon fibre -> bike manufacturing
+    data["edges"][7].update(uncertainty_type=5, minimum=2, maximum=3)
+    return schema.graph_to_pydantic(data)
+
+
+def test_matrix_samples_aligned(uncertain_graph):
+    samples = matrix_samples(uncertain_graph, 500, seed=1)
+    matrices = uncertain_graph.to_matrices()
+    for name in ("technosphere", "biosphere", "characterization"):
+        assert samples[name].values.shape[1] == 500
+        assert samples[name].matrix(0).shape == getattr(matrices, name).shape
+
+    technosphere = samples["technosphere"]
+    for row, col, values in zip(
+        technosphere.rows, technosphere.cols, technosphere.values
+    ):
+        expected = matrices.technosphere[row, col]
+        assert np.all(np.sign(values) == np.sign(expected))
+        if expected == -237:
+            assert values.min() >= -240 and values.max() <= -230
+        elif expected == -2.5:
+            assert values.min() >= -3 and values.max() <= -2
+    assert np.allclose(samples["characterization"].values, 1)
+    assert set(np.unique(samples["biosphere"].values)) <= {1.0, 2.0, 3.0}
+
+
+def test_lognormal_negative(bike_as_dict):
+    data = deepcopy(bike_as_dict)
+    data["edges"][1].update(amount=-2, uncertainty_type=2, scale=0.01)
+    table = EdgeTable.from_graph(schema.graph_to_pydantic(data))
+    values = sample_edges(table, 100, 3, positions=np.array([1]))
+    assert np.all(values < 0)
+    assert np.allclose(values.mean(), -2, rtol=0.01)
+    assert np.array_equal(values, sample_edges(table, 100, 3, np.array([1])))
+
+
+def test_chunks_are_reproducible(uncertain_graph):
+    first = list(iter_matrix_samples(uncertain_graph, 250, chunk_size=100, seed=1))
+    second = list(iter_matrix_samples(uncertain_graph, 250, chunk_size=100, seed=1))
+    assert [chunk["technosphere"].values.shape[1] for chunk in first] == [100, 100, 50]
+    for a, b in zip(first, second):
+        assert np.array_equal(a["technosphere"].values, b["technosphere"].values)
+
+
+def test_unsupported_and_missing(bike_as_dict):
+    data = deepcopy(bike_as_dict)
+    data["edges"][2].update(uncertainty_type=6)
+    table = EdgeTable.from_graph(schema.graph_to_pydantic(data))
+    with pytest.raises(ValueError, match="Unsupported"):
+        sample_edges(table, 10)
+
+    data["edges"][2].update(uncertainty_type=3)
+    table = EdgeTable.from_graph(schema.graph_to_pydantic(data))
+    with pytest.raises(ValueError, match="Missing parameters"):
+        sample_edges(table, 10)
+
+
+def test_impossible_bounds(bike_as_dict):
+    data = deepcopy(bike_as_dict)
+    data["edges"][2].update(uncertainty_type=3, scale=0.1, minimum=100, maximum=101)
+    table = EdgeTable.from_graph(schema.graph_to_pydantic(data))
+    with pytest.raises(ValueError, match="outside bounds"):
+        sample_edges(table, 10, max_redraws=5)
@@ -0,0 +1,83 @@
+import sqlite3
+
+import pytest
+
+import bw_interface_schemas as schema
+from bw_interface_schemas.sqlite import SQLiteStore
+
+
+@pytest.fixture
+def store(bike_as_graph):
+    with SQLiteStore(batch_size=4) as store:
+        store.add_graph(bike_as_graph)
+        yield store
+
+
+def test_roundtrip(store, bike_as_graph):
+    assert store.count_nodes() == len(bike_as_graph.nodes)
+    assert store.count_edges("technosphere") == 5
+    assert list(store.violations()) == []
+    assert store.to_graph() == bike_as_graph
+
+
+def test_lazy_loading(store, bike_as_graph):
+    node = store.node("bike manufacturing")
+    assert isinstance(node, schema.Process)
+    assert node == bike_as_graph.nodes["bike manufacturing"]
+    assert store.edge(3) == bike_as_graph.edges[3]
+    with pytest.raises(KeyError):
+        store.node("missing")
+    with pytest.raises(IndexError):
+        store.edge(100)
+
+
+def test_queries(store, bike_as_graph):
+    assert [identifier for identifier, _ in store.nodes("process")] == [
+        identifier
+        for identifier, node in bike_as_graph.nodes.items()
+        if node.node_type == "process"
+    ]
+    edges = list(store.edges(edge_type="technosphere", source="bike manufacturing"))
+    assert edges == [
+        edge
+        for edge in bike_as_graph.edges
+        if edge.edge_type == "technosphere" and edge.source == "bike manufacturing"
+    ]
+    assert all(isinstance(edge, schema.TechnosphereQuantitativeEdge) for edge in edges)
+
+
+def test_duplicate_node(store):
+    with pytest.raises(sqlite3.IntegrityError):
+        store.add_nodes({"bike_db": schema.ProductSystem(name="again", license="CC0")})
+
+
+def test_violations_match_graph(bike_as_dict):
+    bike_as_dict["edges"] = [
+        edge
+        for edge in bike_as_dict["edges"]
+        if not (edge["source"] == "bike manufacturing" and edge["target"] == "bike_db")
+    ]
+    bike_as_dict["edges"][0]["source"] = "missing"
+    bike_as_dict["edges"].append(
+        {
+            "edge_type": schema.QuantitativeEdgeTypes.technosphere,
+            "amount": 1,
+            "source": "natural gas",
+            "target": "bicycle",
+            "functional": False,
+        }
+    )
+    graph = schema.graph_to_pydantic(bike_as_dict, check_graph=False)
+    with SQLiteStore() as store:
+        store.add_graph(graph)
+        assert list(store.violations()) == graph.validate_report()
+        with pytest.raises(ValueError, match="Can't find edge source"):
+            store.to_graph()
+        assert store.to_graph(check_graph=False) == graph
+
+
+def test_file_persistence(bike_as_graph, tmp_path):
+    with SQLiteStore(tmp_path / "graph.db") as store:
+        store.add_graph(bike_as_graph)
+    with SQLiteStore(tmp_path / "graph.db") as store:
+        assert store.to_graph() == bike_as_graph
@@ -0,0 +1,79 @@
+import io
+import json
+
+import pytest
+
+import bw_interface_schemas as schema
+from bw_interface_schemas.streaming import (
+    StreamValidator,
+    load_jsonl,
+    read_jsonl,
+    write_jsonl,
+)
+
+
+def test_roundtrip(bike_as_graph, tmp_path):
+    write_jsonl(tmp_path / "bike.jsonl", bike_as_graph.nodes, bike_as_graph.edges)
+    graph = load_jsonl(tmp_path / "bike.jsonl")
+    assert graph.model_dump() == bike_as_graph.model_dump()
+    assert graph.validate_report() == []
+
+
+def test_records_are_tagged():
+    buffer = io.StringIO()
+    write_jsonl(
+        buffer,
+        {"p": schema.Product(name="p", unit="kg")},
+        [schema.QualitativeEdge(edge_type="belongs_to", source="p", target="x")],
+    )
+    lines = [json.loads(line) for line in buffer.getvalue().splitlines()]
+    assert lines == [
+        {
+            "identifier": "p",
+            "node": {"name": "p", "unit": "kg", "node_type": "product"},
+        },
+        {"edge": {"edge_type": "belongs_to", "source": "p", "target": "x"}},
+    ]
+
+
+def test_read_yields_records(bike_as_graph):
+    buffer = io.StringIO()
+    write_jsonl(buffer, bike_as_graph.nodes, bike_as_graph.edges)
+    records = list(read_jsonl(io.StringIO(buffer.getvalue())))
+    assert records[0] == ("bike_db", bike_as_graph.nodes["bike_db"])
+    assert isinstance(records[-1], schema.QualitativeEdge)
+    assert len(records) == len(bike_as_graph.nodes) + len(bike_as_graph.edges)
+
+
+def test_read_checks_incrementally(bike_as_dict):
+    graph = schema.graph_to_pydantic(bike_as_dict, check_graph=False)
+    graph.edges.insert(
+        0, schema.TechnosphereQuantitativeEdge(amount=1, source="CO2", target="bicycle")
+    )
+    buffer = io.StringIO()
+    write_jsonl(buffer, graph.nodes, graph.edges)
+
+    records = read_jsonl(io.StringIO(buffer.getvalue()))
+    for _ in graph.nodes:
+        next(records)
+    with pytest.raises(ValueError, match="link a process and a product"):
+        next(records)
+
+    graph = load_jsonl(io.StringIO(buffer.getvalue()), check_graph=False)
+    assert len(graph.edges) == 16
+
+
+def test_stream_validator_finish(bike_as_graph):
+    validator = StreamValidator()
+    for identifier, node in bike_as_graph.nodes.items():
+        validator.add_node(identifier, node)
+    for edge in bike_as_graph.edges:
+        if edge.target != "bike_db":
+            assert list(validator.add_edge(edge)) == []
+    assert {violation.rule for violation in validator.finish()} == {
+        "processes_in_product_system",
+        "products_in_product_system",
+        "elementary_flows_in_product_system",
+    }
+    with pytest.raises(ValueError, match="must come before"):
+        validator.add_node("x", schema.Node(name="x", node_type="x"))
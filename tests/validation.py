@@ -0,0 +1,171 @@
+import pytest
+from pydantic import ValidationError
+
+import bw_interface_schemas as schema
+
+
+def test_process_not_in_product_system(bike_as_dict):
+    bike_as_dict["edges"] = [
+        edge
+        for edge in bike_as_dict["edges"]
+        if not (edge["source"] == "bike manufacturing" and edge["target"] == "bike_db")
+    ]
+    with pytest.raises(ValidationError, match="not linked to a product system"):
+        schema.graph_to_pydantic(bike_as_dict)
+
+
+def test_process_without_functional_edge(bike_as_dict):
+    for edge in bike_as_dict["edges"]:
+        if edge["source"] == "bike manufacturing" and edge.get("functional"):
+            edge["functional"] = False
+    with pytest.raises(ValidationError, match="Can't find functional edge"):
+        schema.graph_to_pydantic(bike_as_dict)
+
+
+def test_functional_edge_can_be_incoming(bike_as_dict):
+    for edge in bike_as_dict["edges"]:
+        if edge["source"] == "bike manufacturing" and edge.get("functional"):
+            edge["source"], edge["target"] = edge["target"], edge["source"]
+    assert schema.graph_to_pydantic(bike_as_dict)
+
+
+def test_edge_source_missing(bike_as_dict):
+    bike_as_dict["edges"][0]["source"] = "missing"
+    with pytest.raises(ValidationError, match="Can't find edge source"):
+        schema.graph_to_pydantic(bike_as_dict)
+
+
+def test_technosphere_edge_types(bike_as_dict):
+    bike_as_dict["edges"].append(
+        {
+            "edge_type": schema.QuantitativeEdgeTypes.technosphere,
+            "amount": 1,
+            "source": "natural gas",
+            "target": "bicycle",
+        }
+    )
+    with pytest.raises(ValidationError, match="link a process and a product"):
+        schema.graph_to_pydantic(bike_as_dict)
+
+
+def test_biosphere_edge_types(bike_as_dict):
+    bike_as_dict["edges"].append(
+        {
+            "edge_type": schema.QuantitativeEdgeTypes.biosphere,
+            "amount": 1,
+            "source": "natural gas",
+            "target": "CO2",
+        }
+    )
+    with pytest.raises(ValidationError, match="link a process to an elementary"):
+        schema.graph_to_pydantic(bike_as_dict)
+
+
+def test_custom_edge_type_rule(bike_as_dict):
+    class StrictGraph(schema.Graph):
+        edge_type_rules = schema.EDGE_TYPE_RULES | {
+            "belongs_to": schema.EdgeTypeRule(
+                allowed=frozenset(
+                    {(schema.NodeTypes.process, schema.NodeTypes.product_system)}
+                ),
+                message="Only processes can belong to things",
+            )
+        }
+
+    graph = schema.graph_to_pydantic(bike_as_dict)
+    with pytest.raises(ValidationError, match="Only processes"):
+        StrictGraph(nodes=graph.nodes, edges=graph.edges)
+
+
+def test_validate_report_collects_all_violations(bike_as_dict):
+    bike_as_dict["edges"][0]["source"] = "missing"
+    bike_as_dict["edges"] = [
+        edge for edge in bike_as_dict["edges"] if edge["target"] != "bike_db"
+    ]
+    bike_as_dict["edges"].append(
+        {
+            "edge_type": schema.QuantitativeEdgeTypes.technosphere,
+            "amount": 1,
+            "source": "natural gas",
+            "target": "bicycle",
+        }
+    )
+    graph = schema.graph_to_pydantic(bike_as_dict, check_graph=False)
+    report = graph.validate_report()
+
+    rules = [violation.rule for violation in report]
+    assert rules.count("edges_reference_nodes") == 1
+    assert rules.count("processes_in_product_system") == 3
+    assert rules.count("products_in_product_system") == 3
+    assert rules.count("elementary_flows_in_product_system") == 1
+    assert rules.count("technosphere_edge_source_target_types") == 1
+
+    technosphere = report[rules.index("technosphere_edge_source_target_types")]
+    assert technosphere.edge == len(bike_as_dict["edges"]) - 1
+    assert technosphere.nodes == ["natural gas", "bicycle"]
+    assert report[0].model_dump() == {
+        "rule": "edges_reference_nodes",
+        "message": "Can't find edge source in nodes: missing",
+        "edge": 0,
+        "nodes": ["missing"],
+    }
+
+
+def test_validate_report_valid_graph(bike_as_graph):
+    assert bike_as_graph.validate_report() == []
+
+
+def test_precheck_valid_graph(bike_as_dict, bike_as_graph):
+    assert schema.graph_to_pydantic(bike_as_dict, precheck=True) == bike_as_graph
+
+
+def test_precheck_fails_before_validation(bike_as_dict, monkeypatch):
+    bike_as_dict["edges"][0]["source"] = "missing"
+    bike_as_dict["edges"][6]["amount"] = "lots"
+
+    def fail(*args, **kwargs):
+        raise AssertionError("validated nodes and edges")
+
+    monkeypatch.setattr(schema.graph, "graph_adapter", fail)
+    with pytest.raises(ValidationError, match="Can't find edge source"):
+        schema.graph_to_pydantic(bike_as_dict, precheck=True)
+
+
+@pytest.mark.parametrize("precheck", [False, True])
+def test_precheck_same_errors(bike_as_dict, precheck):
+    for edge in bike_as_dict["edges"]:
+        if edge["source"] == "bike manufacturing" and edge.get("functional"):
+            edge["functional"] = False
+    with pytest.raises(ValidationError, match="Can't find functional edge"):
+        schema.graph_to_pydantic(bike_as_dict, precheck=precheck)
+
+
+def test_precheck_malformed_values(bike_as_dict):
+    bike_as_dict["edges"][6]["source"] = ["not", "hashable"]
+    with pytest.raises(ValidationError, match="edges.6"):
+        schema.graph_to_pydantic(bike_as_dict, precheck=True)
+
+
+@pytest.mark.parametrize("precheck", [False, True])
+def test_precheck_missing_node_type(bike_as_dict, precheck):
+    del bike_as_dict["nodes"]["CO2"]["node_type"]
+    with pytest.raises(ValidationError) as error:
+        schema.graph_to_pydantic(bike_as_dict, precheck=precheck)
+    assert error.value.errors()[0]["type"] == "union_tag_not_found"
+
+
+@pytest.mark.parametrize("precheck", [False, True])
+def test_precheck_reports_in_node_order(bike_as_dict, precheck):
+    # "bike manufacturing" sorts first, but "natural gas extraction" comes
+    # first in the nodes
+    unlinked = ["natural gas extraction", "bike manufacturing"]
+    bike_as_dict["edges"] = [
+        edge
+        for edge in bike_as_dict["edges"]
+        if not (edge["edge_type"] == "belongs_to" and edge["source"] in unlinked)
+    ]
+    with pytest.raises(
+        ValidationError,
+        match="process node not linked to a product system: natural gas extraction",
+    ):
+        schema.graph_to_pydantic(bike_as_dict, precheck=precheck)